@@ -0,0 +1,146 @@
+"""
+Script Name: [bench_members.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.01
+Last Modified: 2025.03.01
+Version: 1.0.0.0000
+
+Description:
+	Benchmark of GET /members/ as the member count grows. Runs the API with
+    uvicorn in this process and compares three ways of sending the members:
+
+        validated  the list through response_model=List[member], the way
+                   GET /members/ used to work (a bench-only route)
+        json       GET /members/, the JSON array joined from the stored rows
+        ndjson     GET /members/ with Accept: application/x-ndjson
+
+    Reports the time to the first body byte, the total time and the peak
+    memory the server allocated for the request (tracemalloc, in a second
+    pass so it does not slow down the timings).
+
+    Run with:
+        python bench_members.py
+        python bench_members.py 10000 100000 1000000
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import http.client # Import http.client for a plain client that reads the body as it arrives.
+import socket # Import socket to find a free port.
+import threading # Import threading to run uvicorn next to the client.
+import time # Import time for the measurements.
+import tracemalloc # Import tracemalloc to measure the memory of the requests.
+from datetime import date, timedelta # Import date to make up the birthdays.
+from typing import List # Import List for the bench-only route.
+
+import uvicorn # Import uvicorn to serve the API.
+
+import main
+
+SIZES = [10_000, 100_000, 500_000]
+MODES = {
+    "validated": ("/bench/members/validated", {}),
+    "json": ("/members/", {}),
+    "ndjson": ("/members/", {"Accept": "application/x-ndjson"}),
+}
+
+
+# GET /members/ before the pre-serialized rows: FastAPI validates and
+# serializes every member through the response model.
+@main.app.get("/bench/members/validated", response_model=List[main.member])
+def validated_members():
+    return list(main.members.values())
+
+
+# Ask the OS for a free port.
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# Start uvicorn in a thread, return the port once it answers.
+def start_server():
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+
+    while not server.started:
+        time.sleep(0.05)
+
+    return port
+
+
+# Add members until there are count of them.
+def fill(count):
+
+    first_day = date(1940, 1, 1)
+    for member_id in range(len(main.members) + 1, count + 1):
+        main.add_member({"id": member_id, "firstname": "First{}".format(member_id % 1000),
+                         "lastname": "Last{}".format(member_id % 5000),
+                         "dob": first_day + timedelta(days=member_id % 25000),
+                         "gender": ("Female", "Male", "Non-binary")[member_id % 3], "is_active": member_id % 4 != 0})
+
+
+# One request, the body is read as it arrives and dropped. Returns the ms
+# to the first body byte and to the last one.
+def fetch(port, path, headers):
+
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    start = time.perf_counter()
+    connection.request("GET", path, headers=headers)
+    response = connection.getresponse()
+
+    first_byte = None
+    while True:
+        data = response.read1(1 << 16)
+        if not data:
+            break
+        if first_byte is None:
+            first_byte = time.perf_counter()
+
+    end = time.perf_counter()
+    connection.close()
+    if response.status != 200:
+        raise RuntimeError("HTTP {}".format(response.status))
+
+    return (first_byte - start) * 1000, (end - start) * 1000
+
+
+# Peak MB allocated while serving one request.
+def peak_memory(port, path, headers):
+
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    fetch(port, path, headers)
+    return (tracemalloc.get_traced_memory()[1] - before) / 1e6
+
+
+def main_bench(sizes):
+
+    port = start_server()
+    print("{:<10} {:>10} {:>10} {:>10} {:>10}".format("mode", "members", "TTFB ms", "total ms", "peak MB"))
+
+    for count in sizes:
+        fill(count)
+        main.member_rows_snapshot()  # The copy is made once per write, not per request.
+
+        timings = {mode: fetch(port, path, headers) for mode, (path, headers) in MODES.items()}
+
+        tracemalloc.start()
+        peaks = {mode: peak_memory(port, path, headers) for mode, (path, headers) in MODES.items()}
+        tracemalloc.stop()
+
+        for mode in MODES:
+            print("{:<10} {:>10,} {:>10.1f} {:>10.1f} {:>10.1f}".format(mode, count, *timings[mode], peaks[mode]))
+
+
+if __name__ == "__main__":
+    main_bench([int(size) for size in sys.argv[1:]] or SIZES)
@@ -18,6 +18,8 @@ Instructor course notes on execution:
 		Assumes that the following packages have been installed useing pip:
     	1. pip install fastapi
     	2. pip install uvicorn
+    	3. pip install orjson
+		Or all of them at once: pip install -r requirements.txt
 
 		Or, we can use the built-in fastapi command to run the API, but we'll need an additional package installation:
     	1. pip install "fastapi[standard]"
@@ -43,9 +45,14 @@ Access API documentation:
 
 from fastapi import FastAPI # Import FastAPI to create the web application.
 from fastapi import HTTPException # Import HTTPException to handle HTTP errors.
+from fastapi import Request # Import Request to read the Accept header of GET /members/.
+from fastapi.responses import Response, StreamingResponse # Import the responses for the pre-serialized members.
 from pydantic import BaseModel # Import Pydantic's model for request/response validation.
 from datetime import date # Import date to handle member date of birth (DOB) fields.
 from typing import List # Import List for type hinting when returning a list of members.
+import itertools # Import itertools for the running insertion numbers of the members.
+import orjson # Import orjson to serialize each member once, when it is stored.
+import threading # Import threading to guard the members against concurrent writes.
 
 
 # In-memory storage for members
@@ -54,9 +61,42 @@ from typing import List # Import List for type hinting when returning a list of
 # Reference: https://fastapi.tiangolo.com/advanced/dependencies/
 
 # Altering "members" to "members" to minimize confusion between "members" and "members".
-members = []
+# Keyed by member ID, a dict keeps the insertion order, so every by-ID
+# operation is a single lookup instead of a scan of the list.
+members = {}
 member_id_counter = 1
 
+# Per-field indexes for the multi-field search: field -> value -> set of
+# member IDs. Names and gender are matched without regard to case.
+SEARCH_FIELDS = ["firstname", "lastname", "dob", "gender", "is_active"]
+member_indexes = {field: {} for field in SEARCH_FIELDS}
+
+# Member ID -> insertion number, so search results come back in the same
+# order as GET /members/ without scanning every member.
+member_positions = {}
+member_sequence = itertools.count()
+
+# Member ID -> the member as JSON bytes, serialized when it is stored.
+# GET /members/ sends these as they are: the members were validated on the
+# way in, so there is nothing to validate or serialize again on the way out.
+member_rows = {}
+member_version = 0  # Counts the writes, tells member_rows_snapshot whether it is current.
+rows_snapshot = (-1, ())  # (member_version, the rows in list order)
+
+# The sync routes run in FastAPI's threadpool. Every change to members,
+# member_rows, member_indexes and member_positions, and every read that
+# walks them, holds this lock.
+member_lock = threading.Lock()
+STREAM_CHUNK = 1000  # Members per chunk of the NDJSON stream.
+
+# In-memory storage for programs, keyed by program ID like the members.
+programs = {}
+program_version = 0  # Counts the program changes, tells program_age_tree whether its tree is current.
+
+# Every change to programs and age_tree, and every read that walks
+# programs, holds this lock, like member_lock for the members.
+program_lock = threading.Lock()
+
 app = FastAPI()
 
 # Pydantic Model for entity member (applicant)
@@ -69,9 +109,6 @@ class member(BaseModel):
     is_active: bool = True
 
 
-# =============================================
-# Additional models without API endpoints established yet!
-# =============================================
 # Pydantic Model for entity program
 class program(BaseModel):
     program_id: int
@@ -83,6 +120,10 @@ class program(BaseModel):
     max_age: int
     residency_required: bool = True
 
+
+# =============================================
+# Additional models without API endpoints established yet!
+# =============================================
 # Pydantic Model for entity address
 class address(BaseModel):
     address_id: int
@@ -103,7 +144,7 @@ class contact(BaseModel):
 # In-memory database with 10 example members. 
 # Each member stored as a dictionary
 # Transition to using MySQL should have at least 50.
-members = [
+example_members = [
     {"id": 1, "firstname": "Alice", "lastname": "Johnson", "dob": "1992-06-15", "gender": "Female", "is_active": True},
     {"id": 2, "firstname": "Bob", "lastname": "Smith", "dob": "1988-11-22", "gender": "Male", "is_active": False},
     {"id": 3, "firstname": "Charlie", "lastname": "Brown", "dob": "1995-04-08", "gender": "Non-binary", "is_active": True},
@@ -117,6 +158,174 @@ members = [
 ]
 
 
+# =============================================
+# Member storage and indexes
+# =============================================
+
+# The index key of a field value: names and gender without case, dates as
+# ISO text (the example members hold text, created members hold dates).
+def index_key(field, value):
+    if field in ("firstname", "lastname", "gender"):
+        return str(value).casefold()
+    if field == "dob":
+        return str(value)
+    return value
+
+# Add a member to the search indexes.
+def index_member(member_data: dict):
+    for field in SEARCH_FIELDS:
+        member_indexes[field].setdefault(index_key(field, member_data[field]), set()).add(member_data["id"])
+
+# Take a member out of the search indexes.
+def unindex_member(member_data: dict):
+    for field in SEARCH_FIELDS:
+        key = index_key(field, member_data[field])
+        ids = member_indexes[field][key]
+        ids.discard(member_data["id"])
+        if not ids:
+            del member_indexes[field][key]
+
+# Store a member and index it. Storing under an ID that is already there
+# keeps the member's place in the list.
+def add_member(member_data: dict):
+    global member_version
+    members[member_data["id"]] = member_data
+    member_rows[member_data["id"]] = orjson.dumps(member_data)
+    member_positions.setdefault(member_data["id"], next(member_sequence))
+    index_member(member_data)
+    member_version += 1
+
+# Remove a member from the store and the indexes.
+def remove_member(member_id: int):
+    global member_version
+    unindex_member(members.pop(member_id))
+    del member_rows[member_id]
+    del member_positions[member_id]
+    member_version += 1
+
+# The serialized rows of every member as of one moment, in list order.
+# Copied once per write, not per request: a stream keeps its copy while
+# the members change under it, and concurrent requests share one copy.
+def member_rows_snapshot():
+    global rows_snapshot
+    version, rows = rows_snapshot
+    if version != member_version:
+        with member_lock:
+            version = member_version
+            rows = tuple(member_rows.values())
+        rows_snapshot = (version, rows)
+    return rows
+
+# The NDJSON body, one member per line, sent a chunk of members at a time.
+def stream_member_rows(rows):
+    for start in range(0, len(rows), STREAM_CHUNK):
+        yield b"\n".join(rows[start:start + STREAM_CHUNK]) + b"\n"
+
+
+for example_member in example_members:
+    add_member(example_member)
+
+
+# =============================================
+# Program age windows
+# =============================================
+
+# A centered interval tree over the [min_age, max_age] windows of the
+# programs. Each node holds the windows that contain its center, sorted by
+# min_age and by max_age, the windows entirely below or above the center go
+# to the left or right subtree. Finding every window that contains an age
+# walks one path down the tree, O(log P + k) for k matches, instead of
+# checking all P programs.
+# Reference: de Berg, M. et al. (2008). Computational Geometry, 3rd ed., section 10.1 Interval Trees.
+class AgeIntervalTree:
+
+    def __init__(self, windows):
+        # windows: (min_age, max_age, program_id) tuples.
+        self.root = self._build(list(windows))
+
+    def _build(self, windows):
+        if not windows:
+            return None
+
+        # The median endpoint as the center keeps the tree balanced.
+        endpoints = sorted(age for low, high, _ in windows for age in (low, high))
+        center = endpoints[len(endpoints) // 2]
+
+        here = [window for window in windows if window[0] <= center <= window[1]]
+        return {
+            "center": center,
+            "by_min": sorted(here, key=lambda window: window[0]),
+            "by_max": sorted(here, key=lambda window: window[1], reverse=True),
+            "left": self._build([window for window in windows if window[1] < center]),
+            "right": self._build([window for window in windows if window[0] > center]),
+        }
+
+    # The program IDs of every window containing age.
+    def stab(self, age):
+        found = []
+        node = self.root
+        while node is not None:
+            if age < node["center"]:
+                # Every window here ends at or after the center, so only its start can rule it out.
+                for low, high, program_id in node["by_min"]:
+                    if low > age:
+                        break
+                    found.append(program_id)
+                node = node["left"]
+            elif age > node["center"]:
+                for low, high, program_id in node["by_max"]:
+                    if high < age:
+                        break
+                    found.append(program_id)
+                node = node["right"]
+            else:
+                found.extend(program_id for _, _, program_id in node["by_min"])
+                break
+        return found
+
+
+# The tree is rebuilt on the first lookup after a program changes; programs
+# change seldom, the lookups run on every intake. It is built outside the
+# lock from a copy of the windows, and only kept if no program changed
+# meanwhile.
+age_tree = None
+
+def program_age_tree():
+    global age_tree
+    with program_lock:
+        if age_tree is not None:
+            return age_tree
+        version = program_version
+        windows = [(p["min_age"], p["max_age"], p["program_id"]) for p in programs.values()]
+
+    tree = AgeIntervalTree(windows)
+    with program_lock:
+        if version == program_version:
+            age_tree = tree
+    return tree
+
+# Drop the tree after a program change, called under program_lock.
+def programs_changed():
+    global age_tree, program_version
+    program_version += 1
+    age_tree = None
+
+# A member's age in whole years today.
+def member_age(dob):
+    if isinstance(dob, str):
+        dob = date.fromisoformat(dob)
+    today = date.today()
+    return today.year - dob.year - ((dob.month, dob.day) > (today.month, today.day))
+
+# Store a program, refusing an age window that is upside down. Called
+# under program_lock.
+def save_program(program_data: dict):
+    if program_data["min_age"] > program_data["max_age"]:
+        raise HTTPException(status_code=422, detail="min_age must not be above max_age")
+    programs[program_data["program_id"]] = program_data
+    programs_changed()
+
+
 
 # =============================================
 # Establish the API Endpoints
@@ -130,42 +339,150 @@ def home():
 # Create a new member, if not existing
 @app.post("/members/", response_model=member)
 def create_member(member: member):
-    # Check if member ID already exists
-    if any(a["id"] == member.id for a in members):
-        raise HTTPException(status_code=400, detail="member already exists")
-    
-    members.append(member.dict())
+    with member_lock:
+        # Check if member ID already exists
+        if member.id in members:
+            raise HTTPException(status_code=400, detail="member already exists")
+
+        add_member(member.dict())
     return member
 
 # Get all members in demo list.
+# Accept: application/x-ndjson streams one member per line, the first bytes
+# leave before the last member is even looked at. Otherwise the JSON array
+# is joined from the stored rows. Both return a Response, so FastAPI does
+# not run the rows through response_model again; it stays for the docs.
 @app.get("/members/", response_model=List[member])
-def get_members():
-    return members
+def get_members(request: Request):
+    rows = member_rows_snapshot()
+
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(stream_member_rows(rows), media_type="application/x-ndjson")
+
+    return Response(b"[" + b",".join(rows) + b"]", media_type="application/json")
+
+# Multi-field search, every given field must match. Each field has its own
+# index, the ID sets are intersected smallest first.
+# Declared before /members/{member_id}, or "search" would be taken for an ID.
+@app.get("/members/search", response_model=List[member])
+def search_members(firstname: str = None, lastname: str = None, dob: date = None,
+                   gender: str = None, is_active: bool = None):
+    filters = {"firstname": firstname, "lastname": lastname, "dob": dob, "gender": gender, "is_active": is_active}
+    with member_lock:
+        candidates = [member_indexes[field].get(index_key(field, value), set())
+                      for field, value in filters.items() if value is not None]
+
+        if not candidates:
+            return list(members.values())
+
+        candidates.sort(key=len)
+        found = candidates[0].intersection(*candidates[1:])
+        return [members[member_id] for member_id in sorted(found, key=member_positions.get)]
 
 # Get an member by ID.
-# Determine how to support for multi-field search later.
 @app.get("/members/{member_id}", response_model=member)
 def get_member(member_id: int):
-    for member in members:
-        if member["id"] == member_id:
-            return member
+    member = members.get(member_id)  # One lookup, a DELETE can not land between a check and the read.
+    if member is not None:
+        return member
     raise HTTPException(status_code=404, detail="member was not found, try another search?")
 
 # Update an member, search is by ID
 # Reference: FastAPI. (n.d.). Body - Updates. FastAPI. Retrieved March 1, 2025, from https://fastapi.tiangolo.com/tutorial/body-updates/
 @app.put("/members/{member_id}", response_model=member)
 def update_member(member_id: int, updated_member: member):
-    for index, member in enumerate(members):
-        if member["id"] == member_id:
-            members[index] = updated_member.dict()
-            return updated_member
-    raise HTTPException(status_code=404, detail="member not found, try another?")
+    with member_lock:
+        if member_id not in members:
+            raise HTTPException(status_code=404, detail="member not found, try another?")
+
+        # A new ID must not land on another member.
+        if updated_member.id != member_id and updated_member.id in members:
+            raise HTTPException(status_code=400, detail="member already exists")
+
+        if updated_member.id == member_id:
+            unindex_member(members[member_id])  # Replaced in place, the member keeps its place in the list.
+        else:
+            remove_member(member_id)  # A new ID moves the member to the end.
+        add_member(updated_member.dict())
+    return updated_member
 
 # Delete an member by ID
 # Reference: FastAPI. (n.d.). First Steps. FastAPI. Retrieved March 1, 2025, from https://fastapi.tiangolo.com/tutorial/first-steps/
 @app.delete("/members/{member_id}")
 def delete_member(member_id: int):
-    global members
-    members = [member for member in members if member["id"] != member_id]
+    with member_lock:
+        if member_id in members:
+            remove_member(member_id)
     return {"message": "member deleted successfully"}
 
+# Programs whose age window contains the member's current age. With state,
+# programs that require residency must also be in that state.
+@app.get("/members/{member_id}/eligible-programs", response_model=List[program])
+def get_eligible_programs(member_id: int, state: str = None):
+    member = members.get(member_id)
+    if member is None:
+        raise HTTPException(status_code=404, detail="member was not found, try another search?")
+
+    program_ids = program_age_tree().stab(member_age(member["dob"]))
+    with program_lock:
+        # A tree built just before a delete may still name the program.
+        eligible = [programs[program_id] for program_id in program_ids if program_id in programs]
+    if state is not None:
+        eligible = [p for p in eligible if not p["residency_required"] or p["program_state"].casefold() == state.casefold()]
+
+    return sorted(eligible, key=lambda p: p["program_id"])
+
+
+# =============================================
+# Programs, same routes as the members.
+# =============================================
+
+# Create a new program, if not existing
+@app.post("/programs/", response_model=program)
+def create_program(program: program):
+    with program_lock:
+        if program.program_id in programs:
+            raise HTTPException(status_code=400, detail="program already exists")
+
+        save_program(program.dict())
+    return program
+
+# Get all programs.
+@app.get("/programs/", response_model=List[program])
+def get_programs():
+    with program_lock:
+        return list(programs.values())
+
+# Get a program by ID.
+@app.get("/programs/{program_id}", response_model=program)
+def get_program(program_id: int):
+    program = programs.get(program_id)
+    if program is not None:
+        return program
+    raise HTTPException(status_code=404, detail="program was not found, try another search?")
+
+# Update a program, search is by ID
+@app.put("/programs/{program_id}", response_model=program)
+def update_program(program_id: int, updated_program: program):
+    with program_lock:
+        if program_id not in programs:
+            raise HTTPException(status_code=404, detail="program not found, try another?")
+
+        # A new ID must not land on another program.
+        if updated_program.program_id != program_id and updated_program.program_id in programs:
+            raise HTTPException(status_code=400, detail="program already exists")
+
+        save_program(updated_program.dict())
+        if updated_program.program_id != program_id:
+            del programs[program_id]
+            programs_changed()
+    return updated_program
+
+# Delete a program by ID
+@app.delete("/programs/{program_id}")
+def delete_program(program_id: int):
+    with program_lock:
+        if programs.pop(program_id, None) is not None:
+            programs_changed()
+    return {"message": "program deleted successfully"}
+
@@ -0,0 +1,86 @@
+"""
+Script Name: [async_db_persistence.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	The async_db_persistence.py module provides an asyncio version of the
+    SQLite contact repository for the async def routes in main.py.
+
+    sqlite3 blocks, so the calls run on a dedicated executor: one thread per
+    connection in the pool, and a queue in front of them. An async route
+    awaits its call without holding a thread, the waiting requests sit in
+    the executor's queue instead of tying up the FastAPI threadpool, and a
+    thread never waits for a connection because there are as many
+    connections as threads.
+
+    The results and the HTTPExceptions are the same as SQLitePersistence.
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import asyncio # Import asyncio to await the calls on the executor.
+from concurrent.futures import ThreadPoolExecutor # Import ThreadPoolExecutor for the dedicated threads and their queue.
+
+from db_persistence import SQLitePersistence, SEARCH_LIMIT
+
+
+# The class for managing contact records from async code.
+class AsyncSQLitePersistence:
+
+    # Wrap a SQLitePersistence, a new one on db_path if none is given. Both
+    # share the connection pool (and the group commit writer, if any).
+    def __init__(self, db=None, db_path="contacts.db"):
+
+        self.db = db if db is not None else SQLitePersistence(db_path)
+        self._executor = ThreadPoolExecutor(max_workers=self.db.pool.size, thread_name_prefix="contact-db")
+
+    # Run one blocking call on the executor.
+    async def _run(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    # Stop the executor threads, the wrapped repository stays open.
+    def close(self):
+        self._executor.shutdown()
+
+
+# =============================================
+# Create, Read, Update, Delete (CRUD) methods as:
+# list (all), create, read, update, delete, for consistency.
+# =============================================
+
+    # Get all contact records, or one page of them.
+    async def list_contacts(self, limit: int = None, after: int = None):
+        return await self._run(self.db.list_contacts, limit, after)
+
+    # Create a new contact record.
+    async def create_contact(self, contact: dict):
+        return await self._run(self.db.create_contact, contact)
+
+    # Get a contact record by Contact_ID.
+    async def read_contact(self, contact_id: int):
+        return await self._run(self.db.read_contact, contact_id)
+
+    # Search the contacts by text, Last_Name prefix or Phone prefix.
+    async def search_contacts(self, text: str = None, last_name: str = None, phone: str = None, limit: int = SEARCH_LIMIT):
+        return await self._run(self.db.search_contacts, text, last_name, phone, limit)
+
+    # Create or update many contacts.
+    async def bulk_upsert_contacts(self, contacts: list, first_row: int = 0):
+        return await self._run(self.db.bulk_upsert_contacts, contacts, first_row)
+
+    # Update an existing contact by Contact_ID.
+    async def update_contact(self, contact_id: int, updated_contact: dict):
+        return await self._run(self.db.update_contact, contact_id, updated_contact)
+
+    # Delete a contact by Contact_ID.
+    async def delete_contact(self, contact_id: int):
+        return await self._run(self.db.delete_contact, contact_id)
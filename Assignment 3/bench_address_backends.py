@@ -0,0 +1,89 @@
+"""
+Script Name: [bench_address_backends.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Side-by-side benchmark of the two address backends, CSVPersistence and
+    ColumnarPersistence, on the same data. Measures the startup (open plus
+    the first read), list_addresses, warm read_address and a write mix.
+
+    Run with:
+        python bench_address_backends.py
+        python bench_address_backends.py 10000 100000 1000000
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import random # Import random to pick the records to read and write.
+import tempfile # Import tempfile to keep the test files out of the project.
+import time # Import time for the measurements.
+
+from bench_csv_append import make_file, new_address
+from csv_persistence import CSVPersistence
+from columnar_persistence import ColumnarPersistence, convert_csv
+
+SIZES = [10_000, 100_000]
+READS = 1000  # Warm read_address calls per backend.
+WRITES = 30  # Writes per backend, the csv backend rewrites the file on each.
+
+
+# Time a callable, return the result and the elapsed ms.
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+# Run the same workload against one backend.
+def run(name, open_backend, rows):
+
+    db, open_ms = timed(open_backend)
+    _, first_ms = timed(db.read_address, 1)
+    _, list_ms = timed(db.list_addresses)
+
+    ids = random.sample(range(1, rows + 1), READS)
+    start = time.perf_counter()
+    for address_id in ids:
+        db.read_address(address_id)
+    read_us = (time.perf_counter() - start) / READS * 1_000_000
+
+    start = time.perf_counter()
+    for i, address_id in enumerate(ids[:WRITES]):
+        if i % 2:
+            db.update_address(address_id, {"City": "Nampa"})
+        else:
+            db.create_address(new_address())
+    write_ms = (time.perf_counter() - start) / WRITES * 1000
+
+    print("{:<9} {:>10,} {:>12.1f} {:>10.1f} {:>12.2f} {:>10.3f}".format(
+        name, rows, open_ms + first_ms, list_ms, read_us, write_ms))
+
+
+def main(sizes):
+
+    print("{:<9} {:>10} {:>12} {:>10} {:>12} {:>10}".format(
+        "backend", "rows", "startup ms", "list ms", "read us", "write ms"))
+
+    with tempfile.TemporaryDirectory() as folder:
+        for rows in sizes:
+            csv_path = os.path.join(folder, "address_{}.csv".format(rows))
+            columns_folder = os.path.join(folder, "address_columns_{}".format(rows))
+
+            make_file(csv_path, rows)
+            convert_csv(csv_path, columns_folder)
+
+            run("csv", lambda: CSVPersistence(csv_path), rows)
+            run("columnar", lambda: ColumnarPersistence(columns_folder), rows)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or SIZES)
@@ -0,0 +1,129 @@
+"""
+Script Name: [bench_applicant_columnar.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Side-by-side benchmark of the two applicant stores, InMemoryPersistence
+    (one record per applicant) and ColumnarInMemoryPersistence (NumPy
+    columns), on the same applicants. Reports the memory per applicant and
+    the time of applicant_stats, the searches, read_applicant and a page of
+    list_applicants.
+
+    Run with:
+        python bench_applicant_columnar.py
+        python bench_applicant_columnar.py 100000
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import gc # Import gc to settle the heap before each measurement.
+import json # Import json to parse every applicant from its own body.
+import random # Import random to pick the applicants to read.
+import time # Import time for the measurements.
+import tracemalloc # Import tracemalloc to measure the memory.
+
+from bench_applicant_memory import make_bodies
+from in_memory_persistence import ApplicantRecord, InMemoryPersistence
+from in_memory_columnar_persistence import ColumnarInMemoryPersistence
+
+APPLICANTS = 1_000_000
+REPEAT = 5  # Runs per query, the best one is reported.
+READS = 1000
+
+
+# The record store. create_applicant insorts every DoB into the sorted
+# index, at a million applicants that alone takes minutes, so the records
+# are loaded the way a restart from a snapshot does.
+def load_records(bodies):
+
+    db = InMemoryPersistence()
+    records = []
+    for body in bodies:
+        record = ApplicantRecord(db.current_id, json.loads(body))
+        db.applicants[db.current_id] = record
+        records.append(record)
+        db.current_id += 1
+
+    db.ids = list(db.applicants)
+    db.indexes.add_all(records)
+    return db
+
+
+def load_columns(bodies):
+
+    db = ColumnarInMemoryPersistence()
+    for body in bodies:
+        db.create_applicant(json.loads(body))
+
+    return db
+
+
+# Load a store, return it with the seconds taken and the bytes per applicant.
+def load(loader, bodies):
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    db = loader(bodies)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return db, elapsed, (after - before) / len(bodies)
+
+
+# Best of REPEAT runs in ms.
+def best(function, *args):
+
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function(*args)
+        times.append((time.perf_counter() - start) * 1000)
+
+    return min(times)
+
+
+def read_many(db, ids):
+    for applicant_id in ids:
+        db.read_applicant(applicant_id)
+
+
+def main(count):
+
+    bodies = make_bodies(count)
+    ids = random.Random(6330).sample(range(1, count + 1), READS)
+    queries = [
+        ("stats, all", lambda db: db.applicant_stats({})),
+        ("stats, Idaho 18-24", lambda db: db.applicant_stats({"ResidencyState": "Idaho", "age_min": 18, "age_max": 24})),
+        ("search DoB, 1 year", lambda db: db.search_applicants({"DoB_from": "1990-01-01", "DoB_to": "1990-12-31"})),
+        ("search LastName+State", lambda db: db.search_applicants({"LastName": "Smith", "ResidencyState": "Utah"})),
+        ("read x{}".format(READS), lambda db: read_many(db, ids)),
+        ("list page of 100", lambda db: db.list_applicants(100, count // 2)),
+    ]
+
+    results = {}
+    for name, loader in (("records", load_records), ("columnar", load_columns)):
+        db, load_s, per_applicant = load(loader, bodies)
+        results[name] = [best(query, db) for _, query in queries]
+        print("{:<9} {:,} applicants loaded in {:.1f} s, {:.0f} bytes/applicant".format(name, count, load_s, per_applicant))
+        del db
+
+    print("{:<24} {:>12} {:>12}".format("ms (best of {})".format(REPEAT), "records", "columnar"))
+    for (name, _), records_ms, columnar_ms in zip(queries, results["records"], results["columnar"]):
+        print("{:<24} {:>12.2f} {:>12.2f}".format(name, records_ms, columnar_ms))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else APPLICANTS)
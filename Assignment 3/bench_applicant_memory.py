@@ -0,0 +1,99 @@
+"""
+Script Name: [bench_applicant_memory.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Memory benchmark for the applicant store. Loads N applicants the way the
+    API receives them (each one parsed from its own JSON body) into a plain
+    dictionary per applicant, the old storage, and into InMemoryPersistence,
+    and reports the bytes per applicant measured with tracemalloc.
+
+    Run with:
+        python bench_applicant_memory.py
+        python bench_applicant_memory.py 1000000
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import gc # Import gc to settle the heap before each measurement.
+import json # Import json to parse every applicant from its own body.
+import random # Import random to make up the applicants.
+import tracemalloc # Import tracemalloc to measure the memory.
+
+from in_memory_persistence import InMemoryPersistence
+
+APPLICANTS = 200_000
+FIRST_NAMES = ["Alice", "Bob", "Charlie", "Diana", "Edward", "Fiona", "George", "Hannah", "Isaac", "Julia"]
+LAST_NAMES = ["Johnson", "Smith", "Brown", "King", "White", "Adams", "Hill", "Scott", "Thomas", "Martin"]
+GENDERS = ["Female", "Male", "Non-binary"]
+STATES = ["Idaho", "Oregon", "Washington", "Utah", "Nevada", "Montana", "Wyoming"]
+
+
+# The request bodies, as JSON text.
+def make_bodies(count):
+
+    rng = random.Random(6330)
+    return [json.dumps({"FirstName": rng.choice(FIRST_NAMES), "LastName": rng.choice(LAST_NAMES),
+                        "DoB": "{}-{:02d}-{:02d}".format(rng.randint(1940, 2010), rng.randint(1, 12), rng.randint(1, 28)),
+                        "Gender": rng.choice(GENDERS), "ResidencyState": rng.choice(STATES)}) for _ in range(count)]
+
+
+# The old storage: the request dictionary itself, keyed by Applicant_ID.
+def load_dicts(bodies):
+
+    applicants = {}
+    for applicant_id, body in enumerate(bodies, 1):
+        applicant = json.loads(body)
+        applicant["Applicant_ID"] = applicant_id
+        applicants[applicant_id] = applicant
+
+    return applicants
+
+
+def load_store(bodies):
+
+    store = InMemoryPersistence()
+    for body in bodies:
+        store.create_applicant(json.loads(body))
+
+    return store
+
+
+# Bytes per applicant held by what load returns.
+def measure(load, bodies):
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = load(bodies)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+
+    return (after - before) / len(bodies)
+
+
+def main(count):
+
+    bodies = make_bodies(count)
+
+    dict_bytes = measure(load_dicts, bodies)
+    store_bytes = measure(load_store, bodies)
+
+    print("{:,} applicants".format(count))
+    print("{:<20} {:>10.0f} bytes/applicant".format("dict per applicant", dict_bytes))
+    print("{:<20} {:>10.0f} bytes/applicant ({:.0%} of the dicts)".format("InMemoryPersistence", store_bytes, store_bytes / dict_bytes))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else APPLICANTS)
@@ -0,0 +1,91 @@
+"""
+Script Name: [bench_applicant_restart.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Restart benchmark for the applicant store with a data folder. Loads N
+    applicants through create_applicant, then times a restart that has to
+    replay the whole journal (the cost of a full rebuild) against restarts
+    from a snapshot plus a journal tail of a few sizes. With the snapshot
+    the restart should grow with the tail, not with N.
+
+    Run with:
+        python bench_applicant_restart.py
+        python bench_applicant_restart.py 1000000
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import json # Import json to parse every applicant from its own body.
+import tempfile # Import tempfile to keep the data folders out of the project.
+import time # Import time for the measurements.
+
+from bench_applicant_memory import make_bodies
+from in_memory_persistence import InMemoryPersistence
+
+APPLICANTS = 200_000
+TAILS = [0, 1000, 10_000, 100_000]  # Journal lines written after the snapshot.
+NEVER = 10 ** 12  # snapshot_every that keeps the background snapshots out of the way.
+
+
+# Time opening the data folder, return the store and the elapsed ms.
+def restart(folder):
+    start = time.perf_counter()
+    db = InMemoryPersistence(folder, snapshot_every=NEVER)
+    return db, (time.perf_counter() - start) * 1000
+
+
+def main(count):
+
+    bodies = make_bodies(count)
+
+    with tempfile.TemporaryDirectory() as folder:
+        db = InMemoryPersistence(folder, snapshot_every=NEVER)
+        start = time.perf_counter()
+        for body in bodies:
+            db.create_applicant(json.loads(body))
+        load_s = time.perf_counter() - start
+        db.close()
+
+        print("{:,} applicants created in {:.1f} s".format(count, load_s))
+        print("{:<24} {:>12} {:>12}".format("restart", "journal", "ms"))
+
+        # Journal only: every applicant is replayed, like a full rebuild.
+        db, ms = restart(folder)
+        print("{:<24} {:>12,} {:>12.1f}".format("journal only", count, ms))
+
+        start = time.perf_counter()
+        db.snapshot()
+        snapshot_ms = (time.perf_counter() - start) * 1000
+        size = os.path.getsize(os.path.join(folder, "applicants.snapshot"))
+        print("{:<24} {:>12} {:>12.1f}   ({:.1f} MB)".format("writing the snapshot", "", snapshot_ms, size / 1e6))
+
+        # Snapshot plus a growing tail, half updates and half creates. Each
+        # restart starts a new journal, the tail carries on across them.
+        written = 0
+        for tail in TAILS:
+            for i in range(written, tail):
+                if i % 2:
+                    db.update_applicant(i + 1, json.loads(bodies[i]))
+                else:
+                    db.create_applicant(json.loads(bodies[i]))
+            written = tail
+            db.close()
+
+            db, ms = restart(folder)
+            print("{:<24} {:>12,} {:>12.1f}".format("snapshot + tail", tail, ms))
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else APPLICANTS)
@@ -0,0 +1,109 @@
+"""
+Script Name: [bench_applicant_tiers.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Benchmark of the tiered applicant store against InMemoryPersistence.
+    Loads the same applicants into InMemoryPersistence and into
+    TieredApplicantPersistence with a few memory budgets, then reads them
+    by ID. Some applicants are read far more often than others (Zipf,
+    s = 1.1). Reports how much the process grew (RSS), the reads per
+    second, the p50/p99 latency and the hot tier hit rate. Every store runs
+    in its own process.
+
+    Run with:
+        python bench_applicant_tiers.py
+        python bench_applicant_tiers.py 1000000 16 64 256
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import itertools # Import itertools for the cumulative Zipf weights.
+import json # Import json to parse the applicants and pass the results back.
+import random # Import random for the IDs.
+import subprocess # Import subprocess to run every store on its own.
+import time # Import time for the measurements.
+
+from bench_applicant_columnar import load_records
+from bench_applicant_memory import make_bodies
+from bench_repositories import rss_mb
+from tiered_persistence import TieredApplicantPersistence
+
+APPLICANTS = 500_000
+BUDGETS_MB = [16, 64, 256]
+READS = 100_000
+ZIPF = 1.1
+
+
+# Load the applicants, read them, return the results.
+def run(count, budget_mb):
+
+    bodies = make_bodies(count)
+    rng = random.Random(6330)
+    ids = list(range(1, count + 1))
+    rng.shuffle(ids)  # The popular applicants are spread over the IDs.
+    targets = rng.choices(ids, cum_weights=list(itertools.accumulate(1 / rank ** ZIPF for rank in range(1, count + 1))), k=READS)
+    del ids
+    before, _ = rss_mb()
+
+    start = time.perf_counter()
+    if budget_mb:
+        db = TieredApplicantPersistence(budget_mb * 1024 * 1024)
+        for body in bodies:
+            db.create_applicant(json.loads(body))
+    else:
+        db = load_records(bodies)
+    load_s = time.perf_counter() - start
+    del bodies
+
+    latencies = []
+    start = time.perf_counter()
+    for applicant_id in targets:
+        began = time.perf_counter_ns()
+        db.read_applicant(applicant_id)
+        latencies.append(time.perf_counter_ns() - began)
+    read_s = time.perf_counter() - start
+
+    _, peak = rss_mb()
+    latencies.sort()
+    hit_rate = None
+    if budget_mb:
+        stats = db.tier_stats()
+        hit_rate = stats["hot_hit_rate"]
+        db.close()
+
+    return {"load_s": load_s, "reads_s": READS / read_s, "p50_us": latencies[len(latencies) // 2] / 1000,
+            "p99_us": latencies[len(latencies) * 99 // 100] / 1000, "memory_mb": peak - before, "hit_rate": hit_rate}
+
+
+def main(count, budgets):
+
+    print("{:,} applicants, {:,} Zipf reads by ID".format(count, READS))
+    print("{:<18} {:>8} {:>10} {:>9} {:>9} {:>9} {:>9}".format("store", "load s", "reads/s", "p50 us", "p99 us", "hot hits", "MB"))
+
+    for budget_mb in [0] + budgets:
+        output = subprocess.run([sys.executable, __file__, "--run", str(count), str(budget_mb)],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.splitlines()[-1])
+        name = "tiered {} MB".format(budget_mb) if budget_mb else "in memory"
+        hit_rate = "{:.1%}".format(result["hit_rate"]) if result["hit_rate"] is not None else "-"
+        print("{:<18} {:>8.1f} {:>10,.0f} {:>9.1f} {:>9.1f} {:>9} {:>9.1f}".format(
+            name, result["load_s"], result["reads_s"], result["p50_us"], result["p99_us"], hit_rate, result["memory_mb"]))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    if args[:1] == ["--run"]:
+        print(json.dumps(run(int(args[1]), int(args[2]))))
+    else:
+        main(int(args[0]) if args else APPLICANTS, [int(budget) for budget in args[1:]] or BUDGETS_MB)
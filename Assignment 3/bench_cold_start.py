@@ -0,0 +1,118 @@
+"""
+Script Name: [bench_cold_start.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Cold-start benchmark of the API, the cost a new worker pays before it
+    can answer. Runs in a copy of the project in a temporary folder, with
+    the lazy backends (the default) and with BACKENDS_EAGER=1:
+
+        import   python -X importtime -c "import main", the total and the
+                 slowest imports
+        first    a new uvicorn process, the time from starting it to the
+                 first answer of one route (median of a few runs)
+
+    Run with:
+        python bench_cold_start.py
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import glob # Import glob to find the project files to copy.
+import http.client # Import http.client for the first requests.
+import shutil # Import shutil to copy the project.
+import socket # Import socket to find a free port.
+import statistics # Import statistics for the medians.
+import subprocess # Import subprocess to start Python and uvicorn.
+import tempfile # Import tempfile to keep the data files out of the project.
+import time # Import time for the measurements.
+
+MODES = {"lazy": {}, "eager": {"BACKENDS_EAGER": "1"}}
+ROUTES = ["/", "/applicant/1", "/address/1", "/contact/1"]
+RUNS = 3
+SLOWEST = 8  # Imports listed per mode.
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# Import main with -X importtime, return the total ms and the slowest
+# imports main asked for (directly or one level down) as (ms, name).
+def import_time(folder, env):
+
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=folder, env=env,
+                            capture_output=True, text=True, check=True).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative) / 1000, name.rstrip()))
+
+    total = next(ms for ms, name in imports if name.strip() == "main")
+    nested = [(ms, name.strip()) for ms, name in imports if len(name) - len(name.lstrip()) <= 3 and name.strip() != "main"]
+    return total, sorted(nested, reverse=True)[:SLOWEST]
+
+
+# Start uvicorn and ask for the route until it answers, return the ms from
+# the start of the process to the answer.
+def first_response(folder, env, route):
+
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                              cwd=folder, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                connection.request("GET", route)
+                connection.getresponse().read()
+                connection.close()
+                return (time.perf_counter() - start) * 1000
+            except ConnectionRefusedError:
+                time.sleep(0.005)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+
+    with tempfile.TemporaryDirectory() as folder:
+        for path in glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py")):
+            shutil.copy(path, folder)
+
+        # Make address.csv and contacts.db once, so every run starts with them like a deployed worker.
+        subprocess.run([sys.executable, "-c", "import main; main.address_db.get(); main.sqlite_db.get()"],
+                       cwd=folder, capture_output=True, check=True)
+
+        results = {}
+        for mode, extra in MODES.items():
+            env = dict(os.environ, **extra)
+            total, slowest = import_time(folder, env)
+            print("{}: import main {:.0f} ms, slowest imports:".format(mode, total))
+            for ms, name in slowest:
+                print("    {:>8.0f} ms  {}".format(ms, name))
+            results[mode] = [statistics.median(first_response(folder, env, route) for _ in range(RUNS)) for route in ROUTES]
+
+        print("time to first response, ms (median of {})".format(RUNS))
+        print("{:<16} {:>10} {:>10}".format("route", *MODES))
+        for i, route in enumerate(ROUTES):
+            print("{:<16} {:>10.0f} {:>10.0f}".format(route, *(results[mode][i] for mode in MODES)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Script Name: [bench_contact_bulk.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Load benchmark for contacts. Compares one create_contact (one commit) per
+    row against bulk_upsert_contacts, then sends the same rows as NDJSON to
+    POST /contacts/bulk on a uvicorn server.
+
+    Run with:
+        python bench_contact_bulk.py
+        python bench_contact_bulk.py 500000
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import json # Import json to write the NDJSON body.
+import tempfile # Import tempfile to keep the test databases out of the project.
+import time # Import time for the measurements.
+
+import httpx # Import httpx to post the NDJSON body.
+
+from bench_contact_routes import start_server
+from db_persistence import SQLitePersistence
+
+ROWS = 200_000
+SINGLE_ROWS = 2000  # Rows loaded one at a time, the rate is extrapolated.
+
+
+def make_contacts(count):
+    return [{"First_Name": "Bulk", "Last_Name": "Load{}".format(i), "Phone": "555-{:03d}-{:04d}".format(i % 1000, i % 10000),
+             "Applicant_Relationship": "Parent"} for i in range(count)]
+
+
+def main(rows):
+
+    contacts = make_contacts(rows)
+
+    with tempfile.TemporaryDirectory() as folder:
+        db = SQLitePersistence(os.path.join(folder, "single.db"))
+        start = time.perf_counter()
+        for contact in contacts[:SINGLE_ROWS]:
+            db.create_contact(dict(contact))
+        single = SINGLE_ROWS / (time.perf_counter() - start)
+        db.close()
+        print("{:<22} {:>10,.0f} rows/s, {:,} rows would take {:.0f} s".format("create_contact", single, rows, rows / single))
+
+        db = SQLitePersistence(os.path.join(folder, "bulk.db"))
+        start = time.perf_counter()
+        result = db.bulk_upsert_contacts(contacts)
+        elapsed = time.perf_counter() - start
+        db.close()
+        print("{:<22} {:>10,.0f} rows/s, {:,} rows in {:.1f} s".format("bulk_upsert_contacts", rows / elapsed, result["created"], elapsed))
+
+        server, port = start_server(folder)
+        try:
+            body = "".join(json.dumps(contact) + "\n" for contact in contacts).encode()
+            start = time.perf_counter()
+            response = httpx.post("http://127.0.0.1:{}/contacts/bulk".format(port), content=body,
+                                  headers={"Content-Type": "application/x-ndjson"}, timeout=600)
+            elapsed = time.perf_counter() - start
+            response.raise_for_status()
+            print("{:<22} {:>10,.0f} rows/s, {:,} rows in {:.1f} s".format("POST /contacts/bulk", rows / elapsed, response.json()["created"], elapsed))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)
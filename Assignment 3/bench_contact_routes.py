@@ -0,0 +1,139 @@
+"""
+Script Name: [bench_contact_routes.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Load test of the sync /contact routes against the async /async/contact
+    routes. Starts the API with uvicorn on a scratch contacts.db, then C
+    concurrent clients send a mix of reads (90%) and creates (10%) for a
+    few seconds. Reports the requests per second and the p50/p99 latency.
+
+    Run with:
+        python bench_contact_routes.py
+        python bench_contact_routes.py 50 500 1000
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import asyncio # Import asyncio to run the clients concurrently.
+import json # Import json for the request bodies.
+import random # Import random to pick the contacts and the operations.
+import socket # Import socket to find a free port.
+import statistics # Import statistics for the latency percentiles.
+import subprocess # Import subprocess to run uvicorn.
+import tempfile # Import tempfile to keep the test database out of the project.
+import time # Import time for the measurements.
+
+import httpx # Import httpx to wait for the server to start.
+
+CONCURRENCY = [50, 500]
+DURATION = 5.0  # Seconds per run.
+WRITE_RATIO = 0.1  # Share of the requests that create a contact.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# Ask the OS for a free port.
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# Start uvicorn in a scratch folder, so contacts.db and address.csv are new
+# files there. Returns the process and the port once it answers.
+def start_server(folder):
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", APP_DIR, "--port", str(port), "--log-level", "warning"],
+        cwd=folder, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = "http://127.0.0.1:{}".format(port)
+
+    for _ in range(100):
+        try:
+            httpx.get(url + "/")
+            return server, port
+        except httpx.TransportError:
+            time.sleep(0.1)
+
+    server.kill()
+    raise RuntimeError("uvicorn did not start.")
+
+
+# Send one request on a keep-alive connection and read the response.
+# A bare HTTP/1.1 client, httpx's own overhead hides the server at these
+# client counts on a small machine. Returns the status code.
+async def request(reader, writer, method, path, body=b""):
+
+    writer.write("{} {} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\nContent-Length: {}\r\n\r\n".format(
+        method, path, len(body)).encode() + body)
+    await writer.drain()
+
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    await reader.readexactly(length)
+
+    return int(head.split(b" ")[1])
+
+
+# C clients send requests to one route family for DURATION seconds.
+# Returns requests/s and the latencies in ms.
+async def load(port, prefix, concurrency):
+
+    latencies = []
+    body = json.dumps({"First_Name": "Load", "Last_Name": "Test", "Phone": "555-000-0000", "Applicant_Relationship": "Parent"}).encode()
+    deadline = time.perf_counter() + DURATION
+
+    async def client(n):
+        rng = random.Random(n)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            if rng.random() < WRITE_RATIO:
+                status = await request(reader, writer, "POST", prefix + "/contact/", body)
+            else:
+                status = await request(reader, writer, "GET", "{}/contact/{}".format(prefix, rng.randint(1, 10)))
+            if status != 200:
+                raise RuntimeError("HTTP {}".format(status))
+            latencies.append((time.perf_counter() - start) * 1000)
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client(n) for n in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    return len(latencies) / elapsed, latencies
+
+
+def main(concurrency_levels):
+
+    print("{:<6} {:>8} {:>10} {:>8} {:>9}".format("routes", "clients", "req/s", "p50 ms", "p99 ms"))
+
+    with tempfile.TemporaryDirectory() as folder:
+        server, port = start_server(folder)
+        try:
+            for concurrency in concurrency_levels:
+                for name, prefix in (("sync", ""), ("async", "/async")):
+                    rate, latencies = asyncio.run(load(port, prefix, concurrency))
+                    percentiles = statistics.quantiles(latencies, n=100)
+                    print("{:<6} {:>8} {:>10,.0f} {:>8.1f} {:>9.1f}".format(
+                        name, concurrency, rate, percentiles[49], percentiles[98]))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main([int(concurrency) for concurrency in sys.argv[1:]] or CONCURRENCY)
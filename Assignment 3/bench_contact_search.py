@@ -0,0 +1,110 @@
+"""
+Script Name: [bench_contact_search.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Lookup benchmark for search_contacts on a large contact table. Fills a
+    scratch database (the FTS5 triggers run on every insert), then times
+    full-text, Last_Name prefix and Phone prefix searches against a scan of
+    the whole table, which is what finding a contact took before.
+
+    Run with:
+        python bench_contact_search.py
+        python bench_contact_search.py 100000
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import random # Import random to make up the contacts and the searches.
+import sqlite3 # Import sqlite3 to fill the database in bulk.
+import tempfile # Import tempfile to keep the test database out of the project.
+import time # Import time for the measurements.
+
+from fastapi import HTTPException
+from db_persistence import SQLitePersistence
+
+CONTACTS = 1_000_000
+SEARCHES = 200  # Searches per kind.
+FIRST_NAMES = ["Alice", "Bob", "Charlie", "Diana", "Edward", "Fiona", "George", "Hannah", "Isaac", "Julia",
+               "Kevin", "Laura", "Miguel", "Nora", "Oscar", "Priya", "Quinn", "Rosa", "Samuel", "Tara"]
+RELATIONSHIPS = ["Parent", "Guardian", "Sibling", "Spouse", "Friend"]
+
+
+# A made up last name, common enough to repeat across the table.
+def last_name(rng):
+    return "".join(rng.choice("bcdfghklmnprstvz") + rng.choice("aeiou") for _ in range(3)).capitalize()
+
+
+# Fill a new database with count contacts.
+def make_db(path, count, rng):
+
+    SQLitePersistence(path).close()
+    connection = sqlite3.connect(path)
+    for start in range(0, count, 100_000):
+        connection.executemany(
+            "INSERT INTO contact (First_Name, Last_Name, Phone, Applicant_Relationship) VALUES (?, ?, ?, ?)",
+            [(rng.choice(FIRST_NAMES), last_name(rng), "555-{:03d}-{:04d}".format(rng.randrange(1000), rng.randrange(10000)),
+              rng.choice(RELATIONSHIPS)) for _ in range(min(100_000, count - start))])
+        connection.commit()
+    connection.close()
+
+
+# Run the searches, return the average ms and the average number of matches.
+def timed(db, searches):
+
+    found = 0
+    start = time.perf_counter()
+    for arguments in searches:
+        try:
+            found += len(db.search_contacts(**arguments))
+        except HTTPException:
+            pass
+
+    return (time.perf_counter() - start) / len(searches) * 1000, found / len(searches)
+
+
+def main(count):
+
+    rng = random.Random(6330)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "contacts.db")
+        start = time.perf_counter()
+        make_db(path, count, rng)
+        print("{:,} contacts loaded in {:.1f} s".format(count, time.perf_counter() - start))
+
+        db = SQLitePersistence(path)
+        names = [last_name(rng) for _ in range(SEARCHES)]
+        searches = {
+            "text, full word": [{"text": "{} {}".format(rng.choice(FIRST_NAMES), name)} for name in names],
+            "text, prefixes": [{"text": "{} {}".format(rng.choice(FIRST_NAMES)[:3], name[:4])} for name in names],
+            "Last_Name prefix": [{"last_name": name[:5]} for name in names],
+            "Phone prefix": [{"phone": "555-{:03d}-{:02d}".format(rng.randrange(1000), rng.randrange(100))} for _ in names],
+        }
+
+        print("{:<18} {:>10} {:>10}".format("search", "ms", "matches"))
+        for name, arguments in searches.items():
+            ms, found = timed(db, arguments)
+            print("{:<18} {:>10.3f} {:>10.1f}".format(name, ms, found))
+
+        # What a lookup cost before: scan the table for the name.
+        with db.pool.connection() as connection:
+            start = time.perf_counter()
+            for name in names[:10]:
+                connection.execute("SELECT * FROM contact WHERE lower(Last_Name) LIKE ?", (name[:5].lower() + "%",)).fetchall()
+            print("{:<18} {:>10.3f}".format("table scan", (time.perf_counter() - start) / 10 * 1000))
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else CONTACTS)
@@ -0,0 +1,103 @@
+"""
+Script Name: [bench_csv_append.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Benchmarks the write latency of CSVPersistence as the address file grows.
+    The append-only mode should stay flat from 10k to 1M rows, the default
+    rewrite mode grows with the file size since every write reloads and
+    rewrites the whole csv file.
+
+    Run with:
+        python bench_csv_append.py
+        python bench_csv_append.py 10000 100000
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import csv # Import csv to generate the test files quickly.
+import random # Import random to pick the records to update and delete.
+import statistics # Import statistics for the latency percentiles.
+import tempfile # Import tempfile to keep the test files out of the project.
+import time # Import time for the latency measurements.
+
+from csv_persistence import CSVPersistence, COLUMNS
+
+SIZES = [10_000, 100_000, 1_000_000]
+APPEND_OPS = 1000  # Writes per size in append-only mode.
+REWRITE_OPS = 20  # Writes per size in rewrite mode, each one rewrites the file.
+CITIES = ["Boise", "Nampa", "Meridian", "Idaho Falls", "Pocatello", "Twin Falls", "Lewiston", "Rexburg"]
+
+
+# Write a csv file with the given number of addresses.
+def make_file(path, rows):
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for address_id in range(1, rows + 1):
+            writer.writerow([address_id, address_id % 9999, "Main St", CITIES[address_id % len(CITIES)],
+                             "ID", 83000 + address_id % 999, "Home", address_id % 500, "Self"])
+
+
+# A new address to create.
+def new_address():
+    return {"Street_No": 100, "Street": "Oak Dr", "City": "Boise", "State": "ID",
+            "Zip": 83702, "Type": "Home", "OwnerID": 1, "OwnerType": "Self"}
+
+
+# Run a mix of creates, updates and deletes, return the latencies in ms.
+def run_writes(db, rows, ops):
+
+    ids = random.sample(range(1, rows + 1), ops)
+    latencies = []
+
+    for i, address_id in enumerate(ids):
+        start = time.perf_counter()
+        if i % 3 == 0:
+            db.create_address(new_address())
+        elif i % 3 == 1:
+            db.update_address(address_id, {"City": "Nampa"})
+        else:
+            db.delete_address(address_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return latencies
+
+
+# Format the latency summary for one run.
+def report(mode, rows, latencies):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print("{:<8} {:>10,} {:>6} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+        mode, rows, len(latencies), statistics.mean(latencies), statistics.median(latencies), p99))
+
+
+def main(sizes):
+
+    print("{:<8} {:>10} {:>6} {:>10} {:>10} {:>10}".format("mode", "rows", "ops", "mean ms", "p50 ms", "p99 ms"))
+
+    with tempfile.TemporaryDirectory() as folder:
+        for rows in sizes:
+            path = os.path.join(folder, "address_{}.csv".format(rows))
+
+            make_file(path, rows)
+            db = CSVPersistence(path, append_only=True)
+            report("append", rows, run_writes(db, rows, APPEND_OPS))
+
+            make_file(path, rows)
+            db = CSVPersistence(path)
+            report("rewrite", rows, run_writes(db, rows, REWRITE_OPS))
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or SIZES)
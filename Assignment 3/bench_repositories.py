@@ -0,0 +1,133 @@
+"""
+Script Name: [bench_repositories.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Benchmark of the storage backends of repository.py on one workload. For
+    each backend and size it loads that many records with create_many, then
+    runs the same mix of CRUD calls:
+
+        65% read, 5% list (a page of 100), 15% update, 10% create, 5% delete
+
+    and reports the load time, the throughput of the mix, the p50 and p99
+    latency per call and the memory the process grew by (peak RSS over the
+    RSS before the load). Every backend and size runs in its own process, so
+    the memory of one does not count for the next.
+
+    Run with:
+        python bench_repositories.py
+        python bench_repositories.py applicant 1000 100000
+        python bench_repositories.py --backends memory,sqlite contact 1000000
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import json # Import json to pass the results back from the child processes.
+import random # Import random for the mix and the IDs.
+import resource # Import resource for the peak memory of a process.
+import subprocess # Import subprocess to run every backend and size on its own.
+import tempfile # Import tempfile to keep the csv and SQLite files out of the project.
+import time # Import time for the measurements.
+
+from repository import ENTITIES, open_repository
+
+SIZES = [1000, 100_000, 1_000_000]
+BACKENDS = ["memory", "csv", "sqlite"]
+OPERATIONS = 20_000  # Calls in the mix.
+MIX = [("read", 65), ("list", 5), ("update", 15), ("create", 10), ("delete", 5)]
+PAGE = 100
+BATCH = 10_000  # Records per create_many while loading.
+
+
+# Memory in MB the process has now, and the most it had.
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        current = int(f.read().split()[1]) * resource.getpagesize()
+    return current / 1e6, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def make_record(entity, i):
+    return {field: "{}{}".format(field, i % 997) for field in entity.fields}
+
+
+# Load count records, run the mix, return the results.
+def run(entity_name, backend, count):
+
+    entity = ENTITIES[entity_name]
+    rng = random.Random(6330)
+    operations = rng.choices([name for name, _ in MIX], [weight for _, weight in MIX], k=OPERATIONS)
+    before, _ = rss_mb()
+
+    with tempfile.TemporaryDirectory() as folder:
+        repository = open_repository(entity_name, backend, folder=folder)
+
+        start = time.perf_counter()
+        ids = []
+        for first in range(0, count, BATCH):
+            created = repository.create_many([make_record(entity, i) for i in range(first, min(first + BATCH, count))])
+            ids += [record[entity.id_field] for record in created]
+        load_s = time.perf_counter() - start
+
+        latencies = []
+        start = time.perf_counter()
+        for i, operation in enumerate(operations):
+            began = time.perf_counter_ns()
+            if operation == "read":
+                repository.read(rng.choice(ids))
+            elif operation == "list":
+                repository.list(PAGE, rng.choice(ids))
+            elif operation == "update":
+                repository.update(rng.choice(ids), dict(make_record(entity, i), **{entity.fields[0]: "Updated{}".format(i)}))
+            elif operation == "create":
+                ids.append(repository.create(make_record(entity, i))[entity.id_field])
+            else:
+                # Swap the deleted ID to the end, so the list stays cheap to shrink.
+                position = rng.randrange(len(ids))
+                ids[position], ids[-1] = ids[-1], ids[position]
+                repository.delete(ids.pop())
+            latencies.append(time.perf_counter_ns() - began)
+        mix_s = time.perf_counter() - start
+
+        repository.close()
+
+    _, peak = rss_mb()
+    latencies.sort()
+    return {"load_s": load_s, "ops_s": OPERATIONS / mix_s,
+            "p50_us": latencies[len(latencies) // 2] / 1000, "p99_us": latencies[len(latencies) * 99 // 100] / 1000,
+            "memory_mb": peak - before}
+
+
+def main(entity_name, backends, sizes):
+
+    print("{} records, {:,} calls: {}".format(entity_name, OPERATIONS, ", ".join("{}% {}".format(w, n) for n, w in MIX)))
+    print("{:<8} {:>10} {:>8} {:>10} {:>9} {:>9} {:>9}".format("backend", "records", "load s", "ops/s", "p50 us", "p99 us", "MB"))
+
+    for backend in backends:
+        for count in sizes:
+            output = subprocess.run([sys.executable, __file__, "--run", entity_name, backend, str(count)],
+                                    capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.splitlines()[-1])
+            print("{:<8} {:>10,} {:>8.2f} {:>10,.0f} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+                backend, count, result["load_s"], result["ops_s"], result["p50_us"], result["p99_us"], result["memory_mb"]))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    if args[:1] == ["--run"]:
+        print(json.dumps(run(args[1], args[2], int(args[3]))))
+    else:
+        backends = BACKENDS
+        if args[:1] == ["--backends"]:
+            backends = args[1].split(",")
+            args = args[2:]
+        main(args[0] if args else "applicant", backends, [int(size) for size in args[1:]] or SIZES)
@@ -0,0 +1,90 @@
+"""
+Script Name: [bench_repository_cache.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Sizing benchmark of the read-through cache of cached_repository.py on a
+    read-heavy mix: 95% reads by ID, 5% updates. Some records are read far
+    more often than others (Zipf, s = 1.1), like the applicants being worked
+    on this week. Runs the mix on a repository without the cache and with
+    caches of a few sizes, and reports the throughput, p50/p99 latency, the
+    hit rate and the evictions.
+
+    Run with:
+        python bench_repository_cache.py
+        python bench_repository_cache.py sqlite 1000000
+        python bench_repository_cache.py csv 100000
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import itertools # Import itertools for the cumulative Zipf weights.
+import random # Import random for the mix and the IDs.
+import tempfile # Import tempfile to keep the csv and SQLite files out of the project.
+import time # Import time for the measurements.
+
+from bench_repositories import BATCH, make_record
+from cached_repository import CachedRepository
+from repository import ENTITIES, open_repository
+
+RECORDS = 100_000
+OPERATIONS = 50_000
+READS = 0.95
+ZIPF = 1.1
+CACHE_SIZES = [0, 1000, 10_000, 100_000]  # 0 is the repository without the cache.
+
+
+def main(backend, count):
+
+    entity = ENTITIES["contact"]
+    rng = random.Random(6330)
+    cum_weights = list(itertools.accumulate(1 / rank ** ZIPF for rank in range(1, count + 1)))
+
+    with tempfile.TemporaryDirectory() as folder:
+        repository = open_repository("contact", backend, folder=folder)
+        ids = []
+        for first in range(0, count, BATCH):
+            created = repository.create_many([make_record(entity, i) for i in range(first, min(first + BATCH, count))])
+            ids += [record[entity.id_field] for record in created]
+
+        # The popular records are spread over the IDs, not the first ones.
+        rng.shuffle(ids)
+        targets = rng.choices(ids, cum_weights=cum_weights, k=OPERATIONS)
+        reads = [rng.random() < READS for _ in range(OPERATIONS)]
+
+        print("{} contacts on {}, {:,} calls, {:.0%} reads".format(count, backend, OPERATIONS, READS))
+        print("{:>8} {:>10} {:>9} {:>9} {:>9} {:>10}".format("cache", "ops/s", "p50 us", "p99 us", "hit rate", "evictions"))
+
+        for size in CACHE_SIZES:
+            cache = CachedRepository(repository, size) if size else repository
+            latencies = []
+            start = time.perf_counter()
+            for i, (record_id, read) in enumerate(zip(targets, reads)):
+                began = time.perf_counter_ns()
+                if read:
+                    cache.read(record_id)
+                else:
+                    cache.update(record_id, dict(make_record(entity, i), Phone="Phone{}".format(i)))
+                latencies.append(time.perf_counter_ns() - began)
+            elapsed = time.perf_counter() - start
+
+            latencies.sort()
+            stats = cache.stats() if size else {"hit_rate": 0, "evictions": 0}
+            print("{:>8,} {:>10,.0f} {:>9.1f} {:>9.1f} {:>9.1%} {:>10,}".format(
+                size, OPERATIONS / elapsed, latencies[len(latencies) // 2] / 1000,
+                latencies[len(latencies) * 99 // 100] / 1000, stats["hit_rate"], stats["evictions"]))
+
+        repository.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "sqlite", int(sys.argv[2]) if len(sys.argv) > 2 else RECORDS)
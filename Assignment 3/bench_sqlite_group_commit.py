@@ -0,0 +1,82 @@
+"""
+Script Name: [bench_sqlite_group_commit.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Write benchmark for the group commit mode of SQLitePersistence. N threads
+    create contacts as fast as they can, like an intake-day import, once with
+    a commit per write and once with the group commit. Reports the writes per
+    second and the p50/p99 latency of create_contact.
+
+    Run with:
+        python bench_sqlite_group_commit.py
+        python bench_sqlite_group_commit.py 1 8 32 64
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import statistics # Import statistics for the latency percentiles.
+import tempfile # Import tempfile to keep the test databases out of the project.
+import threading # Import threading for the client threads.
+import time # Import time for the measurements.
+
+from db_persistence import SQLitePersistence
+
+THREADS = [1, 8, 32, 64]
+DURATION = 2.0  # Seconds per run.
+
+
+# Create contacts from N threads for DURATION seconds. Returns writes/s and
+# the create_contact latencies in ms.
+def run(db, threads):
+
+    stop = threading.Event()
+    latencies = [[] for _ in range(threads)]
+
+    def client(n):
+        while not stop.is_set():
+            contact = {"First_Name": "Intake", "Last_Name": str(n), "Phone": "555-000-0000", "Applicant_Relationship": "Parent"}
+            start = time.perf_counter()
+            db.create_contact(contact)
+            latencies[n].append((time.perf_counter() - start) * 1000)
+
+    clients = [threading.Thread(target=client, args=(n,)) for n in range(threads)]
+    for thread in clients:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in clients:
+        thread.join()
+
+    latencies = [latency for thread in latencies for latency in thread]
+    return len(latencies) / DURATION, latencies
+
+
+def main(thread_counts):
+
+    print("{:<7} {:>8} {:>10} {:>8} {:>8}".format("mode", "threads", "writes/s", "p50 ms", "p99 ms"))
+
+    with tempfile.TemporaryDirectory() as folder:
+        for threads in thread_counts:
+            for group_commit in (False, True):
+                db = SQLitePersistence(os.path.join(folder, "contacts_{}_{}.db".format(threads, group_commit)),
+                                       pool_size=threads, group_commit=group_commit)
+                rate, latencies = run(db, threads)
+                db.close()
+
+                percentiles = statistics.quantiles(latencies, n=100)
+                print("{:<7} {:>8} {:>10,.0f} {:>8.2f} {:>8.2f}".format(
+                    "group" if group_commit else "single", threads, rate, percentiles[49], percentiles[98]))
+
+
+if __name__ == "__main__":
+    main([int(threads) for threads in sys.argv[1:]] or THREADS)
@@ -0,0 +1,141 @@
+"""
+Script Name: [bench_sqlite_pool.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Concurrency benchmark for SQLitePersistence. N threads call read_contact
+    while one more thread keeps updating contacts, the way the FastAPI
+    threadpool serves requests. Compares one shared connection behind a lock
+    (the old setup, made safe) against the connection pool in WAL mode, and
+    reports the reads and writes per second at each thread count.
+
+    The sqlite3 module lets go of the GIL while SQLite runs a statement, so
+    the pooled readers run side by side on a machine with several cores.
+    On a single core only the writer gains, it no longer waits on readers.
+
+    Run with:
+        python bench_sqlite_pool.py
+        python bench_sqlite_pool.py 1 2 4 8 16 32
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import random # Import random to pick the contacts to read.
+import sqlite3 # Import sqlite3 for the shared connection.
+import tempfile # Import tempfile to keep the test database out of the project.
+import threading # Import threading for the reader and writer threads.
+import time # Import time for the throughput.
+
+from db_persistence import SQLitePersistence
+
+THREADS = [1, 2, 4, 8, 16]
+CONTACTS = 10_000  # Contacts in the test database.
+DURATION = 2.0  # Seconds per run.
+
+
+# The old setup: one connection and one cursor for every thread. The lock
+# makes it safe, and shows the cost of serializing every request on it.
+class SharedConnection(SQLitePersistence):
+
+    def __init__(self, db_path):
+
+        self.db_path = db_path
+        self.initialize_db()
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.cursor = self.connection.cursor()
+        self.lock = threading.Lock()
+
+    def read_contact(self, contact_id: int):
+        with self.lock:
+            self.cursor.execute("SELECT * FROM contact WHERE Contact_ID = ?", (contact_id,))
+            return dict(self.cursor.fetchone())
+
+    def update_contact(self, contact_id: int, updated_contact: dict):
+        with self.lock:
+            self.cursor.execute("UPDATE contact SET Phone = ? WHERE Contact_ID = ?", (updated_contact["Phone"], contact_id))
+            self.connection.commit()
+        return updated_contact
+
+    def close(self):
+        self.connection.close()
+
+
+# Fill a new database with CONTACTS contacts.
+def make_db(path):
+
+    SQLitePersistence(path).close()
+    connection = sqlite3.connect(path)
+    connection.executemany(
+        "INSERT INTO contact (First_Name, Last_Name, Phone, Applicant_Relationship) VALUES (?, ?, ?, ?)",
+        [("First{}".format(i), "Last{}".format(i), "555-000-{:04d}".format(i % 10000), "Parent") for i in range(CONTACTS - 10)])
+    connection.commit()
+    connection.close()
+
+
+# Run the readers and the writer for DURATION seconds, return reads/s and
+# writes/s.
+def run(db, threads):
+
+    stop = threading.Event()
+    reads = [0] * threads
+    writes = [0]
+
+    def reader(n):
+        rng = random.Random(n)
+        while not stop.is_set():
+            db.read_contact(rng.randint(1, CONTACTS))
+            reads[n] += 1
+
+    def writer():
+        rng = random.Random()
+        contact = {"First_Name": "W", "Last_Name": "W", "Phone": "555-999-0000", "Applicant_Relationship": "Parent"}
+        while not stop.is_set():
+            db.update_contact(rng.randint(1, CONTACTS), contact)
+            writes[0] += 1
+
+    workers = [threading.Thread(target=reader, args=(n,)) for n in range(threads)]
+    workers.append(threading.Thread(target=writer))
+    for worker in workers:
+        worker.start()
+    time.sleep(DURATION)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    return sum(reads) / DURATION, writes[0] / DURATION
+
+
+def main(thread_counts):
+
+    print("{:>8} {:>15} {:>15} {:>13} {:>13}".format(
+        "threads", "shared reads/s", "shared writes/s", "pool reads/s", "pool writes/s"))
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "contacts.db")
+        make_db(path)
+
+        for threads in thread_counts:
+            shared = SharedConnection(path)
+            shared_reads, shared_writes = run(shared, threads)
+            shared.close()
+
+            pooled = SQLitePersistence(path, pool_size=threads + 1)
+            pool_reads, pool_writes = run(pooled, threads)
+            pooled.close()
+
+            print("{:>8} {:>15,.0f} {:>15,.0f} {:>13,.0f} {:>13,.0f}".format(
+                threads, shared_reads, shared_writes, pool_reads, pool_writes))
+
+
+if __name__ == "__main__":
+    main([int(threads) for threads in sys.argv[1:]] or THREADS)
@@ -0,0 +1,202 @@
+"""
+Script Name: [cached_repository.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	The cached_repository.py module is a read-through cache in front of any
+    Repository of repository.py, the native stores (InMemoryPersistence,
+    CSVPersistence, SQLitePersistence) included.
+
+        read    served from a bounded LRU of records, each kept for at most
+                ttl seconds; a miss reads the repository and keeps the record
+        list    the pages are cached too, under a version counter that every
+                write bumps, so a write drops all of them at once
+        writes  go to the repository, then replace (create, update) or drop
+                (delete) the cached record; a write that raced another one
+                drops it too, the next read fills it
+
+    Only the writes made through the cache are seen right away. A write that
+    goes around it (another worker process on the same csv file, the bulk
+    and async contact routes) is seen once the ttl runs out, or at once if
+    the writer calls invalidate.
+
+    stats() returns the hit, miss, eviction and expiry counts, to size the
+    cache for the traffic.
+
+References:
+    https://docs.python.org/3/library/collections.html#collections.OrderedDict
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+from collections import OrderedDict # Import OrderedDict for the LRU order.
+import threading # Import threading to keep the cache consistent between request threads.
+import time # Import time for the ttl.
+
+CACHE_SIZE = 10_000  # Records kept.
+CACHE_TTL = 60.0  # Seconds a cached record or page is served.
+LIST_CACHE_SIZE = 64  # Pages kept.
+
+
+class CachedRepository:
+
+    def __init__(self, repository, size=CACHE_SIZE, ttl=CACHE_TTL, list_size=LIST_CACHE_SIZE):
+
+        self.repository = repository
+        self.entity = repository.entity
+        self.size = size
+        self.ttl = ttl
+        self.list_size = list_size
+
+        self._records = OrderedDict()  # ID -> (expires, record), least recently used first.
+        self._pages = OrderedDict()  # (limit, after) -> (version, expires, records)
+        self._version = 0  # Bumped by every write.
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # Records dropped to stay within size.
+        self.expirations = 0  # Records dropped when their ttl ran out.
+        self.list_hits = 0
+        self.list_misses = 0
+
+    # Keep a record, called under the lock.
+    def _keep(self, record_id, record):
+
+        self._records[record_id] = (time.monotonic() + self.ttl, record)
+        self._records.move_to_end(record_id)
+        if len(self._records) > self.size:
+            self._records.popitem(last=False)
+            self.evictions += 1
+
+    # Keep the record a write returned, unless another write landed since
+    # version was taken: which of the two the repository holds last is not
+    # known, so the record is dropped instead. Called under the lock.
+    def _keep_written(self, version, record_id, record):
+
+        if version == self._version:
+            self._keep(record_id, record)
+        else:
+            self._records.pop(record_id, None)
+        self._version += 1
+
+    def list(self, limit: int = None, after: int = None):
+
+        key = (limit, after)
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is not None and cached[0] == self._version and cached[1] > time.monotonic():
+                self._pages.move_to_end(key)
+                self.list_hits += 1
+                return [dict(record) for record in cached[2]]
+            self.list_misses += 1
+            version = self._version
+
+        records = self.repository.list(limit, after)
+
+        # A write while the page was read makes it stale, it is not kept.
+        with self._lock:
+            if version == self._version:
+                self._pages[key] = (version, time.monotonic() + self.ttl, [dict(record) for record in records])
+                self._pages.move_to_end(key)
+                if len(self._pages) > self.list_size:
+                    self._pages.popitem(last=False)
+
+        return records
+
+    def read(self, record_id: int):
+
+        with self._lock:
+            cached = self._records.get(record_id)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self._records.move_to_end(record_id)
+                    self.hits += 1
+                    return dict(cached[1])
+                del self._records[record_id]
+                self.expirations += 1
+            self.misses += 1
+            version = self._version
+
+        record = self.repository.read(record_id)
+
+        with self._lock:
+            if version == self._version:
+                self._keep(record_id, dict(record))
+
+        return record
+
+    def create(self, record: dict):
+
+        with self._lock:
+            version = self._version
+
+        record = self.repository.create(record)
+        with self._lock:
+            self._keep_written(version, record[self.entity.id_field], dict(record))
+
+        return record
+
+    def create_many(self, records):
+
+        records = self.repository.create_many(records)
+        with self._lock:
+            self._version += 1
+
+        return records
+
+    def update(self, record_id: int, record: dict):
+
+        with self._lock:
+            version = self._version
+
+        try:
+            record = self.repository.update(record_id, record)
+        except Exception:
+            self.invalidate(record_id)
+            raise
+
+        with self._lock:
+            self._keep_written(version, record_id, dict(record))
+
+        return record
+
+    def delete(self, record_id: int):
+
+        try:
+            self.repository.delete(record_id)
+        finally:
+            self.invalidate(record_id)
+
+    # Drop one record, or everything, after a write that went around the
+    # cache. The cached pages are dropped either way.
+    def invalidate(self, record_id: int = None):
+
+        with self._lock:
+            self._version += 1
+            if record_id is None:
+                self._records.clear()
+            else:
+                self._records.pop(record_id, None)
+
+    def stats(self):
+
+        with self._lock:
+            reads = self.hits + self.misses
+            return {"entity": self.entity.name, "size": len(self._records), "capacity": self.size, "ttl": self.ttl,
+                    "hits": self.hits, "misses": self.misses,
+                    "hit_rate": round(self.hits / reads, 4) if reads else None,
+                    "evictions": self.evictions, "expirations": self.expirations,
+                    "list_hits": self.list_hits, "list_misses": self.list_misses, "version": self._version}
+
+    def close(self):
+        self.repository.close()
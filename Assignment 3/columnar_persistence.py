@@ -0,0 +1,449 @@
+"""
+Script Name: [columnar_persistence.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	The columnar_persistence.py module provides a columnar, memory-mapped
+    storage system for the address records. It is a drop-in sibling of the
+    CSVPersistence class with the same list, create, read, update and delete
+    methods, so main.py can switch between them by configuration.
+
+    Every column is its own NumPy .npy file in a folder (address_columns),
+    opened with memory mapping. Startup only maps the files and builds the
+    Address_ID index from one column, there is no text to parse. The columns
+    are allocated with spare capacity and grow by doubling, deletes clear the
+    Live flag of the slot.
+
+    Several workers (uvicorn --workers N) can share one folder, like the csv
+    file of CSVPersistence:
+        - Every write holds an exclusive advisory lock (fcntl.flock on
+          columns.lock) and first catches up with the slots the other
+          workers added, so a slot or an ID is never handed out twice.
+          Without fcntl (Windows) only the threads of one worker are kept apart.
+        - Reads catch up when meta.json changed since the last look; files
+          grown by another worker are mapped again.
+        - Updates and deletes land in the shared memory maps, the other
+          workers see them right away. A read checks the Live flag of the slot.
+
+    Convert an existing csv file with:
+        python convert_address_csv.py address.csv address_columns
+
+References:
+    https://numpy.org/doc/stable/reference/generated/numpy.lib.format.open_memmap.html
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+# Import the os and sys modules, even if they may not used they
+# are included as part of my normal python template.
+import os
+import sys
+
+# Additional imports here
+from fastapi import HTTPException # Import HTTPException to handle HTTP errors.
+import json # Import json to read and write the record count of the folder.
+import threading # Import threading to serialize the writes.
+import contextlib # Import contextlib for the file lock context manager.
+import numpy as np # Import NumPy for the memory-mapped column files.
+from numpy.lib.format import open_memmap # Create .npy files that are memory mapped.
+
+# The advisory file lock needs fcntl, which Windows does not have.
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Define the column folder location (path).
+COLUMNS_FOLDER = "address_columns"
+META_FILE = "meta.json"  # Holds the record count and the allocated capacity.
+LOCK_FILE = "columns.lock"  # Advisory lock shared by the workers.
+INITIAL_CAPACITY = 1024  # Slots allocated for a new folder.
+
+# Define the columns and their storage types, the text widths follow the
+# max_length of the ppm Address model.
+LIVE = "Live"  # Slot flag, False once the address is deleted.
+FIELDS = {
+    "Address_ID": np.int64,
+    "Street_No": "U10",
+    "Street": "U100",
+    "City": "U50",
+    "State": "U50",
+    "Zip": "U10",
+    "Type": "U50",
+    "OwnerID": np.int64,
+    "OwnerType": "U50",
+}
+MISSING_ID = -1  # Stored for a missing OwnerID.
+
+
+# The class for managing address records using memory-mapped column files.
+class ColumnarPersistence:
+
+    # If the folder does not exist, create it with empty columns.
+    def __init__(self, folder=COLUMNS_FOLDER):
+
+        self.folder = folder
+        self._lock = threading.Lock()  # Guards the writes and the growing of the columns.
+
+        os.makedirs(self.folder, exist_ok=True)
+        with self._locked():
+            if not os.path.exists(self._path(META_FILE)):
+                create_columns(self.folder, INITIAL_CAPACITY)
+
+        self._open()
+
+    # The path of a file in the folder.
+    def _path(self, name):
+        return os.path.join(self.folder, name)
+
+    # Hold the advisory lock on columns.lock around every write. Every call
+    # opens its own descriptor, so flock also keeps the threads of one
+    # worker apart. Without fcntl (Windows) it falls back to the thread
+    # lock, which covers one worker.
+    @contextlib.contextmanager
+    def _locked(self):
+
+        if fcntl is None:
+            with self._lock:
+                yield
+            return
+
+        with open(self._path(LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                with self._lock:
+                    yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    # The inode, mtime and size of meta.json. Every write of it is a rename,
+    # so a change made by any worker shows here.
+    def _meta_signature(self):
+
+        stat = os.stat(self._path(META_FILE))
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    # Map the column files and build the Address_ID index from the live slots.
+    def _open(self):
+
+        self.meta_signature = self._meta_signature()  # Taken first, a change while reading is seen next time.
+        with open(self._path(META_FILE)) as f:
+            meta = json.load(f)
+
+        self.count = meta["count"]  # Slots in use, live or deleted.
+        self.capacity = meta["capacity"]  # Slots allocated in the files.
+        self.columns = {column: np.load(self._path(column + ".npy"), mmap_mode="r+")
+                        for column in list(FIELDS) + [LIVE]}
+
+        ids = self.columns["Address_ID"][:self.count]
+        live = self.columns[LIVE][:self.count]
+        self.index = dict(zip(ids[live].tolist(), np.flatnonzero(live).tolist()))
+        self.next_id = int(ids.max()) + 1 if self.count else 1
+
+    # Catch up with the slots the other workers added since meta.json was
+    # last read. Grown files are mapped again, otherwise only the new slots
+    # are added to the index. Runs under the lock.
+    def _refresh(self):
+
+        signature = self._meta_signature()
+        if signature == self.meta_signature:
+            return
+
+        with open(self._path(META_FILE)) as f:
+            meta = json.load(f)
+
+        if meta["capacity"] != self.capacity:
+            self._open()
+            return
+
+        start, count = self.count, meta["count"]
+        ids = self.columns["Address_ID"][start:count]
+        live = self.columns[LIVE][start:count]
+        self.index.update(zip(ids[live].tolist(), (np.flatnonzero(live) + start).tolist()))
+        if count > start:
+            self.next_id = max(self.next_id, int(ids.max()) + 1)
+
+        self.count = count
+        self.meta_signature = signature
+
+    # Catch up before a read, the lock is only taken when meta.json changed.
+    def _sync(self):
+        if self._meta_signature() != self.meta_signature:
+            with self._lock:
+                self._refresh()
+
+    # Save the record count and capacity. Runs under the lock, so nobody
+    # else wrote meta.json in between.
+    def _save_meta(self):
+        write_meta(self.folder, self.count, self.capacity)
+        self.meta_signature = self._meta_signature()
+
+    # Double the capacity of every column file.
+    def _grow(self):
+
+        capacity = self.capacity * 2
+        for column, values in self.columns.items():
+            path = self._path(column + ".npy")
+            grown = open_memmap(path + ".tmp", mode="w+", dtype=values.dtype, shape=(capacity,))
+            grown[:self.count] = values[:self.count]
+            grown.flush()
+            del grown
+            os.replace(path + ".tmp", path)
+
+        self.capacity = capacity
+        self._save_meta()
+        self._open()
+
+    # Cast the incoming values to the column types, refuse values that do
+    # not fit instead of letting NumPy cut them off.
+    def _coerce(self, address: dict):
+
+        for column, value in address.items():
+            if column not in FIELDS or column == "Address_ID":
+                continue
+
+            dtype = np.dtype(FIELDS[column])
+            if dtype.kind == "U":
+                value = "" if value is None else str(value)
+                if len(value) > dtype.itemsize // 4:
+                    raise HTTPException(status_code = 422, detail = "{} is too long.".format(column))
+            else:
+                try:
+                    value = MISSING_ID if value is None else int(value)
+                except (TypeError, ValueError):
+                    raise HTTPException(status_code = 422, detail = "{} must be a number.".format(column))
+
+            address[column] = value
+
+        return address
+
+    # Write the known fields of an address into a slot.
+    def _write(self, slot, address: dict):
+        for column, value in address.items():
+            if column in FIELDS:
+                self.columns[column][slot] = value
+
+    # Convert a stored value back to what the csv backend returns.
+    def _value(self, value):
+        if value == "" or value == MISSING_ID:
+            return None
+        return value
+
+    # Get the address in a slot.
+    def _row(self, slot):
+        return {column: self._value(self.columns[column][slot].item()) for column in FIELDS}
+
+    # The slot of a live address, or None. Another worker may have deleted
+    # it since the index was built, the Live flag has the last word.
+    def _slot(self, address_id):
+
+        slot = self.index.get(address_id)
+        if slot is None or not self.columns[LIVE][slot]:
+            return None
+        return slot
+
+
+
+# =============================================
+# Create, Read, Update, Delete (CRUD) methods as:
+# list (all), create, read, update, delete, for consistency.
+# =============================================
+
+
+    # Get all addresses in the column files, or one page of them: up to
+    # limit addresses with an Address_ID above after. The slots are in
+    # Address_ID order, so the page starts with a binary search of the ID
+    # column and reads on only until it has limit live slots.
+    def list_addresses(self, limit: int = None, after: int = None):
+        self._sync()
+
+        if limit is not None or after is not None:
+            count = self.count
+            start = int(np.searchsorted(self.columns["Address_ID"][:count], after, side="right")) if after is not None else 0
+
+            if limit is None:
+                slots = (np.flatnonzero(self.columns[LIVE][start:count]) + start).tolist()
+            else:
+                # Read the live flags a chunk at a time, skipping the deleted slots.
+                slots = []
+                while start < count and len(slots) < limit:
+                    stop = min(start + 2 * limit, count)
+                    slots.extend((np.flatnonzero(self.columns[LIVE][start:stop]) + start).tolist())
+                    start = stop
+                slots = slots[:limit]
+
+            values = [self.columns[column][slots].tolist() for column in FIELDS]
+            return [{column: self._value(value) for column, value in zip(FIELDS, row)} for row in zip(*values)]
+
+        count = self.count
+        live = self.columns[LIVE][:count]
+
+        if not live.any():
+            raise HTTPException(status_code = 404, detail = "No addresses found.")
+
+        # Slices of a memory map are views, only mask them if there are deletes.
+        if live.all():
+            values = [self.columns[column][:count].tolist() for column in FIELDS]
+        else:
+            values = [self.columns[column][:count][live].tolist() for column in FIELDS]
+
+        return [{column: self._value(value) for column, value in zip(FIELDS, row)} for row in zip(*values)]
+
+
+    # Create a new address.
+    def create_address(self, address: dict):
+        self._coerce(address)
+
+        with self._locked():
+            self._refresh()
+            if self.count == self.capacity:
+                self._grow()
+
+            slot = self.count
+            address["Address_ID"] = self.next_id
+
+            self._write(slot, {column: empty_value(column) for column in FIELDS})
+            self._write(slot, address)
+            self.columns[LIVE][slot] = True
+
+            self.index[self.next_id] = slot
+            self.next_id += 1
+            self.count += 1
+            self._save_meta()
+
+        return {"create_address": "The address was created.", "address": address}
+
+
+    # Get an address by ID.
+    def read_address(self, address_id: int):
+        self._sync()
+        slot = self._slot(address_id)
+
+        # Error if not a valid address_id.
+        if slot is None:
+            raise HTTPException(status_code = 404, detail = "Address ID was not found. Confirm ID.")
+
+        return self._row(slot)
+
+    # Search the addresses with vectorized scans of the mapped columns. The
+    # filters map a column to the exact value, or Zip to a prefix.
+    def search_addresses(self, filters: dict):
+        self._coerce(filters)
+        self._sync()
+
+        count = self.count
+        matches = self.columns[LIVE][:count].copy()
+
+        for column, value in filters.items():
+            values = self.columns[column][:count]
+            if column == "Zip":
+                matches &= np.char.startswith(values, value)
+            else:
+                matches &= values == value
+
+        if not matches.any():
+            raise HTTPException(status_code = 404, detail = "No addresses match the search.")
+
+        return [self._row(slot) for slot in np.flatnonzero(matches)]
+
+    # Update an address.
+    def update_address(self, address_id: int, updated_address: dict):
+        self._coerce(updated_address)
+
+        with self._locked():
+            self._refresh()
+            slot = self._slot(address_id)
+
+            # Confirm provided address id is valid.
+            if slot is None:
+                raise HTTPException(status_code = 404, detail = "Address ID was not found.")
+
+            self._write(slot, {column: value for column, value in updated_address.items() if column != "Address_ID"})
+
+        return {"update_address": "The address was updated successfully.", "updated_address": updated_address}
+
+
+    # Delete an address.
+    def delete_address(self, address_id: int):
+
+        with self._locked():
+            self._refresh()
+            slot = self._slot(address_id)
+            self.index.pop(address_id, None)
+
+            if slot is None:
+                raise HTTPException(status_code = 404, detail = "Address ID was not found. Confirm ID")
+
+            self.columns[LIVE][slot] = False
+
+        return {"delete_address": "Address deleted"}
+
+
+# =============================================
+# Column files and csv conversion.
+# =============================================
+
+# The stored value of a missing field.
+def empty_value(column):
+    return "" if np.dtype(FIELDS[column]).kind == "U" else MISSING_ID
+
+
+# Create empty column files with the given capacity.
+def create_columns(folder, capacity, count=0):
+
+    for column, dtype in list(FIELDS.items()) + [(LIVE, np.bool_)]:
+        values = open_memmap(os.path.join(folder, column + ".npy"), mode="w+", dtype=dtype, shape=(capacity,))
+        values.flush()
+
+    write_meta(folder, count, capacity)
+
+
+# Write meta.json to a temporary file and rename it over the old one, so a
+# crash part way through leaves the old file whole, never a cut off one.
+def write_meta(folder, count, capacity):
+
+    path = os.path.join(folder, META_FILE)
+    temp_path = "{}.{}.{}.tmp".format(path, os.getpid(), threading.get_ident())
+    with open(temp_path, "w") as f:
+        json.dump({"count": count, "capacity": capacity}, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temp_path, path)
+
+
+# Convert an address csv file (and its append-only log, if any) into a
+# column folder. Returns the number of addresses converted.
+def convert_csv(csv_path, folder=COLUMNS_FOLDER):
+
+    # Imported here so the columnar backend does not need pandas to run.
+    from csv_persistence import CSVPersistence, LOG_SUFFIX
+
+    csv_db = CSVPersistence(csv_path, append_only=os.path.exists(csv_path + LOG_SUFFIX))
+    df = csv_db._load_data().sort_values("Address_ID")  # The pages rely on the slots being in ID order.
+    count = len(df)
+
+    os.makedirs(folder, exist_ok=True)
+    # Leave a quarter of headroom so the first creates do not grow the files.
+    create_columns(folder, max(count + count // 4, INITIAL_CAPACITY), count)
+
+    for column, dtype in FIELDS.items():
+        values = np.load(os.path.join(folder, column + ".npy"), mmap_mode="r+")
+        if column not in df.columns:
+            values[:count] = empty_value(column)
+        elif np.dtype(dtype).kind == "U":
+            values[:count] = df[column].fillna("").astype(str).to_numpy()
+        else:
+            values[:count] = df[column].fillna(MISSING_ID).to_numpy(dtype=np.int64)
+        values.flush()
+
+    live = np.load(os.path.join(folder, LIVE + ".npy"), mmap_mode="r+")
+    live[:count] = True
+    live.flush()
+
+    return count
@@ -0,0 +1,35 @@
+"""
+Script Name: [convert_address_csv.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Converts the address csv file used by CSVPersistence into the memory-mapped
+    column folder used by ColumnarPersistence. An append-only log next to the
+    csv file is folded in first.
+
+    Run with:
+        python convert_address_csv.py
+        python convert_address_csv.py address.csv address_columns
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+from columnar_persistence import convert_csv, COLUMNS_FOLDER
+from csv_persistence import CSV_FILE
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else CSV_FILE
+    folder = sys.argv[2] if len(sys.argv) > 2 else COLUMNS_FOLDER
+
+    count = convert_csv(csv_path, folder)
+    print("Converted {} addresses from {} into {}.".format(count, csv_path, folder))
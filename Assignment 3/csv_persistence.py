@@ -11,6 +11,52 @@ Description:
 	The csv_persistence.py module provides the flat-file CSV-based storage 
     system to manage address records. The persistence provides storing, 
     retrieving, updating, and deleting address information in a CSV file.
+
+    Append-only mode:
+        With CSVPersistence(..., append_only=True) the writes no longer
+        rewrite the whole csv file. Every create, update and delete appends
+        one line to a log file that sits next to the csv file (address.csv.log).
+        Updates append a replacement record holding the whole updated address
+        and deletes append a tombstone record. Reads fold the log over the csv
+        file, the last record for an Address_ID wins.
+
+        Once the ratio of dead (replaced or deleted) records passes the
+        compaction threshold, a background thread folds the log into a new
+        csv file and starts a fresh log with whatever was appended meanwhile.
+
+    Read cache:
+        The parsed frame is kept in memory together with a hash index from
+        Address_ID to the row position. It is reloaded only when the mtime or
+        size of the csv file (or the log) changes, so a warm read_address is
+        a dictionary lookup. The columns are read with explicit types so pandas
+        does not have to infer them on every load. In append-only mode the
+        writes made through the object are applied to the cached rows and
+        indexes in place, only a write by another worker forces a reload.
+
+        list_addresses(limit, after) pages through the cached rows in
+        Address_ID order: a binary search over the IDs sorted once per load,
+        then only the rows of the page are turned into dictionaries.
+
+    Secondary indexes:
+        search_addresses looks addresses up by City, State, Type, OwnerID and
+        OwnerType through hash indexes, and by Zip prefix through a sorted
+        index. The indexes are built on the first search and then kept up to
+        date by the create, update and delete calls. A change to the file made
+        by anyone else is caught by the file signature and forces a rebuild.
+
+    Several workers (uvicorn --workers N) can share one address file:
+        - Every read-modify-write cycle holds an exclusive advisory lock
+          (fcntl.flock on address.csv.lock), reads of the append-only mode
+          hold it shared. Without fcntl (Windows) only the threads of one
+          worker are kept apart.
+        - The csv file is written to a temp file, flushed to disk and renamed
+          over the old one, a crash leaves the old file and never a truncated one.
+        - A rewrite is first recorded in a write-ahead journal
+          (address.csv.journal). Entries left behind by a crashed worker are
+          redone by the next writer.
+        - In append-only mode each worker catches up with the lines the others
+          appended before it writes, so IDs are never handed out twice. Half a
+          line left by a crash is cut off. Appends are flushed, not fsynced.
 """
 
 # =============================================
@@ -28,6 +74,19 @@ from pydantic import BaseModel # Import Pydantic's model for request/response va
 from datetime import date # Import date to handle member date of birth (DOB) fields.
 from typing import List # Import List for type hinting when returning a list of members.
 import pandas as pd # Import Pandas for CSV file manipulation
+import csv # Import csv to append single records without loading the file.
+import io # Import io to parse a snapshot of the log held in memory.
+import threading # Import threading for the background compaction.
+import bisect # Import bisect for the sorted Zip index.
+import contextlib # Import contextlib for the file lock context manager.
+import json # Import json for the write-ahead journal entries.
+import numpy as np # Import NumPy for the sorted Address_IDs of the pages.
+
+# The advisory file lock needs fcntl, which Windows does not have.
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 app = FastAPI()
 
@@ -47,6 +106,133 @@ COLUMNS = [
     "OwnerType",  # Owner type classification (Self, Parent, Guardian, etc.).
 ]
 
+# Append-only mode settings.
+LOG_SUFFIX = ".log"  # The log file is the csv file name plus this suffix.
+OP_COLUMN = "Op"  # Extra log column holding the record operation.
+LOG_COLUMNS = COLUMNS + [OP_COLUMN]
+UPSERT = "U"  # Create record, or an update with only the changed fields (older logs).
+REPLACE = "R"  # Update record holding the whole address.
+TOMBSTONE = "D"  # Delete record.
+COMPACTION_THRESHOLD = 0.5  # Compact once half of the records are dead.
+COMPACTION_MIN_RECORDS = 1000  # Do not bother compacting small files.
+
+# Multi-worker settings.
+LOCK_SUFFIX = ".lock"  # Advisory lock file next to the csv file.
+JOURNAL_SUFFIX = ".journal"  # Write-ahead journal of the rewrites.
+
+# Explicit column types, pandas no longer has to infer them on each load.
+# Street_No and Zip are text (like the ppm models) so leading zeros survive.
+DTYPES = {
+    "Address_ID": "int64",
+    "Street_No": str,
+    "Street": str,
+    "City": str,
+    "State": str,
+    "Zip": str,
+    "Type": str,
+    "OwnerID": "Int64",  # Nullable, a create may leave it out.
+    "OwnerType": str,
+}
+LOG_DTYPES = dict(DTYPES, **{OP_COLUMN: str})
+
+# Secondary index columns, a hash index each, plus the sorted Zip index.
+HASH_INDEXES = ["City", "State", "Type", "OwnerID", "OwnerType"]
+ZIP_INDEX = "Zip"
+INDEXED_COLUMNS = HASH_INDEXES + [ZIP_INDEX]
+
+
+# Hash indexes on the categorical columns and a sorted index for Zip prefix
+# lookups. Updated one address at a time, so a write never rebuilds them.
+class AddressIndexes:
+
+    # Build the indexes from the cached column values of the live addresses.
+    def __init__(self, columns, index):
+
+        self._lock = threading.Lock()  # Guards the indexes between writers and searches.
+        self.rows = {}  # Indexed values per Address_ID, needed to unindex an address.
+        self.hashes = {column: {} for column in HASH_INDEXES}  # Value -> set of Address_IDs.
+
+        for address_id, position in list(index.items()):
+            values = {column: columns[column][position] for column in INDEXED_COLUMNS if column in columns}
+            self.rows[address_id] = values
+            self._hash(address_id, values)
+
+        # Sorted (Zip, Address_ID) pairs, sorted once here and kept sorted with insort.
+        self.zips = sorted((values[ZIP_INDEX], address_id) for address_id, values in self.rows.items()
+                           if values.get(ZIP_INDEX) is not None)
+
+    # Add an address to the hash indexes.
+    def _hash(self, address_id, values):
+        for column in HASH_INDEXES:
+            if values.get(column) is not None:
+                self.hashes[column].setdefault(values[column], set()).add(address_id)
+
+    # Index a new address.
+    def add(self, address_id, address: dict):
+
+        values = {column: address.get(column) for column in INDEXED_COLUMNS}
+        with self._lock:
+            self._remove(address_id)
+            self.rows[address_id] = values
+            self._hash(address_id, values)
+            if values[ZIP_INDEX] is not None:
+                bisect.insort(self.zips, (values[ZIP_INDEX], address_id))
+
+    # Re-index an address with the changed fields of an update.
+    def update(self, address_id, changes: dict):
+
+        values = dict(self.rows.get(address_id, {}))
+        values.update({column: value for column, value in changes.items() if column in INDEXED_COLUMNS})
+        self.add(address_id, values)
+
+    # Drop an address from the indexes.
+    def remove(self, address_id):
+        with self._lock:
+            self._remove(address_id)
+
+    def _remove(self, address_id):
+
+        values = self.rows.pop(address_id, None)
+        if values is None:
+            return
+
+        for column in HASH_INDEXES:
+            ids = self.hashes[column].get(values.get(column))
+            if ids is not None:
+                ids.discard(address_id)
+                if not ids:
+                    del self.hashes[column][values[column]]
+
+        if values.get(ZIP_INDEX) is not None:
+            position = bisect.bisect_left(self.zips, (values[ZIP_INDEX], address_id))
+            if position < len(self.zips) and self.zips[position] == (values[ZIP_INDEX], address_id):
+                del self.zips[position]
+
+    # Return the sorted Address_IDs matching every filter. Zip is a prefix,
+    # the other columns must match exactly. The candidate sets are
+    # intersected smallest first.
+    def search(self, filters: dict):
+
+        with self._lock:
+            candidates = []
+            for column, value in filters.items():
+                if column == ZIP_INDEX:
+                    prefix = str(value)
+                    position = bisect.bisect_left(self.zips, (prefix,))
+                    ids = set()
+                    while position < len(self.zips) and self.zips[position][0].startswith(prefix):
+                        ids.add(self.zips[position][1])
+                        position += 1
+                    candidates.append(ids)
+                else:
+                    candidates.append(set(self.hashes[column].get(value, ())))
+
+        if not candidates:
+            return sorted(self.rows)
+
+        candidates.sort(key=len)
+        return sorted(candidates[0].intersection(*candidates[1:]))
+
 
 # The class for managing address records using the csv file.
 class CSVPersistence:
@@ -54,22 +240,585 @@ class CSVPersistence:
     # If the file does not exist, create a new one with headers.
     # Watch it... the 1st attempt created an empty file by mistake!
     # Drop the use of subfolders for now!
-    def __init__(self, file_path=CSV_FILE):
+    def __init__(self, file_path=CSV_FILE, append_only=False, compaction_threshold=COMPACTION_THRESHOLD):
 
         self.file_path = file_path
-        if not os.path.exists(self.file_path):
-            df = pd.DataFrame(columns=COLUMNS)
-            df.to_csv(self.file_path, index=False)
-
-    # Load the file.
+        self.log_path = self.file_path + LOG_SUFFIX
+        self.lock_path = self.file_path + LOCK_SUFFIX
+        self.journal_path = self.file_path + JOURNAL_SUFFIX
+        self._lock = threading.Lock()  # Guards the state of this object between threads.
+
+        self.append_only = append_only
+        self.compaction_threshold = compaction_threshold
+        self._cache = None  # (file signature, frame, Address_ID index, column values)
+        self._indexes = None  # AddressIndexes, built on the first search.
+        self._indexes_signature = None  # File signature the indexes match.
+        self._keys = None  # (cache, sorted IDs, row positions), for the pages.
+
+        with self._locked():
+            if not os.path.exists(self.file_path):
+                self._save_data(pd.DataFrame(columns=COLUMNS))
+            self._recover()
+
+        if self.append_only:
+            self._open_log()
+
+    # Load the file. After a write in append-only mode the cache has no
+    # frame, it is built again from the cached rows.
     def _load_data(self):
-        return pd.read_csv(self.file_path)
+
+        df, index, columns = self._load_cache()
+        if df is None:
+            rows = [self._row(columns, position) for position in list(index.values())]
+            df = pd.DataFrame(rows, columns=list(columns)).astype({"Address_ID": "int64", "OwnerID": "Int64"})
+
+        return df
 
     # Need to read more on dataframe concepts.
     # https://www.geeksforgeeks.org/python-pandas-dataframe/
+    # Written to a temp file first and renamed over the csv file, so a crash
+    # part way through leaves the old file instead of a truncated one.
     def _save_data(self, df):
-        df.to_csv(self.file_path, index=False)
+        self._write_atomic(self.file_path, lambda f: df.to_csv(f, index=False))
+        self._cache = None
+
+    # Write a file through a temp file in the same folder, flushed to disk
+    # before the rename. The process and thread IDs keep the temp files of
+    # the workers apart.
+    def _write_atomic(self, path, write):
+
+        temp_path = "{}.{}.{}.tmp".format(path, os.getpid(), threading.get_ident())
+        with open(temp_path, "w", newline="") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_path, path)
+
+
+# =============================================
+# Locking and the write-ahead journal.
+# =============================================
+
+    # Hold the advisory lock on address.csv.lock. Exclusive around every
+    # read-modify-write cycle, shared for reads that must see both files of
+    # the append-only mode together. Every call opens its own descriptor, so
+    # flock also keeps the threads of one worker apart. Without fcntl
+    # (Windows) it falls back to the thread lock, which covers one worker.
+    @contextlib.contextmanager
+    def _locked(self, shared=False):
+
+        if fcntl is None:
+            with self._lock:
+                yield
+            return
+
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                if shared:
+                    yield
+                else:
+                    with self._lock:
+                        yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    # Record a rewrite before it starts. Flushed to disk, so a worker that
+    # crashes before the rename leaves the entry behind for _recover.
+    def _journal(self, entry: dict):
+        with open(self.journal_path, "a") as journal:
+            journal.write(json.dumps(entry) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    # The rewrite is on disk, the journal entry is no longer needed.
+    def _clear_journal(self):
+        with open(self.journal_path, "w"):
+            pass
+
+    # Redo the journal entries a crashed worker left behind. The entries are
+    # idempotent, an entry whose rewrite did land is applied a second time
+    # without changing anything. Runs under the exclusive lock.
+    def _recover(self):
+
+        if not os.path.exists(self.journal_path) or os.path.getsize(self.journal_path) == 0:
+            return
+
+        with open(self.journal_path) as journal:
+            lines = journal.read().split("\n")
+
+        # Only complete lines count, a torn last line never started its rewrite.
+        entries = [json.loads(line) for line in lines[:-1] if line]
+
+        df = pd.read_csv(self.file_path, dtype=DTYPES)
+        for entry in entries:
+            df = self._apply(df, entry)
+
+        self._save_data(df)
+        self._clear_journal()
+
+    # Apply one journal entry to a frame.
+    def _apply(self, df, entry: dict):
+
+        address_id = entry["Address_ID"]
+        matches = df["Address_ID"] == address_id
+
+        if entry["op"] == "create":
+            if matches.any():
+                return df
+
+            # Append (concat) the new address
+            # Per:
+            # Stack Overflow User. (2023, April 7). Error: DataFrame object has no 
+            # attribute 'append' [Online forum post]. Stack Overflow. Retrieved from
+            # https://stackoverflow.com/questions/75956209/error-dataframe-object-has-no-attribute-append
+            return pd.concat([df, pd.DataFrame([entry["address"]])], ignore_index=True)
 
+        if entry["op"] == "update":
+            df = df.copy()  # Leave the cached frame alone.
+            df.loc[matches, list(entry["address"].keys())] = list(entry["address"].values())
+            return df
+
+        return df[~matches]
+
+    # One read-modify-write cycle of the default mode: journal, rewrite the
+    # csv file, clear the journal, all under the exclusive lock. Returns
+    # False when the address to update or delete does not exist.
+    def _rewrite(self, entry: dict):
+
+        with self._locked():
+            self._recover()
+            signature = self._signature()
+            df = self._load_data()
+
+            # Generate a unique Address_ID
+            # Find the current max ID and increment for tha new one.
+            if entry["op"] == "create":
+                entry["Address_ID"] = int(df["Address_ID"].max()) + 1 if not df.empty else 1
+                entry["address"]["Address_ID"] = entry["Address_ID"]
+            elif entry["Address_ID"] not in df["Address_ID"].values:
+                return False
+
+            self._journal(entry)
+            self._save_data(self._apply(df, entry))
+            self._clear_journal()
+            self._reindex(signature, entry["Address_ID"], entry.get("address"))
+
+        return True
+
+
+# =============================================
+# Read cache.
+# =============================================
+
+    # The inode, mtime and size of the files behind the frame, the cache is
+    # only good while these match. The inode changes with every rename.
+    def _signature(self):
+
+        paths = [self.file_path]
+        if self.append_only:
+            paths.append(self.log_path)
+
+        return tuple((stat.st_ino, stat.st_mtime_ns, stat.st_size) for stat in map(os.stat, paths))
+
+    # Return the cached frame, Address_ID index and column values, reload
+    # them when the file changed since the last load.
+    def _load_cache(self, held=False):
+        return self._cached(held)[1:]
+
+    # The whole cache entry. A caller that already holds the lock passes
+    # held=True, the append-only mode then reads the files without taking
+    # the shared lock on top.
+    def _cached(self, held=False):
+
+        signature = self._signature()
+        cache = self._cache
+        if cache is not None and cache[0] == signature:
+            return cache
+
+        if self.append_only:
+            df = self._fold(*self._parse(*self._read_raw())) if held else self._load_folded()
+        else:
+            df = pd.read_csv(self.file_path, dtype=DTYPES)
+
+        index = {int(address_id): position for position, address_id in enumerate(df["Address_ID"])}
+
+        # Plain Python values per column, picking one row out of these is much
+        # cheaper than going through pandas on every read. Lists, so the
+        # append-only writes can add rows in place.
+        columns = {column: df[column].to_numpy(dtype=object, na_value=None).tolist() for column in df.columns}
+        cache = self._cache = (signature, df, index, columns)
+
+        return cache
+
+    # Apply a record appended through this object to the cached rows, so the
+    # next read does not parse and fold the files again. A new version of an
+    # address goes to a new position and the index is pointed at it last, a
+    # read running meanwhile gets the old row or the new one, never half of
+    # each. The old positions stay behind until the next reload, which the
+    # compaction bounds. The sorted page keys are patched the same way, new
+    # arrays so a page being sliced is left alone. The signature taken before
+    # the append must still match the cache, otherwise some other writer got
+    # in between and the cache is dropped instead. Runs under the exclusive lock.
+    def _cache_append(self, signature, address_id, values=None):
+
+        cache = self._cache
+        if cache is None or cache[0] != signature:
+            self._cache = None
+            return
+
+        index, columns = cache[2], cache[3]
+        if values is None:
+            index.pop(address_id, None)
+        else:
+            for column, column_values in columns.items():
+                column_values.append(values.get(column))
+            index[address_id] = len(columns["Address_ID"]) - 1
+
+        keys = self._keys
+        self._cache = (self._signature(), None, index, columns)
+        if keys is None or keys[0] is not cache:
+            return
+
+        ids, positions = keys[1], keys[2]
+        slot = int(np.searchsorted(ids, address_id))
+        found = slot < len(ids) and ids[slot] == address_id
+        if values is None:
+            if found:
+                ids, positions = np.delete(ids, slot), np.delete(positions, slot)
+        elif found:
+            positions = positions.copy()
+            positions[slot] = index[address_id]
+        else:
+            ids, positions = np.insert(ids, slot, address_id), np.insert(positions, slot, index[address_id])
+
+        self._keys = (self._cache, ids, positions)
+
+    # The Address_IDs of the cached frame in ascending order with their row
+    # positions. Sorted once per load of the file (or write), every page
+    # after that is a binary search and a slice. The writes change the index
+    # in place, list() copies it in one step.
+    def _load_keys(self):
+
+        cache = self._cached()
+        keys = self._keys
+        if keys is None or keys[0] is not cache:
+            items = list(cache[2].items())
+            ids = np.fromiter((address_id for address_id, position in items), dtype=np.int64, count=len(items))
+            positions = np.fromiter((position for address_id, position in items), dtype=np.int64, count=len(items))
+            order = np.argsort(ids, kind="stable")
+            keys = self._keys = (cache, ids[order], positions[order])
+
+        return cache[3], keys[1], keys[2]
+
+    # Get the address at a row position of the cached column values.
+    def _row(self, columns, position):
+        return {column: values[position] for column, values in columns.items()}
+
+    # Cast the incoming values to the column types of the file.
+    def _coerce(self, address: dict):
+
+        for column, value in address.items():
+            if value is None or column not in DTYPES:
+                continue
+            try:
+                address[column] = str(value) if DTYPES[column] is str else int(value)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code = 422, detail = "{} must be a number.".format(column))
+
+        return address
+
+
+# =============================================
+# Secondary indexes.
+# =============================================
+
+    # Return the secondary indexes, rebuild them only when the file was
+    # changed by someone other than this object.
+    def _load_indexes(self):
+
+        signature = self._signature()
+        if self._indexes is None or self._indexes_signature != signature:
+            df, index, columns = self._load_cache()
+            self._indexes = AddressIndexes(columns, index)
+            self._indexes_signature = signature
+
+        return self._indexes
+
+    # Apply a write made through this object to the indexes. The signature
+    # taken before the write must still match the indexes, otherwise some
+    # other writer got in between and the indexes are dropped instead.
+    def _reindex(self, signature, address_id, changes=None):
+
+        indexes = self._indexes
+        if indexes is None:
+            return
+
+        if self._indexes_signature != signature:
+            self._indexes = None
+            return
+
+        if changes is None:
+            indexes.remove(address_id)
+        elif address_id in indexes.rows:
+            indexes.update(address_id, changes)
+        else:
+            indexes.add(address_id, changes)
+
+        self._indexes_signature = self._signature()
+
+
+# =============================================
+# Append-only log and compaction.
+# =============================================
+
+    # Create the log if needed and build the bookkeeping the writes need,
+    # this is the only full read of the file in append-only mode.
+    def _open_log(self):
+
+        self._compaction = None  # The running compaction thread, if any.
+
+        with self._locked():
+            if not os.path.exists(self.log_path):
+                self._write_atomic(self.log_path, lambda log: csv.writer(log).writerow(LOG_COLUMNS))
+            self._load_log_state()
+
+    # Build the live IDs, the next ID and the record counts from the files.
+    # Runs under the exclusive lock.
+    def _load_log_state(self):
+
+        self._truncate_torn_tail()
+        base, log = self._parse(*self._read_raw())
+        df = self._fold(base, log)
+
+        self._live_ids = set(int(address_id) for address_id in df["Address_ID"])
+        self._log_records = len(log)  # Records appended since the last compaction.
+        self._records = len(base) + self._log_records  # Live and dead records on disk.
+
+        # Never reuse an ID, a tombstone must stay final.
+        ids = pd.concat([base["Address_ID"], log["Address_ID"]])
+        self._next_id = int(ids.max()) + 1 if not ids.empty else 1
+
+        stat = os.stat(self.log_path)
+        self._log_seen = (stat.st_ino, stat.st_size)  # The part of the log folded into the state above.
+
+    # A worker that crashed part way through an append leaves half a line at
+    # the end of the log, cut it off before anything is appended after it.
+    # Runs under the exclusive lock.
+    def _truncate_torn_tail(self):
+
+        with open(self.log_path, "rb+") as log:
+            size = log.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+
+            log.seek(size - 1)
+            if log.read(1) == b"\n":
+                return
+
+            log.seek(0)
+            log.truncate(log.read().rfind(b"\n") + 1)
+
+    # Catch up with the records other workers appended since this object last
+    # looked at the log. After a compaction by another worker the state is
+    # rebuilt from the files. Runs under the exclusive lock.
+    def _sync_log(self):
+
+        stat = os.stat(self.log_path)
+        ino, offset = self._log_seen
+        if (stat.st_ino, stat.st_size) == self._log_seen:
+            return
+
+        if stat.st_ino != ino or stat.st_size < offset:
+            self._load_log_state()
+            return
+
+        self._truncate_torn_tail()
+        with open(self.log_path, "rb") as log:
+            log.seek(offset)
+            tail = log.read()
+
+        for row in csv.reader(io.StringIO(tail.decode())):
+            address_id = int(row[0])
+            if row[-1] == TOMBSTONE:
+                self._live_ids.discard(address_id)
+            else:
+                self._live_ids.add(address_id)
+            self._next_id = max(self._next_id, address_id + 1)
+            self._log_records += 1
+            self._records += 1
+
+        self._log_seen = (ino, offset + len(tail))
+
+    # Read the raw bytes of the csv file and the log (up to log_size).
+    # The caller holds the lock, so a compaction can not swap the files
+    # between the two reads.
+    def _read_raw(self, log_size=None):
+
+        with open(self.file_path, "rb") as f:
+            base = f.read()
+        with open(self.log_path, "rb") as f:
+            log = f.read() if log_size is None else f.read(log_size)
+
+        return base, log
+
+    # Parse the raw bytes of the csv file and the log. Only complete log
+    # lines count, an append still in flight is left for the next read.
+    def _parse(self, base, log):
+        log = log[:log.rfind(b"\n") + 1]
+        return pd.read_csv(io.BytesIO(base), dtype=DTYPES), pd.read_csv(io.BytesIO(log), dtype=LOG_DTYPES)
+
+    # Read and parse both files under the shared lock.
+    def _read_files(self):
+
+        with self._locked(shared=True):
+            raw = self._read_raw()
+
+        return self._parse(*raw)
+
+    # Fold the log over the csv file. A replacement or tombstone record holds
+    # the whole address, everything before the last one of an Address_ID is
+    # dropped, so an update can clear a field. Updates of older logs only
+    # carry the changed fields, for those take the last non-empty value per
+    # column. The addresses keep the order they were first seen in.
+    def _fold(self, base, log):
+
+        if log.empty:
+            return base
+
+        combined = pd.concat([base.assign(**{OP_COLUMN: UPSERT}), log], ignore_index=True)
+        ids = combined["Address_ID"]
+        order = ids.drop_duplicates()
+
+        whole = combined.index.to_series().where(combined[OP_COLUMN].isin([REPLACE, TOMBSTONE]))
+        last_whole = whole.groupby(ids).transform("max")
+        combined = combined[last_whole.isna() | (combined.index >= last_whole)]
+
+        df = combined.groupby("Address_ID", sort=False).last().reindex(order).reset_index()
+        df = df[df[OP_COLUMN] != TOMBSTONE].drop(columns=OP_COLUMN)
+
+        return df.reset_index(drop=True)
+
+    # Load the current state of the addresses.
+    def _load_folded(self):
+        base, log = self._read_files()
+        return self._fold(base, log)
+
+    # Append one record to the log, the only disk write per request. A
+    # create (no address_id) gets the next ID, an update or delete of an
+    # address that is not live returns None. An update is written as the
+    # whole address, its changes over the current values. Returns the
+    # Address_ID.
+    def _append(self, op: str, record: dict, address_id=None):
+
+        with self._locked():
+            self._sync_log()
+
+            if address_id is None:
+                address_id = self._next_id
+                self._next_id += 1
+            elif address_id not in self._live_ids:
+                return None
+
+            record["Address_ID"] = address_id
+            if op == REPLACE:
+                record = dict(self._current_row(address_id), **record)
+
+            # Empty fields read back as None, keep them that way in the cache.
+            values = {column: None if record.get(column) == "" else record.get(column) for column in COLUMNS}
+            row = [values[column] for column in COLUMNS] + [op]
+
+            signature = self._signature()
+            with open(self.log_path, "a", newline="") as log:
+                csv.writer(log).writerow(row)
+                log.flush()
+                self._log_seen = (self._log_seen[0], log.tell())
+
+            if op == TOMBSTONE:
+                self._live_ids.discard(address_id)
+            else:
+                self._live_ids.add(address_id)
+            self._log_records += 1
+            self._records += 1
+            self._cache_append(signature, address_id, None if op == TOMBSTONE else values)
+            self._reindex(signature, address_id, None if op == TOMBSTONE else values)
+
+        self._maybe_compact()
+
+        return address_id
+
+    # The current values of a live address. Runs under the exclusive lock,
+    # after _sync_log, so the address is in the cache once it matches the files.
+    def _current_row(self, address_id):
+
+        df, index, columns = self._load_cache(held=True)
+        return self._row(columns, index[address_id])
+
+    # Start a background compaction once too many records are dead.
+    def _maybe_compact(self):
+
+        if self._records < COMPACTION_MIN_RECORDS:
+            return
+
+        dead_ratio = 1 - len(self._live_ids) / self._records
+        if dead_ratio <= self.compaction_threshold:
+            return
+
+        if self._compaction is None or not self._compaction.is_alive():
+            self._compaction = threading.Thread(target=self.compact, daemon=True)
+            self._compaction.start()
+
+    # Rewrite the csv file from the folded state and restart the log.
+    # The fold runs outside the lock against a snapshot of the log, the
+    # records appended meanwhile are carried over to the new log. If another
+    # worker compacted in between, this compaction is dropped.
+    def compact(self):
+
+        with self._locked():
+            self._sync_log()
+            ino, log_size = self._log_seen
+            base_ino = os.stat(self.file_path).st_ino
+            folded_records = self._log_records
+            raw = self._read_raw(log_size)
+
+        df = self._fold(*self._parse(*raw))
+
+        temp_path = "{}.{}.{}.compact".format(self.file_path, os.getpid(), threading.get_ident())
+        self._write_atomic(temp_path, lambda f: df.to_csv(f, index=False))
+
+        with self._locked():
+            self._sync_log()
+            if os.stat(self.file_path).st_ino != base_ino or self._log_seen[0] != ino:
+                os.remove(temp_path)
+                return {"compact": "Another worker compacted the address file.", "records": len(self._live_ids)}
+
+            with open(self.log_path, "rb") as f:
+                f.seek(log_size)
+                tail = f.read()
+
+            def write_log(log):
+                log.write(",".join(LOG_COLUMNS) + "\r\n")
+                log.write(tail.decode())
+
+            # Replace the csv file first, a crash before the log is replaced
+            # only means the old log is folded over the new file again.
+            signature = self._signature()
+            self._write_atomic(self.log_path + ".new", write_log)
+            os.replace(temp_path, self.file_path)
+            os.replace(self.log_path + ".new", self.log_path)
+
+            # Same addresses, new files, the indexes are still good.
+            if self._indexes_signature == signature:
+                self._indexes_signature = self._signature()
+
+            stat = os.stat(self.log_path)
+            self._log_seen = (stat.st_ino, stat.st_size)
+            self._log_records -= folded_records
+            self._records = len(df) + self._log_records
+            self._cache = None
+
+        return {"compact": "The address file was compacted.", "records": len(df)}
 
 
 # =============================================
@@ -79,31 +828,35 @@ class CSVPersistence:
 
 
     # Get all addresses in the csv file.
-    def list_addresses(self):
-        df = self._load_data()  # Load data from the csv file.
+    # Or one page: up to limit addresses with an Address_ID above after.
+    def list_addresses(self, limit: int = None, after: int = None):
+
+        if limit is not None or after is not None:
+            columns, ids, positions = self._load_keys()
+            start = int(np.searchsorted(ids, after, side="right")) if after is not None else 0
+            stop = start + limit if limit is not None else len(ids)
+
+            return [self._row(columns, position) for position in positions[start:stop].tolist()]
+
+        df, index, columns = self._load_cache()  # Load data from the csv file.
+        positions = list(index.values())  # In frame order, the writes change the index in place.
 
-        if df.empty:
+        if not positions:
             raise HTTPException(status_code = 404, detail = "No addresses found.")
 
-        return df.to_dict(orient="records")
+        return [self._row(columns, position) for position in positions]
 
 
     # Create a new address.
+    # Append-only appends one line with the next ID, otherwise the csv file
+    # is rewritten, both under the file lock.
     def create_address(self, address: dict):
-        df = self._load_data()
-
-        # Generate a unique Address_ID
-        # Find the current max ID and increment for tha new one.
-        address_id = df["Address_ID"].max() + 1 if not df.empty else 1
-        address["Address_ID"] = address_id
-
-        # Append (concat) the new address
-        # Per:
-        # Stack Overflow User. (2023, April 7). Error: DataFrame object has no 
-        # attribute 'append' [Online forum post]. Stack Overflow. Retrieved from
-        # https://stackoverflow.com/questions/75956209/error-dataframe-object-has-no-attribute-append
-        df = df.concat(address, ignore_index=True)
-        self._save_data(df)
+        self._coerce(address)
+
+        if self.append_only:
+            self._append(UPSERT, address)
+        else:
+            self._rewrite({"op": "create", "Address_ID": None, "address": address})
 
         # return address
         return {"create_address": "The address was created.", "address": address}
@@ -111,41 +864,60 @@ class CSVPersistence:
 
     # Get an address by ID.
     def read_address(self, address_id: int):
-        df = self._load_data()
-        record = df[df["Address_ID"] == address_id]
+        df, index, columns = self._load_cache()
+        position = index.get(address_id)
 
         # Error if not a valid address_id.
-        if record.empty:
+        if position is None:
             raise HTTPException(status_code = 404, detail = "Address ID was not found. Confirm ID.")
 
-        return record.to_dict(orient="records")[0]
+        return self._row(columns, position)
+
+
+    # Search the addresses through the secondary indexes. The filters map a
+    # column (City, State, Type, OwnerID, OwnerType) to the exact value, or
+    # Zip to a prefix.
+    def search_addresses(self, filters: dict):
+        self._coerce(filters)
+
+        address_ids = self._load_indexes().search(filters)
+        df, index, columns = self._load_cache()
+        addresses = [self._row(columns, index[address_id]) for address_id in address_ids if address_id in index]
+
+        if not addresses:
+            raise HTTPException(status_code = 404, detail = "No addresses match the search.")
+
+        return addresses
 
     # Update an address.
+    # Append-only appends a replacement record with the whole address.
     def update_address(self, address_id: int, updated_address: dict):
-        df = self._load_data()
+        self._coerce(updated_address)
+
+        if self.append_only:
+            found = self._append(REPLACE, dict(updated_address), address_id) is not None
+        else:
+            found = self._rewrite({"op": "update", "Address_ID": address_id, "address": updated_address})
 
         # Confirm provided address id is valid.
-        if address_id not in df["Address_ID"].values:
+        if not found:
             raise HTTPException(status_code = 404, detail = "Address ID was not found.")
 
-        # Update the address record
-        df.loc[df["Address_ID"] == address_id, list(updated_address.keys())] = list(updated_address.values())
-        self._save_data(df)
-
         return {"update_address": "The address was updated successfully.", "updated_address": updated_address}
 
 
 
     # Delete an address. 
     # Ensure a backup of the file prior to testing!
+    # Append-only appends a tombstone record.
     def delete_address(self, address_id: int):
-        df = self._load_data()
 
-        if address_id not in df["Address_ID"].values:
-            raise HTTPException(status_code = 404, detail = "Address ID was not found. Confirm ID")
+        if self.append_only:
+            found = self._append(TOMBSTONE, {}, address_id) is not None
+        else:
+            found = self._rewrite({"op": "delete", "Address_ID": address_id})
 
-        # Remove the address from csv file.
-        df = df[df["Address_ID"] != address_id]
-        self._save_data(df)
+        if not found:
+            raise HTTPException(status_code = 404, detail = "Address ID was not found. Confirm ID")
 
         return {"delete_address": "Address deleted"}
@@ -11,6 +11,21 @@ Description:
 	The db_persistence.py module provides the SQLite-based storage system for
     managing contact records. It provides the interaction with a MySQL database.
 
+    Every request thread checks out its own connection from a bounded pool
+    (ConnectionPool), and the database runs in WAL mode so reads go on while
+    a write is in progress.
+
+    With group_commit=True the writes of concurrent requests queue up for a
+    single writer thread (GroupCommitWriter), which commits them together,
+    one fsync per batch instead of one per request.
+
+    search_contacts finds contacts by words in any field through an FTS5
+    table (contact_fts) that triggers keep in step with contact, ranked by
+    bm25, and by Last_Name or Phone prefix through B-tree indexes.
+
+    bulk_upsert_contacts loads many contacts at once, a few thousand rows per
+    transaction through executemany.
+
 References:
 https://sqlitebrowser.org/
 
@@ -34,17 +49,48 @@ from pydantic import BaseModel # Import Pydantic's model for request/response va
 from datetime import date # Import date to handle member date of birth (DOB) fields.
 from typing import List # Import List for type hinting when returning a list of members.
 import sqlite3 # Import the SQLite3 module for interacting with a SQLite database.
+import threading # Import threading to guard the pool's idle connections.
+import queue # Import queue for the writes waiting on the group commit.
+import time # Import time for the group commit interval.
+from concurrent.futures import Future # Import Future to hand each caller its own result.
+
+
+POOL_SIZE = 8  # Most connections open at once, further threads wait for one.
+BUSY_TIMEOUT = 5.0  # Seconds a writer waits on another writer's lock.
+GROUP_COMMIT_SIZE = 100  # Most writes in one group commit.
+GROUP_COMMIT_INTERVAL = 0.002  # Seconds a batch waits for more writes after its first.
+SEARCH_LIMIT = 50  # Most contacts returned by one search.
+BULK_CHUNK_SIZE = 5000  # Rows per transaction of a bulk upsert.
+CONTACT_FIELDS = ["First_Name", "Last_Name", "Phone", "Applicant_Relationship"]
+
+# Insert a contact, or replace the fields of the contact with that ID.
+UPSERT_SQL = """
+    INSERT INTO contact (Contact_ID, First_Name, Last_Name, Phone, Applicant_Relationship) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (Contact_ID) DO UPDATE SET
+        First_Name = excluded.First_Name, Last_Name = excluded.Last_Name,
+        Phone = excluded.Phone, Applicant_Relationship = excluded.Applicant_Relationship
+"""
 
 
-# The class for managing contact records using SQLite database.
-class SQLitePersistence:
 
-    # SQLite connection, creates the table if it does not exist.
-    def __init__(self, db_path="contacts.db"):
+# A bounded pool of SQLite connections. A thread checks a connection out for
+# the length of one call and checks it back in, no two threads ever share a
+# connection or a cursor.
+class ConnectionPool:
+
+    def __init__(self, db_path, size=POOL_SIZE):
 
         self.db_path = db_path
-        self.initialize_db()  # Ensure the database, table, and contacts exist.
-        self.connection = sqlite3.connect(self.db_path, check_same_thread=False) # Make the connection.
+        self.size = size
+        self._idle = []  # Checked in connections, the last one in goes out first.
+        self._opened = 0  # Connections opened so far, never more than size.
+        self._available = threading.Condition(threading.Lock())
+        self._all = []  # Every connection opened, for close().
+
+    # Open a new connection.
+    def _connect(self):
+
+        connection = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, check_same_thread=False) # Make the connection.
         """
         Added: check_same_thread=False to connection.
         This Stack overflow question (post) resolved an error in my code regarding
@@ -57,11 +103,201 @@ class SQLitePersistence:
         Stack Overflow User. (2018, January 12). Objects created in a thread can 
         only be used in that same thread [Online forum post]. Stack Overflow. 
         Retrieved from https://stackoverflow.com/questions/48218065/objects-created-in-a-thread-can-only-be-used-in-that-same-thread
+
+        Still needed with the pool, a connection moves between threads, but it
+        is only ever used by the one thread that has it checked out.
         """
 
-        self.connection.row_factory = sqlite3.Row  # Enables dictionary-like access to rows.
-        self.cursor = self.connection.cursor() 
-       
+        connection.row_factory = sqlite3.Row  # Enables dictionary-like access to rows.
+
+        with self._available:
+            self._all.append(connection)
+
+        return connection
+
+    # Take a connection, opens a new one while the pool is below its size.
+    # Blocks while all of them are checked out.
+    def checkout(self):
+
+        with self._available:
+            while not self._idle:
+                if self._opened < self.size:
+                    self._opened += 1
+                    break
+                self._available.wait()
+            else:
+                return self._idle.pop()
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._available:
+                self._opened -= 1
+                self._available.notify()
+            raise
+
+    # Give a connection back. A transaction left open is rolled back so the
+    # next thread starts clean.
+    def checkin(self, connection):
+
+        if connection.in_transaction:
+            connection.rollback()
+
+        with self._available:
+            self._idle.append(connection)
+            self._available.notify()
+
+    # Check out a connection for the length of a with block.
+    def connection(self):
+        return Checkout(self)
+
+    # Close every connection, the pool can not be used afterwards.
+    def close(self):
+
+        with self._available:
+            for connection in self._all:
+                connection.close()
+            self._all.clear()
+            self._idle.clear()
+            self._opened = 0
+
+
+# with pool.connection() as connection: ... holds one checked out connection.
+# A class instead of contextlib.contextmanager, it runs on every request and
+# is cheaper than the generator version.
+class Checkout:
+
+    __slots__ = ("pool", "connection")
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def __enter__(self):
+        self.connection = self.pool.checkout()
+        return self.connection
+
+    def __exit__(self, *exc_info):
+        self.pool.checkin(self.connection)
+
+
+# Group commit: one thread does all the writes. A batch starts with the first
+# write in the queue and takes what arrives within the interval, up to size
+# writes, then commits them in one transaction. Each write runs in its own
+# savepoint, so a failing write is rolled back alone and the rest of the
+# batch still commits. Every caller waits for the commit of its batch and
+# gets its own (lastrowid, rowcount) or exception back.
+class GroupCommitWriter:
+
+    def __init__(self, pool, size=GROUP_COMMIT_SIZE, interval=GROUP_COMMIT_INTERVAL):
+
+        self.size = size
+        self.interval = interval
+        self._queue = queue.Queue()
+        self._connection = pool._connect()  # Its own connection, outside the pool's limit.
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # Queue one write and wait for its batch to commit.
+    def write(self, sql: str, parameters: tuple):
+
+        future = Future()
+        self._queue.put((sql, parameters, future))
+        return future.result()
+
+    # Let the queued writes finish and stop the writer thread.
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    # The writer thread.
+    def _run(self):
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._commit(batch)
+                    return
+                batch.append(item)
+
+            self._commit(batch)
+
+    # Run one batch in one transaction and hand out the results.
+    def _commit(self, batch):
+
+        connection = self._connection
+        results = []
+
+        try:
+            connection.execute("BEGIN")
+            for sql, parameters, future in batch:
+                connection.execute("SAVEPOINT write")
+                try:
+                    cursor = connection.execute(sql, parameters)
+                except Exception as e:
+                    connection.execute("ROLLBACK TO write")
+                    results.append((future, None, e))
+                else:
+                    results.append((future, (cursor.lastrowid, cursor.rowcount), None))
+                connection.execute("RELEASE write")
+            connection.commit()
+
+        except Exception as e:
+            if connection.in_transaction:
+                connection.rollback()
+            results = [(future, None, e) for _, _, future in batch]
+
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+# The class for managing contact records using SQLite database.
+class SQLitePersistence:
+
+    # SQLite connection pool, creates the table if it does not exist.
+    def __init__(self, db_path="contacts.db", pool_size=POOL_SIZE, group_commit=False,
+                 group_commit_size=GROUP_COMMIT_SIZE, group_commit_interval=GROUP_COMMIT_INTERVAL):
+
+        self.db_path = db_path
+        self.initialize_db()  # Ensure the database, table, and contacts exist.
+        self.pool = ConnectionPool(self.db_path, pool_size)  # One connection per request thread.
+
+        # The writes go through the writer thread in the group commit mode.
+        self.writer = GroupCommitWriter(self.pool, group_commit_size, group_commit_interval) if group_commit else None
+
+
+    # Close the writer thread and the connections in the pool.
+    def close(self):
+
+        if self.writer is not None:
+            self.writer.close()
+        self.pool.close()
+
+
+    # Run one write and commit it, returns (lastrowid, rowcount).
+    def _write(self, sql: str, parameters: tuple):
+
+        if self.writer is not None:
+            return self.writer.write(sql, parameters)
+
+        with self.pool.connection() as connection:
+            cursor = connection.execute(sql, parameters)
+            connection.commit()
+
+        return cursor.lastrowid, cursor.rowcount
+
 
     def initialize_db(self):
          # Check if the database file exists, create it if not.
@@ -74,6 +310,10 @@ class SQLitePersistence:
         if not db_exists:
             print("Database and table not found, created successfully.")
 
+        # Write-ahead log, readers keep reading the last commit while a writer
+        # works instead of waiting for it. The mode is stored in the db file.
+        cursor.execute("PRAGMA journal_mode=WAL")
+
         # Create 'contact' table if it does not exist. It shouldn't at first run.
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS contact (
@@ -84,10 +324,47 @@ class SQLitePersistence:
                 Applicant_Relationship TEXT NOT NULL
             )
         """)
+
+        # B-tree indexes for the Last_Name and Phone lookups of search_contacts.
+        cursor.execute("CREATE INDEX IF NOT EXISTS contact_last_name ON contact (Last_Name)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS contact_phone ON contact (Phone)")
+
+        # Full-text index over every field. It reads the text from contact
+        # itself (external content), the triggers tell it about each change.
+        # prefix='2 3' keeps extra indexes for 2 and 3 letter prefixes, which
+        # makes the short prefix searches about three times faster.
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'contact_fts'")
+        fts_exists = cursor.fetchone() is not None
+        cursor.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS contact_fts USING fts5(
+                First_Name, Last_Name, Phone, Applicant_Relationship,
+                content='contact', content_rowid='Contact_ID', prefix='2 3'
+            );
+            CREATE TRIGGER IF NOT EXISTS contact_fts_insert AFTER INSERT ON contact BEGIN
+                INSERT INTO contact_fts (rowid, First_Name, Last_Name, Phone, Applicant_Relationship)
+                VALUES (new.Contact_ID, new.First_Name, new.Last_Name, new.Phone, new.Applicant_Relationship);
+            END;
+            CREATE TRIGGER IF NOT EXISTS contact_fts_delete AFTER DELETE ON contact BEGIN
+                INSERT INTO contact_fts (contact_fts, rowid, First_Name, Last_Name, Phone, Applicant_Relationship)
+                VALUES ('delete', old.Contact_ID, old.First_Name, old.Last_Name, old.Phone, old.Applicant_Relationship);
+            END;
+            CREATE TRIGGER IF NOT EXISTS contact_fts_update AFTER UPDATE ON contact BEGIN
+                INSERT INTO contact_fts (contact_fts, rowid, First_Name, Last_Name, Phone, Applicant_Relationship)
+                VALUES ('delete', old.Contact_ID, old.First_Name, old.Last_Name, old.Phone, old.Applicant_Relationship);
+                INSERT INTO contact_fts (rowid, First_Name, Last_Name, Phone, Applicant_Relationship)
+                VALUES (new.Contact_ID, new.First_Name, new.Last_Name, new.Phone, new.Applicant_Relationship);
+            END;
+        """)
+
+        # A database from before the full-text index gets its contacts indexed once.
+        if not fts_exists:
+            cursor.execute("INSERT INTO contact_fts (contact_fts) VALUES ('rebuild')")
+
         connection.commit()
 
-        # Check if the first 10 contacts exist, if not add them.
-        cursor.execute("SELECT COUNT(*) FROM contact")
+        # Check if the first 10 contacts exist, if not add them. Counts no
+        # further than 10, a full COUNT(*) reads the whole table on every start.
+        cursor.execute("SELECT COUNT(*) FROM (SELECT 1 FROM contact LIMIT 10)")
         count = cursor.fetchone()[0]
 
         if count < 10:
@@ -127,13 +404,21 @@ class SQLitePersistence:
 # list (all), create, read, update, delete, for consistency.
 # =============================================
 
-    # Get all contact records in the database in the contacts table.
-    def list_contacts(self):
+    # Get all contact records in the database in the contacts table, or one
+    # page of them: up to limit contacts with a Contact_ID above after. The
+    # page is a range scan of the primary key, it never reads the rows before.
+    def list_contacts(self, limit: int = None, after: int = None):
  
-        self.cursor.execute("SELECT * FROM contact")  # Select all records.
-        results = self.cursor.fetchall()  # Fetch result.
-
-        if not results:
+        paged = limit is not None or after is not None
+        with self.pool.connection() as connection:
+            if paged:
+                results = connection.execute("SELECT * FROM contact WHERE Contact_ID > ? ORDER BY Contact_ID LIMIT ?",
+                                             (after if after is not None else 0, limit if limit is not None else -1)).fetchall()
+            else:
+                results = connection.execute("SELECT * FROM contact").fetchall()  # Select all records.
+
+        # An empty page past the last contact is not an error.
+        if not results and not paged:
             # This shouldn't happen if the code above for the checks functions correctly.
             raise HTTPException(status_code = 404, detail = "No contacts found in the database. Crumbs!")
 
@@ -144,19 +429,18 @@ class SQLitePersistence:
     def create_contact(self, contact: dict):
 
         sql = "INSERT INTO contact (First_Name, Last_Name, Phone, Applicant_Relationship) VALUES (?, ?, ?, ?)"
-        self.cursor.execute(sql, (contact["First_Name"], contact["Last_Name"], contact["Phone"], contact["Applicant_Relationship"]))
-        self.connection.commit()
+        contact_id, _ = self._write(sql, (contact["First_Name"], contact["Last_Name"], contact["Phone"], contact["Applicant_Relationship"]))
 
-        # Get the last inserted ID.
-        contact["Contact_ID"] = self.cursor.lastrowid
+        # Get the last inserted ID, this request's own.
+        contact["Contact_ID"] = contact_id
         return contact
 
 
     # Get a contact record by Contact_ID.
     def read_contact(self, contact_id: int):
  
-        self.cursor.execute("SELECT * FROM contact WHERE Contact_ID = ?", (contact_id,))
-        result = self.cursor.fetchone()
+        with self.pool.connection() as connection:
+            result = connection.execute("SELECT * FROM contact WHERE Contact_ID = ?", (contact_id,)).fetchone()
 
         if not result:
             raise HTTPException(status_code = 404, detail = "Contact not found, are you sure you have records!")
@@ -164,14 +448,170 @@ class SQLitePersistence:
         return dict(result)
 
 
+    # Search the contacts, every given parameter must match:
+    #   text       words found in any field, each word also matches as a
+    #              prefix (ali joh finds Alice Johnson), best match first.
+    #   Last_Name  prefix of the last name.
+    #   Phone      prefix of the phone number.
+    # Without text the matches come in Contact_ID order.
+    def search_contacts(self, text: str = None, last_name: str = None, phone: str = None, limit: int = SEARCH_LIMIT):
+
+        conditions = []
+        parameters = []
+
+        for column, prefix in (("Last_Name", last_name), ("Phone", phone)):
+            if prefix:
+                # A range on the index instead of LIKE, which would not use it.
+                conditions.append("contact.{0} >= ? AND contact.{0} < ?".format(column))
+                parameters += [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+
+        if text and text.split():
+            # Quote every word so FTS5 syntax in the input is taken literally.
+            query = " ".join('"{}"*'.format(word.replace('"', '""')) for word in text.split())
+            sql = "SELECT contact.* FROM contact_fts JOIN contact ON contact.Contact_ID = contact_fts.rowid WHERE contact_fts MATCH ?"
+            sql += "".join(" AND " + condition for condition in conditions) + " ORDER BY contact_fts.rank LIMIT ?"
+            parameters = [query] + parameters
+        else:
+            sql = "SELECT * FROM contact"
+            sql += (" WHERE " + " AND ".join(conditions) if conditions else "") + " ORDER BY Contact_ID LIMIT ?"
+
+        with self.pool.connection() as connection:
+            results = connection.execute(sql, parameters + [limit]).fetchall()
+
+        if not results:
+            raise HTTPException(status_code = 404, detail = "No contacts match the search.")
+
+        return [dict(row) for row in results]
+
+
+    # Create or update many contacts. A contact with a Contact_ID replaces
+    # that contact (or is created with that ID), one without gets a new ID.
+    # Runs BULK_CHUNK_SIZE rows per transaction. Returns the Contact_ID of
+    # every row (None for a row in error), the errors by row number (counted
+    # from first_row) and the number of contacts created and updated.
+    def bulk_upsert_contacts(self, contacts: list, first_row: int = 0):
+
+        result = {"ids": [None] * len(contacts), "errors": [], "created": 0, "updated": 0}
+
+        rows = []  # (position, values) of the rows that passed the checks.
+        for position, contact in enumerate(contacts):
+            try:
+                rows.append((position, self._contact_values(contact)))
+            except ValueError as e:
+                result["errors"].append({"row": first_row + position, "error": str(e)})
+
+        with self.pool.connection() as connection:
+            for start in range(0, len(rows), BULK_CHUNK_SIZE):
+                self._upsert_chunk(connection, rows[start:start + BULK_CHUNK_SIZE], result, first_row)
+
+        result["errors"].sort(key=lambda error: error["row"])
+        return result
+
+
+    # Check one contact of a bulk upsert, return its (Contact_ID, fields...)
+    # row. Raises ValueError with the reason.
+    def _contact_values(self, contact):
+
+        if not isinstance(contact, dict):
+            raise ValueError("A contact must be a JSON object.")
+
+        contact_id = contact.get("Contact_ID")
+        if contact_id is not None and (isinstance(contact_id, bool) or not isinstance(contact_id, int) or not 0 < contact_id < 2 ** 63):
+            raise ValueError("Contact_ID must be a positive whole number.")
+
+        values = [contact_id]
+        for field in CONTACT_FIELDS:
+            value = contact.get(field)
+            if value is None or value == "" or isinstance(value, (dict, list)):
+                raise ValueError("{} is required.".format(field))
+            values.append(str(value))
+
+        return tuple(values)
+
+
+    # Upsert one chunk in one transaction. The new contacts get their IDs
+    # here, under the write lock, so every row knows its ID without a query
+    # per row. The triggers keep the full-text index in step, as for every
+    # other write. If the executemany fails, the chunk is redone row by row
+    # to find the rows at fault.
+    def _upsert_chunk(self, connection, chunk, result, first_row):
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # AUTOINCREMENT never reuses an ID, so start past the highest ever
+            # handed out and past every ID given in the chunk.
+            given = [values[0] for _, values in chunk if values[0] is not None]
+            sequence = connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'contact'").fetchone()
+            highest = connection.execute("SELECT max(Contact_ID) FROM contact").fetchone()[0]
+            next_id = max([sequence[0] if sequence else 0, highest or 0] + given) + 1
+
+            existing = set()
+            for start in range(0, len(given), 500):
+                part = given[start:start + 500]
+                sql = "SELECT Contact_ID FROM contact WHERE Contact_ID IN ({})".format(", ".join("?" * len(part)))
+                existing.update(row[0] for row in connection.execute(sql, part))
+
+            ids = []
+            rows = {}  # Contact_ID -> values, the last row for an ID wins.
+            for position, values in chunk:
+                if values[0] is None:
+                    values = (next_id,) + values[1:]
+                    next_id += 1
+                ids.append(values[0])
+                rows[values[0]] = values
+
+            try:
+                connection.executemany(UPSERT_SQL, rows.values())
+                failed = {}
+            except sqlite3.Error:
+                connection.rollback()
+                connection.execute("BEGIN IMMEDIATE")
+                failed = self._upsert_one_by_one(connection, rows.values())
+
+            connection.commit()
+
+        except Exception:
+            if connection.in_transaction:
+                connection.rollback()
+            raise
+
+        for (position, _), contact_id in zip(chunk, ids):
+            if contact_id in failed:
+                result["errors"].append({"row": first_row + position, "error": failed[contact_id]})
+                continue
+
+            result["ids"][position] = contact_id
+            if contact_id in existing:
+                result["updated"] += 1
+            else:
+                result["created"] += 1
+                existing.add(contact_id)  # The same ID again in the chunk is an update.
+
+
+    # Upsert the rows one at a time, each in its own savepoint. Returns the
+    # Contact_IDs that failed with the reason.
+    def _upsert_one_by_one(self, connection, rows):
+
+        failed = {}
+        for values in rows:
+            connection.execute("SAVEPOINT row")
+            try:
+                connection.execute(UPSERT_SQL, values)
+            except sqlite3.Error as e:
+                connection.execute("ROLLBACK TO row")
+                failed[values[0]] = str(e)
+            connection.execute("RELEASE row")
+
+        return failed
+
+
     # Update an existing contact by Contact_ID.
     def update_contact(self, contact_id: int, updated_contact: dict):
 
         sql = "UPDATE contact SET First_Name = ?, Last_Name = ?, Phone = ?, Applicant_Relationship = ? WHERE Contact_ID = ?"
-        self.cursor.execute(sql, (updated_contact["First_Name"], updated_contact["Last_Name"], updated_contact["Phone"], updated_contact["Applicant_Relationship"], contact_id))
-        self.connection.commit()
+        _, rowcount = self._write(sql, (updated_contact["First_Name"], updated_contact["Last_Name"], updated_contact["Phone"], updated_contact["Applicant_Relationship"], contact_id))
 
-        if self.cursor.rowcount == 0:
+        if rowcount == 0:
             raise HTTPException(status_code = 404, detail = "Contact not found")
 
         return updated_contact
@@ -180,10 +620,9 @@ class SQLitePersistence:
     # Delete a contact by Contact_ID.
     def delete_contact(self, contact_id: int):
 
-        self.cursor.execute("DELETE FROM contact WHERE Contact_ID = ?", (contact_id,))
-        self.connection.commit()
+        _, rowcount = self._write("DELETE FROM contact WHERE Contact_ID = ?", (contact_id,))
 
-        if self.cursor.rowcount == 0:
+        if rowcount == 0:
             raise HTTPException(status_code = 404, detail = "Contact not found")
 
         return {"delete_contact": "Contact deleted"}
\ No newline at end of file
@@ -0,0 +1,405 @@
+"""
+Script Name: [in_memory_columnar_persistence.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	The in_memory_columnar_persistence.py module keeps the applicants in
+    NumPy arrays, one per field, instead of one object per applicant. It is
+    a drop-in sibling of InMemoryPersistence with the same list, create,
+    read, search, update and delete methods, so main.py can switch between
+    them by configuration (APPLICANT_BACKEND=columnar).
+
+    DoB is a datetime64[D] column, Gender and ResidencyState are small
+    integer codes into a list of the values seen so far, FirstName and
+    LastName stay Python strings. A deleted applicant frees its slot, the
+    next create reuses it. Anything the typed columns can not hold (a DoB
+    that is not an ISO date, fields the store does not know) is kept per
+    slot in extra, so every applicant reads back as it was written.
+
+    Searches and applicant_stats (counts by state, gender and age band)
+    run as vectorized operations over the columns instead of a Python loop
+    over the applicants.
+
+References:
+    https://numpy.org/doc/stable/reference/arrays.datetime.html
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+# Import the os and sys modules, even if they may not used they
+# are included as part of my normal python template.
+# import os
+# import sys
+
+# Additional imports here
+from fastapi import HTTPException # Import HTTPException to handle HTTP errors.
+from datetime import date # Import date to check the ISO dates.
+import bisect # Import bisect to find the start of a page in the sorted IDs.
+import numpy as np # Import NumPy for the columns.
+
+from in_memory_persistence import AGE_BANDS, MEMBERS, MISSING, ReadWriteLock, is_iso_date, stats_result
+
+INITIAL_CAPACITY = 1024  # Slots allocated at the start, the columns grow by doubling.
+NAMES = ["FirstName", "LastName"]  # Free text, kept as Python strings.
+CATEGORIES = ["Gender", "ResidencyState"]  # Few distinct values, kept as codes.
+FIELDS = ("FirstName", "LastName", "DoB", "Gender", "ResidencyState")  # Order of the fields in a returned applicant.
+NO_CODE = -1  # Code of a missing Gender or ResidencyState.
+NO_DATE = np.datetime64("NaT")  # DoB of an applicant without an ISO date of birth.
+
+
+class ColumnarInMemoryPersistence:
+
+    # Initializes the columns and loads the same 10 members as
+    # InMemoryPersistence.
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+
+        self.capacity = capacity
+        self.count = 0  # Slots handed out so far, live or free.
+        self.free = []  # Slots of deleted applicants, reused by the next creates.
+        self.index = {}  # Applicant_ID -> slot.
+        self.ids = []  # Applicant_IDs in ascending order, for the pages.
+        self.current_id = 1
+        self.extra = {}  # slot -> fields the columns can not hold.
+        self.lock = ReadWriteLock()  # Shared by the readers, exclusive for the writers.
+
+        self.applicant_ids = np.zeros(capacity, dtype=np.int64)
+        self.live = np.zeros(capacity, dtype=np.bool_)
+        self.dobs = np.full(capacity, NO_DATE, dtype="datetime64[D]")
+        self.names = {field: np.full(capacity, MISSING, dtype=object) for field in NAMES}
+        self.codes = {field: np.full(capacity, NO_CODE, dtype=np.int32) for field in CATEGORIES}
+        self.categories = {field: [] for field in CATEGORIES}  # code -> value
+        self.category_codes = {field: {} for field in CATEGORIES}  # value -> code
+
+        for member in MEMBERS:
+            self._write(self._new_slot(), self.current_id, member)
+            self.ids.append(self.current_id)
+            self.current_id += 1
+
+    # A slot for a new applicant: a freed one, or the next one, growing the
+    # columns when they are full.
+    def _new_slot(self):
+
+        if self.free:
+            return self.free.pop()
+
+        if self.count == self.capacity:
+            self._grow()
+
+        self.count += 1
+        return self.count - 1
+
+    # Double the capacity of every column.
+    def _grow(self):
+
+        capacity = self.capacity * 2
+
+        def grown(values, empty):
+            column = np.full(capacity, empty, dtype=values.dtype)
+            column[:self.capacity] = values
+            return column
+
+        self.applicant_ids = grown(self.applicant_ids, 0)
+        self.live = grown(self.live, False)
+        self.dobs = grown(self.dobs, NO_DATE)
+        self.names = {field: grown(values, MISSING) for field, values in self.names.items()}
+        self.codes = {field: grown(values, NO_CODE) for field, values in self.codes.items()}
+        self.capacity = capacity
+
+    # The code of a category value, a new value gets the next code.
+    def _code(self, field: str, value: str):
+
+        code = self.category_codes[field].get(value)
+        if code is None:
+            code = len(self.categories[field])
+            self.categories[field].append(value)
+            self.category_codes[field][value] = code
+
+        return code
+
+    # Write an applicant into a slot, every column is set so nothing of a
+    # previous occupant is left behind.
+    def _write(self, slot: int, applicant_id: int, applicant: dict):
+
+        self.applicant_ids[slot] = applicant_id
+        self.dobs[slot] = NO_DATE
+        for field in NAMES:
+            self.names[field][slot] = MISSING
+        for field in CATEGORIES:
+            self.codes[field][slot] = NO_CODE
+
+        extra = {}
+        for field, value in applicant.items():
+            if field == "Applicant_ID":
+                continue
+            if field in NAMES:
+                self.names[field][slot] = value
+            elif field == "DoB" and is_iso_date(value):
+                self.dobs[slot] = np.datetime64(value, "D")
+            elif field in CATEGORIES and isinstance(value, str):
+                self.codes[field][slot] = self._code(field, value)
+            else:
+                extra[field] = value
+
+        if extra:
+            self.extra[slot] = extra
+        else:
+            self.extra.pop(slot, None)
+
+        self.live[slot] = True
+        self.index[applicant_id] = slot
+
+    # The applicants in the given slots as dictionaries, the way the API
+    # returns them. The columns are read in one go per field.
+    def _rows(self, slots):
+
+        slots = np.asarray(slots, dtype=np.int64)
+        columns = {
+            "Applicant_ID": self.applicant_ids[slots].tolist(),
+            "DoB": np.datetime_as_string(self.dobs[slots]).tolist(),
+        }
+        for field in NAMES:
+            columns[field] = self.names[field][slots].tolist()
+        for field in CATEGORIES:
+            values = np.array(self.categories[field] + [MISSING], dtype=object)
+            columns[field] = values[self.codes[field][slots]].tolist()  # NO_CODE picks the MISSING at the end.
+
+        rows = []
+        for position, slot in enumerate(slots.tolist()):
+            extra = self.extra.get(slot, {})
+            applicant = {}
+            for field in FIELDS:
+                value = columns[field][position]
+                if field in extra:
+                    applicant[field] = extra[field]
+                elif value is not MISSING and not (field == "DoB" and value == "NaT"):
+                    applicant[field] = value
+
+            applicant["Applicant_ID"] = columns["Applicant_ID"][position]
+            for field, value in extra.items():
+                if field not in FIELDS:
+                    applicant[field] = value
+            rows.append(applicant)
+
+        return rows
+
+    # One applicant, read value by value. Cheaper than _rows for a single
+    # slot, which pays for building arrays of the slots and the categories.
+    def _row(self, slot: int):
+
+        extra = self.extra.get(slot, {})
+        dob = self.dobs[slot]
+        values = {
+            "FirstName": self.names["FirstName"][slot],
+            "LastName": self.names["LastName"][slot],
+            "DoB": MISSING if np.isnat(dob) else str(dob),
+        }
+        for field in CATEGORIES:
+            code = self.codes[field][slot]
+            values[field] = MISSING if code == NO_CODE else self.categories[field][code]
+
+        applicant = {}
+        for field in FIELDS:
+            if field in extra:
+                applicant[field] = extra[field]
+            elif values[field] is not MISSING:
+                applicant[field] = values[field]
+
+        applicant["Applicant_ID"] = int(self.applicant_ids[slot])
+        for field, value in extra.items():
+            if field not in FIELDS:
+                applicant[field] = value
+
+        return applicant
+
+    # The slots matching the filters as a boolean mask over the first count
+    # slots. LastName, Gender and ResidencyState must match exactly, DoB is
+    # a (first, last) range of datetime64 days, either end may be None.
+    def _match(self, filters: dict):
+
+        matches = self.live[:self.count].copy()
+
+        for field, value in filters.items():
+            if field == "DoB":
+                first, last = value
+                dobs = self.dobs[:self.count]
+                if first is not None:
+                    matches &= dobs >= first
+                if last is not None:
+                    matches &= dobs <= last
+            elif field in CATEGORIES:
+                code = self.category_codes[field].get(value)
+                if code is None:
+                    return np.zeros(self.count, dtype=np.bool_)
+                matches &= self.codes[field][:self.count] == code
+            else:
+                matches &= self.names[field][:self.count] == value
+
+        return matches
+
+    # The age band (an index into AGE_BANDS) of each of the first count
+    # slots on the day today, -1 where the age is not known. Someone is at
+    # least n years old when born on or before latest_birthday(today, n),
+    # so the bands come from one binary search of each DoB among a handful
+    # of dates, no calendar arithmetic per applicant.
+    def _bands(self, today: date):
+
+        edges = np.array([latest_birthday(today, years) for years in reversed(AGE_BANDS)])
+        return len(AGE_BANDS) - 1 - np.searchsorted(edges, self.dobs[:self.count], side="left")
+
+
+
+# =============================================
+# Create, Read, Update, Delete (CRUD) methods as:
+# list (all), create, read, update, delete, for consistency.
+# =============================================
+
+
+    # Get a list of all the applicants, or one page of them: up to limit
+    # applicants with an Applicant_ID above after.
+    def list_applicants(self, limit: int = None, after: int = None):
+
+        with self.lock.reading():
+            start = bisect.bisect_right(self.ids, after) if after is not None else 0
+            stop = start + limit if limit is not None else len(self.ids)
+            rows = self._rows([self.index[applicant_id] for applicant_id in self.ids[start:stop]])
+
+        if not rows and limit is None and after is None:
+            raise HTTPException(status_code = 404, detail = "No applicants found in memory!")
+
+        return rows
+
+
+    # Create a new applicant.
+    def create_applicant(self, applicant: dict):
+
+        with self.lock.writing():
+            applicant["Applicant_ID"] = self.current_id
+            self._write(self._new_slot(), self.current_id, applicant)
+            self.ids.append(self.current_id)  # The new ID is the highest, the list stays sorted.
+            self.current_id += 1
+
+        return {"create_applicant": "The applicant was created.", "applicant": applicant}
+
+
+    # Get an applicant by their ID.
+    def read_applicant(self, applicant_id: int):
+
+        with self.lock.reading():
+            slot = self.index.get(applicant_id)
+            if slot is not None:
+                return self._row(slot)
+
+        raise HTTPException(status_code = 404, detail = "Applicant ID was not found.")
+
+
+    # Search the applicants with vectorized scans of the columns. LastName
+    # and ResidencyState must match exactly, DoB_from and DoB_to (ISO dates,
+    # either may be left out) bound the date of birth, both ends included.
+    # Returns the matches in Applicant_ID order.
+    def search_applicants(self, filters: dict):
+
+        filters = {field: value for field, value in filters.items() if value is not None}
+        first = self._search_date(filters.pop("DoB_from", None))
+        last = self._search_date(filters.pop("DoB_to", None))
+        if first is not None or last is not None:
+            filters["DoB"] = (first, last)
+
+        with self.lock.reading():
+            slots = np.flatnonzero(self._match(filters))
+            slots = slots[np.argsort(self.applicant_ids[slots], kind="stable")]
+            applicants = self._rows(slots)
+
+        if not applicants:
+            raise HTTPException(status_code = 404, detail = "No applicants match the search.")
+
+        return applicants
+
+    # A search date as datetime64, 422 if it is not an ISO date.
+    def _search_date(self, value):
+
+        if value is None:
+            return None
+        if not is_iso_date(value):
+            raise HTTPException(status_code = 422, detail = "{} is not a date (YYYY-MM-DD).".format(value))
+
+        return np.datetime64(value, "D")
+
+    # Count the applicants by state, gender and age band, same filters and
+    # result as InMemoryPersistence.applicant_stats. The ages, the filters
+    # and the counts are whole-column operations.
+    def applicant_stats(self, filters: dict, today: date = None):
+
+        filters = {field: value for field, value in filters.items() if value is not None}
+        age_min = filters.pop("age_min", None)
+        age_max = filters.pop("age_max", None)
+        today = today or date.today()
+
+        with self.lock.reading():
+            matches = self._match(filters)
+            if age_min is not None or age_max is not None:
+                dobs = self.dobs[:self.count]  # NaT compares False, so no known age means no match.
+                matches &= dobs <= latest_birthday(today, age_min or 0)
+                if age_max is not None:
+                    matches &= dobs > latest_birthday(today, age_max + 1)
+
+            counts = {}
+            for field in CATEGORIES:
+                codes = self.codes[field][:self.count][matches]
+                per_code = np.bincount(codes[codes != NO_CODE], minlength=len(self.categories[field]))
+                counts[field] = {value: int(n) for value, n in zip(self.categories[field], per_code) if n}
+
+            bands = self._bands(today)[matches]
+            known = bands[bands >= 0]
+            band_counts = np.bincount(known, minlength=len(AGE_BANDS))
+            count = int(matches.sum())
+
+        return stats_result(count, counts["ResidencyState"], counts["Gender"], band_counts.tolist(),
+                            count - len(known), today)
+
+
+    # Update an existing applicant details.
+    def update_applicant(self, applicant_id: int, updated_applicant: dict):
+
+        with self.lock.writing():
+            slot = self.index.get(applicant_id)
+            if slot is not None:
+                updated_applicant["Applicant_ID"] = applicant_id
+                self._write(slot, applicant_id, updated_applicant)
+
+                return {"update_applicant": "The applicant was updated.", "applicant": updated_applicant}
+
+        raise HTTPException(status_code = 404, detail = "Applicant ID was not found.")
+
+
+    # Delete an applicant by their ID, its slot goes on the free list.
+    def delete_applicant(self, applicant_id: int):
+
+        with self.lock.writing():
+            slot = self.index.pop(applicant_id, None)
+            if slot is not None:
+                self.live[slot] = False
+                self.extra.pop(slot, None)
+                self.free.append(slot)
+                del self.ids[bisect.bisect_left(self.ids, applicant_id)]
+
+                return {"delete_applicant": "Applicant deleted."}
+
+        raise HTTPException(status_code = 404, detail = "Applicant ID was not found.")
+
+
+# The last date of birth of someone who is years old or older on the day
+# today. A 29 February birthday counts from 1 March in other years, like
+# age_on. Before the first ISO date if nobody can be that old.
+def latest_birthday(today: date, years: int):
+
+    if years >= today.year:
+        return np.datetime64("0001-01-01", "D") - 1
+    try:
+        return np.datetime64(today.replace(year=today.year - years), "D")
+    except ValueError:
+        return np.datetime64(today.replace(year=today.year - years, day=28), "D")  # Today is 29 February.
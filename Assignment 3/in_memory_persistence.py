@@ -10,7 +10,31 @@ Version: 1.0.0.0000
 Description: 
 	The in_memory_persistence.py module for the in-memory data storage to manage
     applicant records. The persistence is designed to allow temporary data 
-    storage, meaning that all records will be lost when the application restarts. 
+    storage, meaning that all records will be lost when the application restarts
+    (unless it is given a data folder, see below).
+
+    Optionally the store survives restarts: given a data folder, every
+    write is appended to a journal (one JSON line per create, update or
+    delete) and every SNAPSHOT_EVERY journal lines a background thread
+    writes a binary snapshot of all the applicants and drops the journals
+    it covers. A restart loads the newest snapshot (memory-mapped) and
+    replays only the journal written after it, instead of rebuilding the
+    store from the applicants' source.
+
+    The applicants are kept as compact ApplicantRecord objects (__slots__,
+    DoB as a date ordinal, Gender and ResidencyState interned) and turned
+    back into dictionaries when they leave the store.
+
+    search_applicants finds applicants by LastName and ResidencyState through
+    hash indexes and by a DoB range through a sorted index, all kept up to
+    date by the create, update and delete calls.
+
+    The store is shared by the FastAPI threadpool. Writers take a
+    ReadWriteLock exclusively, readers share it, and records are never
+    changed in place (an update puts in a new record). So a reader only
+    holds the lock while it copies the references it needs, and turns them
+    into dictionaries after letting go. list_applicants keeps the copy as a
+    snapshot until the next write.
 """
 
 # =============================================
@@ -27,37 +51,359 @@ from fastapi import HTTPException # Import HTTPException to handle HTTP errors.
 from pydantic import BaseModel # Import Pydantic's model for request/response validation.
 from datetime import date # Import date to handle member date of birth (DOB) fields.
 from typing import List # Import List for type hinting when returning a list of members.
+import bisect # Import bisect to find the start of a page in the sorted IDs.
+import gc # Import gc to hold off the collector while a restart builds the records.
+import glob # Import glob to find the journal files.
+import json # Import json for the journal lines.
+import mmap # Import mmap to map the snapshot file instead of reading it.
+import os # Import os for the snapshot and journal files.
+import pickle # Import pickle for the binary snapshot.
+import sys # Import sys to intern the repeated Gender and ResidencyState values.
+import threading # Import threading for the readers-writer lock.
 
 app = FastAPI()
 
-class InMemoryPersistence:
+HASH_INDEXES = ["LastName", "ResidencyState"]  # Fields searched by exact value.
+SNAPSHOT_FILE = "applicants.snapshot"
+JOURNAL_PREFIX = "applicants.journal."  # Followed by the generation, 8 digits.
+SNAPSHOT_EVERY = 50_000  # Journal lines between two snapshots.
+AGE_BANDS = [0, 18, 25, 35, 45, 55, 65]  # Lower ends of the age bands of applicant_stats.
+MIN_ORDINAL = date.min.toordinal()  # Range of the DoB ordinals.
+MAX_ORDINAL = date.max.toordinal()
+
+# Predefined members, with 10 initial members. Shared with the columnar
+# store in in_memory_columnar_persistence.py.
+# https://www.analyticsvidhya.com/blog/2024/02/how-to-create-a-list-of-dictionaries-in-python/
+MEMBERS = [
+    {"FirstName": "Alice", "LastName": "Johnson", "DoB": "1992-06-15", "Gender": "Female", "ResidencyState": "Idaho"},
+    {"FirstName": "Bob", "LastName": "Smith", "DoB": "1988-11-22", "Gender": "Male", "ResidencyState": "Idaho"},
+    {"FirstName": "Charlie", "LastName": "Brown", "DoB": "1995-04-08", "Gender": "Non-binary", "ResidencyState": "Idaho"},
+    {"FirstName": "Diana", "LastName": "King", "DoB": "1980-07-30", "Gender": "Female", "ResidencyState": "Idaho"},
+    {"FirstName": "Edward", "LastName": "White", "DoB": "1999-02-14", "Gender": "Male", "ResidencyState": "Idaho"},
+    {"FirstName": "Fiona", "LastName": "Adams", "DoB": "1993-09-27", "Gender": "Female", "ResidencyState": "Idaho"},
+    {"FirstName": "George", "LastName": "Hill", "DoB": "1985-12-03", "Gender": "Male", "ResidencyState": "Idaho"},
+    {"FirstName": "Hannah", "LastName": "Scott", "DoB": "2000-05-19", "Gender": "Female", "ResidencyState": "Idaho"},
+    {"FirstName": "Isaac", "LastName": "Thomas", "DoB": "1997-03-10", "Gender": "Male", "ResidencyState": "Idaho"},
+    {"FirstName": "Julia", "LastName": "Martin", "DoB": "1990-08-25", "Gender": "Female", "ResidencyState": "Idaho"},
+]
+
+
+# True for a string that is an ISO date (YYYY-MM-DD), the only DoB the
+# applicant stores keep as a date.
+def is_iso_date(value):
+
+    if not isinstance(value, str):
+        return False
+    try:
+        return date.fromisoformat(value).isoformat() == value
+    except ValueError:
+        return False
+
+
+# The DoB of a record as a date ordinal, None when it has none. Only an
+# ISO date is stored as an ordinal, but a DoB sent as a number (or a
+# snapshot written before that rule) must not turn into a date, or fail
+# date.fromordinal when it is read back.
+def dob_ordinal(record):
+
+    dob = record.DoB
+    if type(dob) is int and MIN_ORDINAL <= dob <= MAX_ORDINAL:
+        return dob
+
+    return None
+
+
+# The age in whole years on the day today of someone born on the date
+# ordinal dob. A 29 February birthday counts from 1 March in other years.
+def age_on(today: date, dob: int):
+    born = date.fromordinal(dob)
+    return today.year - born.year - ((born.month, born.day) > (today.month, today.day))
+
+
+# The name of an age band, "18-24", or "65+" for the last one.
+def age_band_label(band: int):
+
+    if band + 1 < len(AGE_BANDS):
+        return "{}-{}".format(AGE_BANDS[band], AGE_BANDS[band + 1] - 1)
+
+    return "{}+".format(AGE_BANDS[band])
+
+
+# The result of applicant_stats, the same for both applicant stores.
+# band_counts holds one count per entry of AGE_BANDS.
+def stats_result(count: int, by_state: dict, by_gender: dict, band_counts: list, unknown_age: int, today: date):
+    return {
+        "applicants": count,
+        "as_of": today.isoformat(),
+        "by_state": dict(sorted(by_state.items())),
+        "by_gender": dict(sorted(by_gender.items())),
+        "age_bands": {age_band_label(band): int(n) for band, n in enumerate(band_counts)},
+        "unknown_age": unknown_age,  # No DoB, not an ISO date, or in the future.
+    }
+
+
+# Slot value of a field the applicant does not have. A class rather than
+# object(), so it pickles by name and is still MISSING after a snapshot
+# is loaded.
+class MISSING:
+    pass
+
+
+# One applicant, stored compactly. A dictionary per applicant costs several
+# hundred bytes for the hash table alone, the slots hold the same fields
+# in a fixed layout. DoB is kept as a date ordinal (an int) when it is an
+# ISO date, Gender and ResidencyState are interned so every applicant with
+# the same value shares one string. Fields the store does not know about,
+# and a DoB that is not an ISO date, go to extra.
+class ApplicantRecord:
+
+    __slots__ = ("Applicant_ID", "FirstName", "LastName", "DoB", "Gender", "ResidencyState", "extra")
+    FIELDS = ("FirstName", "LastName", "DoB", "Gender", "ResidencyState")
+
+    def __init__(self, applicant_id: int, applicant: dict):
+
+        self.Applicant_ID = applicant_id
+        self.extra = None
+        for field in self.FIELDS:
+            setattr(self, field, MISSING)
+
+        for field, value in applicant.items():
+            if field == "DoB":
+                if is_iso_date(value):
+                    self.DoB = date.fromisoformat(value).toordinal()
+                else:
+                    self.extra = self.extra or {}
+                    self.extra[field] = value
+            elif field in ("Gender", "ResidencyState") and isinstance(value, str):
+                setattr(self, field, sys.intern(value))
+            elif field in self.FIELDS:
+                setattr(self, field, value)
+            elif field != "Applicant_ID":
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[field] = value
+
+    # The applicant as a dictionary, the way the API returns it.
+    def to_dict(self):
+
+        applicant = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if field == "DoB" and value is MISSING and self.extra:
+                value = self.extra.get("DoB", MISSING)  # Keeps DoB in its place.
+            if value is not MISSING:
+                applicant[field] = value
+
+        dob = dob_ordinal(self)
+        if dob is not None:
+            applicant["DoB"] = date.fromordinal(dob).isoformat()
+
+        applicant["Applicant_ID"] = self.Applicant_ID
+        if self.extra:
+            applicant.update(self.extra)
+
+        return applicant
+
+    # The slots as a plain tuple, the form the snapshot stores. Tuples
+    # pickle and unpickle several times faster than the objects.
+    def to_tuple(self):
+        return (self.Applicant_ID, self.FirstName, self.LastName, self.DoB, self.Gender, self.ResidencyState, self.extra)
+
+    # Back from to_tuple, without going through __init__ again.
+    @classmethod
+    def from_tuple(cls, values: tuple):
+        record = object.__new__(cls)
+        (record.Applicant_ID, record.FirstName, record.LastName, record.DoB,
+         record.Gender, record.ResidencyState, record.extra) = values
+        return record
+
+
+# A readers-writer lock: any number of readers, or one writer. A waiting
+# writer keeps new readers out, so a steady stream of reads can not starve
+# the writes.
+class ReadWriteLock:
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0  # Readers holding the lock.
+        self._writer = False  # A writer holds the lock.
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writer or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+    # with lock.reading(): ... and with lock.writing(): ...
+    def reading(self):
+        return Held(self.acquire_read, self.release_read)
+
+    def writing(self):
+        return Held(self.acquire_write, self.release_write)
+
+
+# The with block of ReadWriteLock.reading() and writing().
+class Held:
+
+    __slots__ = ("acquire", "release")
+
+    def __init__(self, acquire, release):
+        self.acquire = acquire
+        self.release = release
+
+    def __enter__(self):
+        self.acquire()
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+# Secondary indexes over the applicants: a hash index (value -> set of
+# Applicant_IDs) per field in HASH_INDEXES and a sorted list of
+# (DoB ordinal, Applicant_ID) pairs for the DoB ranges.
+class ApplicantIndexes:
 
-    # Initializes the in-memory database for applicants.
     def __init__(self):
+        self.hashes = {field: {} for field in HASH_INDEXES}
+        self.dobs = []
+
+    # Index an applicant.
+    def add(self, record: ApplicantRecord):
+
+        for field in HASH_INDEXES:
+            value = getattr(record, field)
+            if value is not MISSING and value is not None:
+                self.hashes[field].setdefault(value, set()).add(record.Applicant_ID)
+
+        dob = dob_ordinal(record)
+        if dob is not None:
+            bisect.insort(self.dobs, (dob, record.Applicant_ID))
+
+    # Index many applicants at once, the DoB list is sorted once at the end
+    # instead of an insort per applicant. A sorted list with a short run
+    # appended sorts in about one pass.
+    def add_all(self, records):
+
+        for record in records:
+            for field in HASH_INDEXES:
+                value = getattr(record, field)
+                if value is not MISSING and value is not None:
+                    self.hashes[field].setdefault(value, set()).add(record.Applicant_ID)
+
+        self.dobs.extend((record.DoB, record.Applicant_ID) for record in records if dob_ordinal(record) is not None)
+        self.dobs.sort()
+
+    # Drop many applicants at once, the DoB list is filtered in one pass
+    # instead of a delete per applicant.
+    def remove_all(self, records):
+
+        for record in records:
+            for field in HASH_INDEXES:
+                ids = self.hashes[field].get(getattr(record, field))
+                if ids is not None:
+                    ids.discard(record.Applicant_ID)
+                    if not ids:
+                        del self.hashes[field][getattr(record, field)]
+
+        dropped = {(record.DoB, record.Applicant_ID) for record in records if dob_ordinal(record) is not None}
+        if dropped:
+            self.dobs = [pair for pair in self.dobs if pair not in dropped]
+
+    # Drop an applicant from the indexes.
+    def remove(self, record: ApplicantRecord):
+
+        for field in HASH_INDEXES:
+            ids = self.hashes[field].get(getattr(record, field))
+            if ids is not None:
+                ids.discard(record.Applicant_ID)
+                if not ids:
+                    del self.hashes[field][getattr(record, field)]
+
+        dob = dob_ordinal(record)
+        if dob is not None:
+            position = bisect.bisect_left(self.dobs, (dob, record.Applicant_ID))
+            if position < len(self.dobs) and self.dobs[position] == (dob, record.Applicant_ID):
+                del self.dobs[position]
+
+    # Return the Applicant_IDs matching every filter as a set, or None
+    # without filters. The fields of HASH_INDEXES must match exactly, DoB is
+    # a (first, last) range of ordinals, either end may be None. The
+    # candidate sets are intersected smallest first.
+    def search(self, filters: dict):
+
+        candidates = []
+        for field, value in filters.items():
+            if field == "DoB":
+                first, last = value
+                start = bisect.bisect_left(self.dobs, (first,)) if first is not None else 0
+                stop = bisect.bisect_right(self.dobs, (last, float("inf"))) if last is not None else len(self.dobs)
+                candidates.append({applicant_id for _, applicant_id in self.dobs[start:stop]})
+            else:
+                candidates.append(self.hashes[field].get(value, set()))
+
+        if not candidates:
+            return None
+
+        candidates.sort(key=len)
+        return candidates[0].intersection(*candidates[1:])
+
+
+class InMemoryPersistence:
+
+    # Initializes the in-memory database for applicants. With a data_folder
+    # the applicants are loaded from its snapshot and journals, and kept
+    # there from now on; without one they start from MEMBERS and
+    # are gone on restart.
+    def __init__(self, data_folder: str = None, snapshot_every: int = SNAPSHOT_EVERY):
  
-        self.applicants = {}  # Dictionary to store applicants in memory
+        self.applicants = {}  # Dictionary to store applicants (ApplicantRecord) in memory
         self.current_id = 1   # Set the counter for the first Applicant_ID
+        self.ids = []  # Applicant_IDs in ascending order, for the pages.
+        self.indexes = ApplicantIndexes()  # Secondary indexes for search_applicants.
+        self.lock = ReadWriteLock()  # Shared by the readers, exclusive for the writers.
+        self.version = 0  # Counts the writes, tells a snapshot whether it is current.
+        self._snapshot = (-1, ())  # (version, every record in Applicant_ID order)
 
-        # Predefined members, with 10 initial members.
-        # https://www.analyticsvidhya.com/blog/2024/02/how-to-create-a-list-of-dictionaries-in-python/
-        members = [
-            {"FirstName": "Alice", "LastName": "Johnson", "DoB": "1992-06-15", "Gender": "Female", "ResidencyState": "Idaho"},
-            {"FirstName": "Bob", "LastName": "Smith", "DoB": "1988-11-22", "Gender": "Male", "ResidencyState": "Idaho"},
-            {"FirstName": "Charlie", "LastName": "Brown", "DoB": "1995-04-08", "Gender": "Non-binary", "ResidencyState": "Idaho"},
-            {"FirstName": "Diana", "LastName": "King", "DoB": "1980-07-30", "Gender": "Female", "ResidencyState": "Idaho"},
-            {"FirstName": "Edward", "LastName": "White", "DoB": "1999-02-14", "Gender": "Male", "ResidencyState": "Idaho"},
-            {"FirstName": "Fiona", "LastName": "Adams", "DoB": "1993-09-27", "Gender": "Female", "ResidencyState": "Idaho"},
-            {"FirstName": "George", "LastName": "Hill", "DoB": "1985-12-03", "Gender": "Male", "ResidencyState": "Idaho"},
-            {"FirstName": "Hannah", "LastName": "Scott", "DoB": "2000-05-19", "Gender": "Female", "ResidencyState": "Idaho"},
-            {"FirstName": "Isaac", "LastName": "Thomas", "DoB": "1997-03-10", "Gender": "Male", "ResidencyState": "Idaho"},
-            {"FirstName": "Julia", "LastName": "Martin", "DoB": "1990-08-25", "Gender": "Female", "ResidencyState": "Idaho"},
-        ]
+        self.data_folder = data_folder
+        self.snapshot_every = snapshot_every
+        self._journal = None  # Open journal file, None without a data folder.
+        self._generation = 0  # Number of the open journal.
+        self._journal_lines = 0  # Journal lines since the last snapshot.
+        self._snapshotting = threading.Lock()  # One snapshot at a time.
+        self._snapshot_thread = None  # The running background snapshot, if any.
+
+        if data_folder is not None and self._restore():
+            return
 
         # Load the initial applicants.
-        for member in members:
-            member["Applicant_ID"] = self.current_id  # Assign a unique Applicant_ID.
-            self.applicants[self.current_id] = member  # Store applicant in dictionary.
-            self.current_id += 1 # At the end of the load this should be set to 11.
+        for member in MEMBERS:
+            self._create(self.current_id, member)  # Store applicant with a unique Applicant_ID.
+            # At the end of the load current_id should be set to 11.
+
+        # A new data folder starts out with a snapshot of the members.
+        if data_folder is not None:
+            self._open_journal(1)
+            self.snapshot()
 
 
 
@@ -67,21 +413,52 @@ class InMemoryPersistence:
 # =============================================
 
 
-    # Get a list of all the applicants.
-    def list_applicants(self):
+    # Get a list of all the applicants, or one page of them: up to limit
+    # applicants with an Applicant_ID above after. The page starts with a
+    # bisect of the sorted IDs, so it costs the page size, not the count.
+    def list_applicants(self, limit: int = None, after: int = None):
  
-        if not self.applicants:
-            raise HTTPException(status_code = 404, detail = "No applicants found in memory!")
+        if limit is None and after is None:
+            records = self._load_snapshot()
+            if not records:
+                raise HTTPException(status_code = 404, detail = "No applicants found in memory!")
+
+            return [record.to_dict() for record in records]  # Return all applicants as a list of dictionaries
+
+        with self.lock.reading():
+            start = bisect.bisect_right(self.ids, after) if after is not None else 0
+            stop = start + limit if limit is not None else len(self.ids)
+            records = [self.applicants[applicant_id] for applicant_id in self.ids[start:stop]]
 
-        return list(self.applicants.values())  # Return all applicants as a list of dictionaries
+        return [record.to_dict() for record in records]
+
+    # Every record in Applicant_ID order as of one moment. Reused until the
+    # next write; a new copy holds the read lock only for copying the
+    # references, the writers wait for that and nothing else.
+    def _load_snapshot(self):
+
+        version, records = self._snapshot
+        if version == self.version:
+            return records
+
+        with self.lock.reading():
+            version = self.version
+            records = tuple(self.applicants.values())
+
+        self._snapshot = (version, records)
+        return records
 
 
     # Create a new applicant.
     def create_applicant(self, applicant: dict):
         
-        applicant["Applicant_ID"] = self.current_id # Should be set to 11 for 1st create.
-        self.applicants[self.current_id] = applicant
-        self.current_id += 1
+        with self.lock.writing():
+            applicant["Applicant_ID"] = self.current_id # Should be set to 11 for 1st create.
+            self._create(self.current_id, applicant)
+            self._log({"op": "create", "Applicant_ID": applicant["Applicant_ID"], "applicant": applicant})
+            self.version += 1
+
+        self._maybe_snapshot()
 
         return {"create_applicant": "The applicant was created.", "applicant": applicant}
 
@@ -89,19 +466,104 @@ class InMemoryPersistence:
     # Get an applicant by their ID.
     def read_applicant(self, applicant_id: int):
         
-        if applicant_id in self.applicants:
-            return self.applicants[applicant_id]
+        with self.lock.reading():
+            record = self.applicants.get(applicant_id)
+
+        if record is not None:
+            return record.to_dict()
         
         raise HTTPException(status_code = 404, detail = "Applicant ID was not found.")
 
 
+    # Search the applicants through the secondary indexes. LastName and
+    # ResidencyState must match exactly, DoB_from and DoB_to (ISO dates,
+    # either may be left out) bound the date of birth, both ends included.
+    # Returns the matches in Applicant_ID order.
+    def search_applicants(self, filters: dict):
+
+        filters = {field: value for field, value in filters.items() if value is not None}
+        first = self._search_date(filters.pop("DoB_from", None))
+        last = self._search_date(filters.pop("DoB_to", None))
+        if first is not None or last is not None:
+            filters["DoB"] = (first, last)
+
+        with self.lock.reading():
+            applicant_ids = self.indexes.search(filters)
+            if applicant_ids is None:
+                applicant_ids = self.applicants.keys()
+            records = [self.applicants[applicant_id] for applicant_id in sorted(applicant_ids)]
+
+        applicants = [record.to_dict() for record in records]
+
+        if not applicants:
+            raise HTTPException(status_code = 404, detail = "No applicants match the search.")
+
+        return applicants
+
+    # Count the applicants by state, gender and age band. ResidencyState and
+    # Gender must match exactly, age_min and age_max (whole years as of
+    # today, both included) leave out everyone without a known age. Runs
+    # over the list_applicants snapshot, one record at a time.
+    def applicant_stats(self, filters: dict, today: date = None):
+
+        filters = {field: value for field, value in filters.items() if value is not None}
+        age_min = filters.pop("age_min", None)
+        age_max = filters.pop("age_max", None)
+        today = today or date.today()
+
+        count = unknown_age = 0
+        by_state = {}
+        by_gender = {}
+        band_counts = [0] * len(AGE_BANDS)
+
+        for record in self._load_snapshot():
+            if any(getattr(record, field) != value for field, value in filters.items()):
+                continue
+
+            dob = dob_ordinal(record)
+            age = age_on(today, dob) if dob is not None else -1
+            if age_min is not None or age_max is not None:
+                if age < 0 or (age_min is not None and age < age_min) or (age_max is not None and age > age_max):
+                    continue
+
+            count += 1
+            if isinstance(record.ResidencyState, str):
+                by_state[record.ResidencyState] = by_state.get(record.ResidencyState, 0) + 1
+            if isinstance(record.Gender, str):
+                by_gender[record.Gender] = by_gender.get(record.Gender, 0) + 1
+            if age < 0:
+                unknown_age += 1
+            else:
+                band_counts[bisect.bisect_right(AGE_BANDS, age) - 1] += 1
+
+        return stats_result(count, by_state, by_gender, band_counts, unknown_age, today)
+
+    # The ordinal of a search date, 422 if it is not an ISO date.
+    def _search_date(self, value):
+
+        if value is None:
+            return None
+        try:
+            return date.fromisoformat(value).toordinal()
+        except ValueError:
+            raise HTTPException(status_code = 422, detail = "{} is not a date (YYYY-MM-DD).".format(value))
+
+
     # Update an existing applicant details.
     def update_applicant(self, applicant_id: int, updated_applicant: dict):
        
-        if applicant_id in self.applicants:
-            updated_applicant["Applicant_ID"] = applicant_id
-            self.applicants[applicant_id] = updated_applicant
-            
+        with self.lock.writing():
+            if applicant_id in self.applicants:
+                updated_applicant["Applicant_ID"] = applicant_id
+                self._update(applicant_id, updated_applicant)
+                self._log({"op": "update", "Applicant_ID": applicant_id, "applicant": updated_applicant})
+                self.version += 1
+                updated = True
+            else:
+                updated = False
+
+        if updated:
+            self._maybe_snapshot()
             return {"update_applicant": "The applicant was updated.", "applicant": updated_applicant}
         
         raise HTTPException(status_code = 404, detail = "Applicant ID was not found.")
@@ -110,9 +572,238 @@ class InMemoryPersistence:
     # Delete an applicant by their ID.
     def delete_applicant(self, applicant_id: int):
  
-        if applicant_id in self.applicants:
-            del self.applicants[applicant_id]
+        with self.lock.writing():
+            if applicant_id in self.applicants:
+                self._delete(applicant_id)
+                self._log({"op": "delete", "Applicant_ID": applicant_id})
+                self.version += 1
+                deleted = True
+            else:
+                deleted = False
 
+        if deleted:
+            self._maybe_snapshot()
             return {"delete_applicant": "Applicant deleted."}
         
         raise HTTPException(status_code = 404, detail = "Applicant ID was not found.")
+
+
+
+# =============================================
+# Changes made by the CRUD methods.
+# The caller holds the write lock, or is still in __init__.
+# =============================================
+
+    def _create(self, applicant_id: int, applicant: dict):
+        record = ApplicantRecord(applicant_id, applicant)
+        self.applicants[applicant_id] = record
+        self.indexes.add(record)
+        self.ids.append(applicant_id)  # The new ID is the highest, the list stays sorted.
+        self.current_id = applicant_id + 1
+
+    def _update(self, applicant_id: int, applicant: dict):
+        self.indexes.remove(self.applicants[applicant_id])
+        self.applicants[applicant_id] = ApplicantRecord(applicant_id, applicant)
+        self.indexes.add(self.applicants[applicant_id])
+
+    def _delete(self, applicant_id: int):
+        self.indexes.remove(self.applicants[applicant_id])
+        del self.applicants[applicant_id]
+        del self.ids[bisect.bisect_left(self.ids, applicant_id)]
+
+
+# =============================================
+# Snapshot and journal, only with a data folder.
+# =============================================
+
+    # Append one change to the journal. Runs under the write lock, so the
+    # journal holds the changes in the order they were made. Flushed, not
+    # fsynced: a crashed process loses nothing, a power cut may lose the
+    # last few writes.
+    def _log(self, entry: dict):
+
+        if self._journal is None:
+            return
+
+        self._journal.write(json.dumps(entry) + "\n")
+        self._journal.flush()
+        self._journal_lines += 1
+
+    # Start writing to journal number generation.
+    def _open_journal(self, generation: int):
+
+        if self._journal is not None:
+            self._journal.close()
+
+        self._generation = generation
+        self._journal = open(self._journal_path(generation), "a", encoding="utf-8")
+
+    def _journal_path(self, generation: int):
+        return os.path.join(self.data_folder, "{}{:08d}".format(JOURNAL_PREFIX, generation))
+
+    # The journals in the data folder as (generation, path), oldest first.
+    def _journals(self):
+
+        journals = []
+        for path in glob.glob(os.path.join(self.data_folder, JOURNAL_PREFIX + "*")):
+            suffix = path[len(os.path.join(self.data_folder, JOURNAL_PREFIX)):]
+            if suffix.isdigit():
+                journals.append((int(suffix), path))
+
+        return sorted(journals)
+
+    # Start background snapshot once enough journal lines piled up.
+    def _maybe_snapshot(self):
+
+        if self._journal is None or self._journal_lines < self.snapshot_every:
+            return
+
+        if self._snapshot_thread is None or not self._snapshot_thread.is_alive():
+            self._snapshot_thread = threading.Thread(target=self.snapshot, daemon=True)
+            self._snapshot_thread.start()
+
+    # Write a snapshot of every applicant and drop the journals it covers.
+    # The records are copied and a new journal is started under the read
+    # lock (the writers are the only ones touching the journal, the read
+    # lock keeps them out), the indexes, the pickling and the disk write
+    # run after letting go. The indexes go into the snapshot, so a restart
+    # does not have to build them. The snapshot is written to a temp file and renamed, so a
+    # crash part way through leaves the previous snapshot and its journals.
+    def snapshot(self):
+
+        if self.data_folder is None:
+            return {"snapshot": "The applicants are kept in memory only.", "applicants": len(self.applicants)}
+
+        with self._snapshotting:
+            with self.lock.reading():
+                records = tuple(self.applicants.values())
+                current_id = self.current_id
+                generation = self._generation
+                self._open_journal(generation + 1)
+                self._journal_lines = 0
+
+            indexes = ApplicantIndexes()
+            indexes.add_all(records)
+
+            state = {
+                "generation": generation,  # The last journal the snapshot covers.
+                "current_id": current_id,
+                "records": [record.to_tuple() for record in records],
+                "hashes": indexes.hashes,
+                "dobs": indexes.dobs,
+            }
+
+            path = os.path.join(self.data_folder, SNAPSHOT_FILE)
+            temp_path = "{}.{}.tmp".format(path, os.getpid())
+            with open(temp_path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+
+            for journal_generation, journal_path in self._journals():
+                if journal_generation <= generation:
+                    os.remove(journal_path)
+
+        return {"snapshot": "The applicants were written to a snapshot.", "applicants": len(records)}
+
+    # Load the newest snapshot and replay the journals written after it,
+    # then continue in a new journal. Returns False for an empty data
+    # folder, the caller seeds it. The records only hold strings, numbers
+    # and tuples, so the collector has nothing to find while they are built
+    # and would otherwise scan the growing heap over and over.
+    def _restore(self):
+
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._load_data_folder()
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _load_data_folder(self):
+
+        os.makedirs(self.data_folder, exist_ok=True)
+        snapshot_path = os.path.join(self.data_folder, SNAPSHOT_FILE)
+        journals = self._journals()
+
+        if not os.path.exists(snapshot_path) and not journals:
+            return False
+
+        generation = 0
+        if os.path.exists(snapshot_path):
+            state = self._read_snapshot(snapshot_path)
+            generation = state["generation"]
+            self.current_id = state["current_id"]
+
+            records = map(ApplicantRecord.from_tuple, state["records"])
+            self.applicants = {record.Applicant_ID: record for record in records}
+            self.indexes.hashes = state["hashes"]
+            self.indexes.dobs = state["dobs"]
+
+        replaced = {}  # Applicant_ID -> record before the replay, None if created by it.
+        for journal_generation, journal_path in journals:
+            if journal_generation > generation:
+                self._replay(journal_path, replaced)
+                generation = journal_generation
+
+        # Index the replayed changes in one go.
+        self.indexes.remove_all([record for record in replaced.values() if record is not None])
+        self.indexes.add_all([self.applicants[applicant_id] for applicant_id in replaced if applicant_id in self.applicants])
+
+        # IDs are never reused and an update keeps the place of its key, so
+        # the dictionary is in Applicant_ID order.
+        self.ids = list(self.applicants)
+
+        self._open_journal(generation + 1)
+        self._maybe_snapshot()
+
+        return True
+
+    # Unpickle the snapshot straight from a memory map of the file, which
+    # saves reading it into a bytes object first. Falls back to reading it
+    # where the file can not be mapped.
+    def _read_snapshot(self, path: str):
+
+        with open(path, "rb") as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return pickle.loads(mapped)
+            except (ValueError, OSError):
+                f.seek(0)
+                return pickle.load(f)
+
+    # Apply the changes of one journal to the applicants, leaving the
+    # indexes to _restore: replaced collects the record each changed
+    # Applicant_ID had before. A process killed part way through an append
+    # leaves a torn last line, it was never acknowledged and is skipped. The
+    # replayed lines count toward the next snapshot.
+    def _replay(self, path: str, replaced: dict):
+
+        with open(path, encoding="utf-8") as journal:
+            lines = journal.read().split("\n")
+
+        for line in lines[:-1]:
+            if not line:
+                continue
+
+            entry = json.loads(line)
+            applicant_id = entry["Applicant_ID"]
+            if applicant_id not in replaced:
+                replaced[applicant_id] = self.applicants.get(applicant_id)
+
+            if entry["op"] == "delete":
+                del self.applicants[applicant_id]
+            else:
+                self.applicants[applicant_id] = ApplicantRecord(applicant_id, entry["applicant"])
+                self.current_id = max(self.current_id, applicant_id + 1)
+            self._journal_lines += 1
+
+    # Close the journal, for tests and benchmarks that reopen the folder.
+    def close(self):
+
+        with self.lock.writing():
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
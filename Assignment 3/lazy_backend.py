@@ -0,0 +1,63 @@
+"""
+Script Name: [lazy_backend.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	The lazy_backend.py module holds the place of a backend (a persistence
+    store or a repository) until it is first used. main.py builds every
+    backend through a LazyBackend, so importing main, and a new worker's
+    first response, do not wait for the imports (pandas, NumPy), files and
+    database set-up of backends the request does not touch.
+
+    The first attribute looked up on a LazyBackend builds the backend
+    once, the other threads that arrive meanwhile wait for it; after that
+    every attribute comes from the backend.
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import threading # Import threading so concurrent first requests build the backend once.
+
+
+class LazyBackend:
+
+    # factory builds the backend, name is for the error messages and stats.
+    def __init__(self, name: str, factory):
+        self._name = name
+        self._factory = factory
+        self._backend = None
+        self._lock = threading.Lock()
+
+    # The backend, built on the first call.
+    def get(self):
+
+        backend = self._backend
+        if backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self._factory()
+                backend = self._backend
+
+        return backend
+
+    # Whether the backend has been built yet.
+    @property
+    def built(self):
+        return self._backend is not None
+
+    # Only called for what LazyBackend itself does not have, that is
+    # everything of the backend.
+    def __getattr__(self, attribute: str):
+        return getattr(self.get(), attribute)
+
+    def __repr__(self):
+        return "<LazyBackend {} ({})>".format(self._name, "built" if self.built else "not built")
@@ -60,26 +60,186 @@ from datetime import date  # Needed for DOB handling
 from pydantic import BaseModel  # Model validation
 from fastapi import HTTPException  # Error handling
 from fastapi import FastAPI  # Web framework
+from fastapi import Query  # Query parameter validation
+from fastapi import Request  # Raw request body for the bulk upload
+from fastapi.responses import JSONResponse  # 404 body for RecordNotFound
+import json  # NDJSON lines of the bulk upload
+from contextlib import asynccontextmanager  # Close the backends at shutdown
 from typing import List  # List typing 
 
 # Using individual files for each repository type.
-# Import the InMemoryPersistence class from the in_memory_persistence.py (Applicant)
-from in_memory_persistence import InMemoryPersistence 
+# The persistence classes (Applicant, Address, Contact) are imported when
+# their backend is built, see the build_ functions below. Some of them bring
+# in NumPy and pandas, all of them only matter once a route uses them.
 
-# Import the CSVPersistence class from csv_persistence.py (Address)
-from csv_persistence import CSVPersistence
+# Import the Repository interface, the CRUD routes go through it so each
+# entity can be stored in any backend.
+from repository import RecordNotFound, open_repository
 
- # Import the SQLitePersistence class from mysql_persistence.py (Contact) 
- # Using SQLite due to course examples. 
-from db_persistence import SQLitePersistence
+# Import the CachedRepository class, the read-through cache that can sit in
+# front of any repository.
+from cached_repository import CACHE_TTL, CachedRepository
 
+# Import the LazyBackend class, the backends are built on first use.
+from lazy_backend import LazyBackend
 
-app = FastAPI()
+
+# Close the backends that were built when the server shuts down: the
+# connections and writer threads of the contact store, the applicant
+# journal, and the temporary cold file of the tiered applicant store.
+# Repositories on their own storage are closed too; a native one wraps
+# one of the stores, which are closed once, here.
+@asynccontextmanager
+async def lifespan(app):
+    yield
+
+    for entity, repository in REPOSITORIES.items():
+        if STORAGE[entity] != "native" and repository.built:
+            repository.close()
+    for backend in [async_sqlite_db, sqlite_db, in_memory_db, address_db]:
+        if backend.built and hasattr(backend, "close"):
+            backend.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Initialize the persistence layers.
-in_memory_db = InMemoryPersistence()
-csv_db = CSVPersistence("address.csv")
-sqlite_db = SQLitePersistence()
+# Every backend is a LazyBackend, built by the first request that uses it,
+# so a new worker starts without waiting for pandas, NumPy, address.csv and
+# the contacts database. BACKENDS_EAGER=1 builds them all at import, for
+# a worker that would rather pay up front than on its first requests.
+#
+# Choose the applicant backend by configuration:
+#   APPLICANT_BACKEND=memory    one record per applicant (default)
+#   APPLICANT_BACKEND=columnar  NumPy columns, for the age and demographic stats
+#   APPLICANT_BACKEND=tiered    the recently used applicants in memory, up to
+#                               APPLICANT_MEMORY_MB (default 64), the rest in SQLite
+# APPLICANT_DATA=<folder> keeps the applicants of the default backend across
+# restarts: a snapshot plus a journal of the writes since, see
+# in_memory_persistence.py. Without it they live in memory only.
+APPLICANT_BACKEND = os.environ.get("APPLICANT_BACKEND", "memory")
+
+
+
+def build_applicant_db():
+
+    if APPLICANT_BACKEND == "columnar":
+        # Import the ColumnarInMemoryPersistence class, the NumPy sibling of InMemoryPersistence (Applicant)
+        from in_memory_columnar_persistence import ColumnarInMemoryPersistence
+        return ColumnarInMemoryPersistence()
+
+    if APPLICANT_BACKEND == "tiered":
+        # Import the TieredApplicantPersistence class, hot applicants in memory and
+        # cold ones in SQLite (Applicant)
+        from tiered_persistence import TieredApplicantPersistence
+        return TieredApplicantPersistence(int(float(os.environ.get("APPLICANT_MEMORY_MB", "64")) * 1024 * 1024))
+
+    # Import the InMemoryPersistence class from the in_memory_persistence.py (Applicant)
+    from in_memory_persistence import InMemoryPersistence
+    return InMemoryPersistence(os.environ.get("APPLICANT_DATA"))
+
+
+# Choose the address backend by configuration:
+#   ADDRESS_BACKEND=csv       address.csv (default)
+#   ADDRESS_BACKEND=columnar  address_columns, see convert_address_csv.py
+# Both lock their files, so uvicorn --workers N can share them.
+ADDRESS_BACKEND = os.environ.get("ADDRESS_BACKEND", "csv")
+
+
+
+def build_address_db():
+
+    if ADDRESS_BACKEND == "columnar":
+        # Import the ColumnarPersistence class from columnar_persistence.py (Address),
+        # the memory-mapped alternative to the csv file.
+        from columnar_persistence import ColumnarPersistence
+        return ColumnarPersistence("address_columns")
+
+    # Import the CSVPersistence class from csv_persistence.py (Address)
+    from csv_persistence import CSVPersistence
+    return CSVPersistence("address.csv")
+
+
+# CONTACT_GROUP_COMMIT=1 commits the contact writes of concurrent requests
+# together, for burst loads such as intake-day imports.
+def build_contact_db():
+
+    # Import the SQLitePersistence class from mysql_persistence.py (Contact)
+    # Using SQLite due to course examples.
+    from db_persistence import SQLitePersistence
+    return SQLitePersistence(group_commit=os.environ.get("CONTACT_GROUP_COMMIT") == "1")
+
+
+def build_async_contact_db():
+
+    # Import the AsyncSQLitePersistence class from async_db_persistence.py (Contact),
+    # used by the async def routes under /async.
+    from async_db_persistence import AsyncSQLitePersistence
+    return AsyncSQLitePersistence(sqlite_db.get())
+
+
+in_memory_db = LazyBackend("applicant", build_applicant_db)
+address_db = LazyBackend("address", build_address_db)
+sqlite_db = LazyBackend("contact", build_contact_db)
+async_sqlite_db = LazyBackend("async contact", build_async_contact_db)
+
+# Choose where each entity is stored by configuration, see repository.py:
+#   APPLICANT_STORAGE, ADDRESS_STORAGE, CONTACT_STORAGE =
+#       native  the store above (default)
+#       memory  a dictionary, gone on restart
+#       csv     <entity>s.csv in REPOSITORY_FOLDER
+#       sqlite  a table in REPOSITORY_FOLDER/repository.db
+# The search, stats and bulk routes use what only the native stores have
+# and answer 501 on any other storage.
+REPOSITORY_FOLDER = os.environ.get("REPOSITORY_FOLDER", ".")
+STORAGE = {entity: os.environ.get(entity.upper() + "_STORAGE", "native") for entity in ("applicant", "address", "contact")}
+
+# REPOSITORY_CACHE=<records> puts a read-through cache of that many records
+# per entity in front of the repositories, see cached_repository.py. A
+# write made by another process is seen after REPOSITORY_CACHE_TTL seconds
+# at the latest. Unset or 0, there is no cache.
+REPOSITORY_CACHE = int(os.environ.get("REPOSITORY_CACHE", "0"))
+REPOSITORY_CACHE_TTL = float(os.environ.get("REPOSITORY_CACHE_TTL", CACHE_TTL))
+
+
+def open_entity_repository(entity: str, native):
+    repository = open_repository(entity, STORAGE[entity], native, REPOSITORY_FOLDER)
+    if REPOSITORY_CACHE:
+        repository = CachedRepository(repository, REPOSITORY_CACHE, REPOSITORY_CACHE_TTL)
+
+    return repository
+
+
+# With native storage the repository wraps the LazyBackend, the store is
+# built on the first call that reaches it.
+applicant_repository = LazyBackend("applicant repository", lambda: open_entity_repository("applicant", in_memory_db))
+address_repository = LazyBackend("address repository", lambda: open_entity_repository("address", address_db))
+contact_repository = LazyBackend("contact repository", lambda: open_entity_repository("contact", sqlite_db))
+REPOSITORIES = {"applicant": applicant_repository, "address": address_repository, "contact": contact_repository}
+
+if os.environ.get("BACKENDS_EAGER") == "1":
+    for backend in [in_memory_db, address_db, sqlite_db, async_sqlite_db] + list(REPOSITORIES.values()):
+        backend.get()
+
+
+# Tell the cache of a repository about a write that went around it, one
+# record or, without an ID, all of them. A repository not built yet has
+# nothing cached.
+def invalidate_cache(repository, record_id: int = None):
+    if REPOSITORY_CACHE and repository.built:
+        repository.invalidate(record_id)
+
+
+# A record that is not in the repository.
+@app.exception_handler(RecordNotFound)
+def record_not_found(request: Request, e: RecordNotFound):
+    return JSONResponse(status_code = 404, content = {"detail": str(e)})
+
+
+# Stop a route that needs the native store of an entity.
+def require_native(entity: str):
+    if STORAGE[entity] != "native":
+        raise HTTPException(status_code = 501, detail = "Not available with {}_STORAGE={}.".format(entity.upper(), STORAGE[entity]))
 
 
 # =============================================
@@ -94,6 +254,19 @@ def project_intro():
     return {"CIDM 6330 - Assignment 03": "Extend Your API with a Repository"} # The project title
 
 
+# Hit, miss, eviction and expiry counts of the repository caches.
+@app.get("/cache/stats",
+         summary="Counters of the repository caches.",
+         description="Empty unless REPOSITORY_CACHE is set, an entity shows once its repository is first used. "
+                     "hit_rate is hits / (hits + misses) of the reads by ID; "
+                     "evictions are records dropped to stay within the size, expirations records past the ttl.")
+def cache_stats():
+    if not REPOSITORY_CACHE:
+        return {"cache_stats": {}}
+
+    return {"cache_stats": {entity: repository.stats() for entity, repository in REPOSITORIES.items() if repository.built}}
+
+
 # =============================================
 # Create, Read, Update, Delete (CRUD) methods as:
 # list (all), create, read, update, delete, for consistency.
@@ -106,20 +279,65 @@ def project_intro():
 # https://swagger.io/specification/?sbsearch=route%20summary, used here after.
 @app.get("/applicants", 
          summary="List all applicants stored in-memory.", 
-         description="Retrieves a list of applicants. Data resets when the server restarts!")
-def list_applicants():
-    applicants = in_memory_db.list_applicants()
+         description="Retrieves a list of applicants. Data resets when the server restarts, unless APPLICANT_DATA is set! "
+                     "With limit, returns one page; pass the last Applicant_ID of a page as after to get the next one.")
+def list_applicants(limit: int = Query(None, ge=1), after: int = None):
+    applicants = applicant_repository.list(limit, after)
 
-    if not applicants:
+    # An empty page means the last page was already returned.
+    if not applicants and limit is None and after is None:
         return {"get_all_applicants error:": "No applicants found."}
 
     return {"applicants": applicants}
 
 
+# Search the applicants by LastName, ResidencyState and a DoB range, served
+# from the secondary indexes of the store. All given parameters must match.
+@app.get("/applicants/search",
+         summary="Search applicants by last name, state of residency or date of birth range.",
+         description="LastName and ResidencyState must match exactly. DoB_from and DoB_to (YYYY-MM-DD) "
+                     "bound the date of birth, both included; for everyone who turns 18 this quarter, "
+                     "use the quarter's first and last day minus 18 years.")
+def search_applicants(LastName: str = None, ResidencyState: str = None, DoB_from: str = None, DoB_to: str = None):
+    require_native("applicant")
+    filters = {"LastName": LastName, "ResidencyState": ResidencyState, "DoB_from": DoB_from, "DoB_to": DoB_to}
+    applicants = in_memory_db.search_applicants(filters)
+
+    return {"applicants": applicants}
+
+
+# Count the applicants by state, gender and age band, optionally narrowed
+# to one state or gender and an age range.
+@app.get("/applicants/stats",
+         summary="Count applicants by state of residency, gender and age band.",
+         description="ResidencyState and Gender must match exactly. age_min and age_max (whole years as of today, "
+                     "both included) leave out applicants without a known date of birth.")
+def applicant_stats(ResidencyState: str = None, Gender: str = None,
+                    age_min: int = Query(None, ge=0), age_max: int = Query(None, ge=0)):
+    require_native("applicant")
+    filters = {"ResidencyState": ResidencyState, "Gender": Gender, "age_min": age_min, "age_max": age_max}
+
+    return {"applicant_stats": in_memory_db.applicant_stats(filters)}
+
+
+# Hit rates of the hot (memory) and cold (SQLite) tiers of the tiered
+# applicant backend.
+@app.get("/applicants/tiers",
+         summary="Hit rates of the applicant memory and SQLite tiers.",
+         description="Only with APPLICANT_BACKEND=tiered. hot_hit_rate is the share of reads by ID served from memory, "
+                     "cold_hit_rate the share faulted back in from SQLite.")
+def applicant_tiers():
+    require_native("applicant")
+    if APPLICANT_BACKEND != "tiered":
+        raise HTTPException(status_code = 501, detail = "Not available with APPLICANT_BACKEND={}.".format(APPLICANT_BACKEND))
+
+    return {"applicant_tiers": in_memory_db.tier_stats()}
+
+
 # Create a new applicant.
 @app.post("/applicant/")
 def create_applicant(applicant: dict):
-    result = in_memory_db.create_applicant(applicant) 
+    result = applicant_repository.create(applicant)
 
     return {"create_applicant": "New applicant added.", "data": result}
 
@@ -127,7 +345,7 @@ def create_applicant(applicant: dict):
 # Retrieve an applicant's details.
 @app.get("/applicant/{applicant_id}")
 def read_applicant(applicant_id: int):
-    applicant = in_memory_db.read_applicant(applicant_id)
+    applicant = applicant_repository.read(applicant_id)
 
     if not applicant:
         # https://docs.python.org/3/library/string.html#custom-string-formatting, used here after.
@@ -139,7 +357,7 @@ def read_applicant(applicant_id: int):
 # Update an existing applicant's data
 @app.put("/applicant/{applicant_id}")
 def update_applicant(applicant_id: int, applicant: dict):
-    updated_applicant = in_memory_db.update_applicant(applicant_id, applicant)
+    updated_applicant = applicant_repository.update(applicant_id, applicant)
 
     # If applicant ID does not exist
     if not updated_applicant:
@@ -150,11 +368,7 @@ def update_applicant(applicant_id: int, applicant: dict):
 # Delete an applicant.
 @app.delete("/applicant/{applicant_id}")
 def delete_applicant(applicant_id: int):
-    deleted = in_memory_db.delete_applicant(applicant_id)
-
-    # If applicant ID does not exist
-    if not deleted:
-        return {"delete_applicant error:": "Could not find the applicant with ID {}.".format(applicant_id)}
+    applicant_repository.delete(applicant_id)  # An unknown ID raises RecordNotFound, a 404.
 
     return {"deleted_applicant": "Applicant {} deleted successfully.".format(applicant_id)}
 
@@ -167,28 +381,44 @@ def delete_applicant(applicant_id: int):
 # https://swagger.io/specification/?sbsearch=route%20summary, used here after.
 @app.get("/addresses", 
          summary="Retrieve all addresses.", 
-         description="Returns a full list of stored addresses from the CSV file.")
-def list_addresses():
-    addresses = csv_db.list_addresses()
+         description="Returns a full list of stored addresses from the CSV file. "
+                     "With limit, returns one page; pass the last Address_ID of a page as after to get the next one.")
+def list_addresses(limit: int = Query(None, ge=1), after: int = None):
+    addresses = address_repository.list(limit, after)
 
     # If no addresses exist.
-    if not addresses:
+    if not addresses and limit is None and after is None:
         return {"get_all_addresses error:": "No addresses found. Check the csv file."}
 
     return {"addresses": addresses}
 
 
+# Search the addresses by City, State, Type, Zip prefix, OwnerID or OwnerType.
+# Served from the secondary indexes of the address backend, all given
+# parameters must match.
+@app.get("/addresses/search",
+         summary="Search addresses by city, state, type, zip prefix or owner.",
+         description="Zip matches as a prefix (837 finds 83702), the other fields must match exactly.")
+def search_addresses(City: str = None, State: str = None, Type: str = None, Zip: str = None,
+                     OwnerID: int = None, OwnerType: str = None):
+    require_native("address")
+    filters = {"City": City, "State": State, "Type": Type, "Zip": Zip, "OwnerID": OwnerID, "OwnerType": OwnerType}
+    addresses = address_db.search_addresses({field: value for field, value in filters.items() if value is not None})
+
+    return {"addresses": addresses}
+
+
 # Add a new address to the csv file.
 @app.post("/address/")
 def create_address(address: dict):
-    result = csv_db.create_address(address)
+    result = address_repository.create(address)
     return {"create_address error:": "Address successfully added to csv file.", "data": result}
 
 
 # Get a specific address by its ID from the csv file.
 @app.get("/address/{address_id}")
 def read_address(address_id: int):
-    address = csv_db.read_address(address_id)
+    address = address_repository.read(address_id)
     if not address:
         return {"get_address error:": "Couldn not find the address with ID {}.".format(address_id)}
 
@@ -198,7 +428,7 @@ def read_address(address_id: int):
 # Update an existing address in the csv file.
 @app.put("/address/{address_id}")
 def update_address(address_id: int, address: dict):
-    updated_address = csv_db.update_address(address_id, address)
+    updated_address = address_repository.update(address_id, address)
     if not updated_address:
         return {"update_address error:": "No address found with ID {}. Update failed.".format(address_id)}
 
@@ -208,9 +438,7 @@ def update_address(address_id: int, address: dict):
 # Delete an address from the CSV database
 @app.delete("/address/{address_id}")
 def delete_address(address_id: int):
-    deleted = csv_db.delete_address(address_id)
-    if not deleted:
-        return {"delete_address error:": "Address ID {} was not found. Check the ID.".format(address_id)}
+    address_repository.delete(address_id)  # An unknown ID raises RecordNotFound, a 404.
 
     return {"delete_address": "Address with ID {} deleted.".format(address_id)}
 
@@ -223,19 +451,102 @@ def delete_address(address_id: int):
 # https://swagger.io/specification/?sbsearch=route%20summary, used here after.
 @app.get("/contacts", response_model=list, 
          summary="Get a list of all contacts currently in the database.", 
-         description="Retrieve all contact records from the database.")
-def list_contacts():
-    contact = sqlite_db.list_contacts()
-    if not contact:
+         description="Retrieve all contact records from the database. "
+                     "With limit, returns one page; pass the last Contact_ID of a page as after to get the next one.")
+def list_contacts(limit: int = Query(None, ge=1), after: int = None):
+    contact = contact_repository.list(limit, after)
+    if not contact and limit is None and after is None:
         return {"list_contacts error:": "Contacts not found!"}
     
     return contact
 
 
+# Search the contacts by words in any field, Last_Name prefix or Phone prefix.
+# Served from the FTS5 table and the B-tree indexes of the database, all
+# given parameters must match.
+@app.get("/contacts/search",
+         summary="Search contacts by text, last name prefix or phone prefix.",
+         description="q matches words in any field, each word also as a prefix (ali joh finds Alice Johnson), "
+                     "best match first. Last_Name and Phone match as prefixes.")
+def search_contacts(q: str = None, Last_Name: str = None, Phone: str = None, limit: int = Query(50, ge=1, le=1000)):
+    require_native("contact")
+    contacts = sqlite_db.search_contacts(q, Last_Name, Phone, limit)
+
+    return {"contacts": contacts}
+
+
+# Read the contacts of a bulk upload a chunk at a time. NDJSON (one contact
+# per line) is read from the stream as it arrives, so a large upload never
+# sits in memory whole; anything else must be a JSON array. A line that is
+# not valid JSON is passed on as None and reported as an error for its row.
+async def bulk_contact_chunks(request: Request, size: int):
+
+    if "ndjson" not in request.headers.get("content-type", ""):
+        try:
+            contacts = await request.json()
+        except ValueError:
+            raise HTTPException(status_code = 400, detail = "The body is not valid JSON.")
+        if not isinstance(contacts, list):
+            raise HTTPException(status_code = 422, detail = "Send a JSON array of contacts, or NDJSON.")
+
+        for start in range(0, len(contacts), size):
+            yield contacts[start:start + size]
+        return
+
+    chunk = []
+    rest = b""
+    async for data in request.stream():
+        lines = (rest + data).split(b"\n")
+        rest = lines.pop()
+        for line in lines:
+            if line.strip():
+                try:
+                    chunk.append(json.loads(line))
+                except ValueError:
+                    chunk.append(None)
+                if len(chunk) >= size:  # One network read may hold many chunks.
+                    yield chunk
+                    chunk = []
+
+    if rest.strip():
+        try:
+            chunk.append(json.loads(rest))
+        except ValueError:
+            chunk.append(None)
+    if chunk:
+        yield chunk
+
+
+# Create or update many contacts at once, as a JSON array or NDJSON
+# (Content-Type: application/x-ndjson). A contact with a Contact_ID updates
+# that contact, one without is created. Returns the Contact_ID of every row
+# in order (null for a row in error) and the errors by row number.
+@app.post("/contacts/bulk",
+          summary="Create or update many contacts at once.",
+          description="Send a JSON array, or NDJSON with Content-Type application/x-ndjson. "
+                      "Rows with a Contact_ID update that contact, rows without one are created.")
+async def bulk_upsert_contacts(request: Request):
+    require_native("contact")
+    from db_persistence import BULK_CHUNK_SIZE  # Rows per transaction, loaded with the contact store.
+    result = {"ids": [], "errors": [], "created": 0, "updated": 0}
+
+    async for contacts in bulk_contact_chunks(request, BULK_CHUNK_SIZE):
+        chunk = await async_sqlite_db.bulk_upsert_contacts(contacts, len(result["ids"]))
+        result["ids"] += chunk["ids"]
+        result["errors"] += chunk["errors"]
+        result["created"] += chunk["created"]
+        result["updated"] += chunk["updated"]
+
+    invalidate_cache(contact_repository)
+
+    return {"bulk_upsert_contacts": "{} contacts created, {} updated, {} errors.".format(
+        result["created"], result["updated"], len(result["errors"])), **result}
+
+
 # Create a new contact in the database.
 @app.post("/contact/")
 def create_contact(contact: dict):
-    new_contact = sqlite_db.create_contact(contact)
+    new_contact = contact_repository.create(contact)
 
     return {"create_contact": "New contact added.", "data": new_contact}
 
@@ -243,7 +554,7 @@ def create_contact(contact: dict):
 # Retrieve a contact by ID from the database.
 @app.get("/contact/{contact_id}")
 def read_contact(contact_id: int):
-    contact = sqlite_db.read_contact(contact_id)
+    contact = contact_repository.read(contact_id)
 
     if not contact:
         return {"get_contact error:": "Contact not found with ID {}. Check the database.".format(contact_id)}
@@ -254,7 +565,7 @@ def read_contact(contact_id: int):
 # Update an existing contact in the database.
 @app.put("/contact/{contact_id}")
 def update_contact(contact_id: int, contact: dict):
-    updated_contact = sqlite_db.update_contact(contact_id, contact)
+    updated_contact = contact_repository.update(contact_id, contact)
 
     # If contact doesn't exist in the database.
     if not updated_contact:
@@ -266,7 +577,74 @@ def update_contact(contact_id: int, contact: dict):
 # Delete a contact from the database.
 @app.delete("/contact/{contact_id}")
 def delete_contact(contact_id: int):
-    deleted = sqlite_db.delete_contact(contact_id)
+    contact_repository.delete(contact_id)  # An unknown ID raises RecordNotFound, a 404.
+
+    return {"delete_contact": "Contact with ID {} deleted.".format(contact_id)}
+
+
+
+# Async SQLite Persistence (Contact).
+# =============================================
+# The same contact routes as async def handlers under /async. They await the
+# repository instead of taking a threadpool thread for the whole request,
+# see bench_contact_routes.py for the comparison. Native contact store only.
+
+# Get a list of all contacts currently in the database.
+@app.get("/async/contacts", response_model=list, 
+         summary="Get a list of all contacts currently in the database (async).", 
+         description="Retrieve all contact records from the database. "
+                     "With limit, returns one page; pass the last Contact_ID of a page as after to get the next one.")
+async def async_list_contacts(limit: int = Query(None, ge=1), after: int = None):
+    require_native("contact")
+    contact = await async_sqlite_db.list_contacts(limit, after)
+    if not contact and limit is None and after is None:
+        return {"list_contacts error:": "Contacts not found!"}
+    
+    return contact
+
+
+# Create a new contact in the database.
+@app.post("/async/contact/")
+async def async_create_contact(contact: dict):
+    require_native("contact")
+    new_contact = await async_sqlite_db.create_contact(contact)
+    invalidate_cache(contact_repository, new_contact["Contact_ID"])
+
+    return {"create_contact": "New contact added.", "data": new_contact}
+
+
+# Retrieve a contact by ID from the database.
+@app.get("/async/contact/{contact_id}")
+async def async_read_contact(contact_id: int):
+    require_native("contact")
+    contact = await async_sqlite_db.read_contact(contact_id)
+
+    if not contact:
+        return {"get_contact error:": "Contact not found with ID {}. Check the database.".format(contact_id)}
+
+    return {"contact": contact}
+
+
+# Update an existing contact in the database.
+@app.put("/async/contact/{contact_id}")
+async def async_update_contact(contact_id: int, contact: dict):
+    require_native("contact")
+    updated_contact = await async_sqlite_db.update_contact(contact_id, contact)
+    invalidate_cache(contact_repository, contact_id)
+
+    # If contact doesn't exist in the database.
+    if not updated_contact:
+        return {"update_contact error:": "No contact found with ID {}. No update.".format(contact_id)}
+
+    return {"update_contact": "Contact updated successfully.", "data": updated_contact}
+
+
+# Delete a contact from the database.
+@app.delete("/async/contact/{contact_id}")
+async def async_delete_contact(contact_id: int):
+    require_native("contact")
+    deleted = await async_sqlite_db.delete_contact(contact_id)
+    invalidate_cache(contact_repository, contact_id)
 
     if not deleted:
         return {"delete_contact error:": "Contact with ID {} not found.".format(contact_id)}
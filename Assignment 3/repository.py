@@ -0,0 +1,457 @@
+"""
+Script Name: [repository.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	The repository.py module gives the storage backends one interface, the
+    Repository protocol, so every entity (applicant, address, contact) can
+    be stored in any of them, chosen per entity by configuration in main.py:
+
+        native   the store written for the entity (InMemoryPersistence,
+                 CSVPersistence, SQLitePersistence, ...) through
+                 PersistenceRepository
+        memory   MemoryRepository, a dictionary
+        csv      CSVRepository, a dictionary backed by an append-only csv file
+        sqlite   SQLiteRepository, a table in a SQLite database
+
+    Every Repository behaves the same way: list returns [] when there is
+    nothing, read, update and delete raise RecordNotFound for an ID that is
+    not there, and update replaces the record with the one it is given,
+    like PUT: a field left out is cleared, not kept. The generic
+    backends keep the fields of the Entity and drop any others; every record
+    they return has all of them, None where no value was given.
+
+References:
+    https://typing.readthedocs.io/en/latest/spec/protocol.html
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+from fastapi import HTTPException # Import HTTPException to translate the errors of the native stores.
+from typing import List, Protocol, runtime_checkable # Import Protocol for the Repository interface.
+import bisect # Import bisect to find the start of a page in the sorted IDs.
+import csv # Import csv for the csv repository.
+import json # Import json to keep the value types in the csv cells.
+import threading # Import threading to serialize the writes.
+
+STORAGES = ["native", "memory", "csv", "sqlite"]
+OP_COLUMN = "Op"  # Extra csv column holding the record operation.
+UPSERT = "U"  # Create or replacement record.
+TOMBSTONE = "D"  # Delete record.
+
+
+# An entity the API stores: its name, the plural used by the native store
+# methods (list_addresses), the ID field and the other fields.
+class Entity:
+
+    def __init__(self, name: str, plural: str, id_field: str, fields: list):
+        self.name = name
+        self.plural = plural
+        self.id_field = id_field
+        self.fields = fields
+
+    # A record with the ID and every field of the entity, in that order.
+    def record(self, record_id: int, values: dict):
+        record = {self.id_field: record_id}
+        for field in self.fields:
+            record[field] = values.get(field)
+        return record
+
+
+ENTITIES = {
+    "applicant": Entity("applicant", "applicants", "Applicant_ID", ["FirstName", "LastName", "DoB", "Gender", "ResidencyState"]),
+    "address": Entity("address", "addresses", "Address_ID", ["Street_No", "Street", "City", "State", "Zip", "Type", "OwnerID", "OwnerType"]),
+    "contact": Entity("contact", "contacts", "Contact_ID", ["First_Name", "Last_Name", "Phone", "Applicant_Relationship"]),
+}
+
+
+# The one error of the repositories: no record with that ID. main.py turns
+# it into a 404.
+class RecordNotFound(LookupError):
+
+    def __init__(self, entity: Entity, record_id: int):
+        super().__init__("{} ID {} was not found.".format(entity.name.capitalize(), record_id))
+        self.entity = entity
+        self.record_id = record_id
+
+
+# The methods every storage backend has.
+@runtime_checkable
+class Repository(Protocol):
+
+    entity: Entity
+
+    # All records in ID order, or up to limit records with an ID above after.
+    def list(self, limit: int = None, after: int = None) -> List[dict]: ...
+
+    # Store a new record under the next ID, return it with the ID.
+    def create(self, record: dict) -> dict: ...
+
+    # create for many records at once, as cheaply as the backend allows.
+    def create_many(self, records: List[dict]) -> List[dict]: ...
+
+    def read(self, record_id: int) -> dict: ...
+
+    # Replace the record with the given one in a single write, return it
+    # with the ID.
+    def update(self, record_id: int, record: dict) -> dict: ...
+
+    def delete(self, record_id: int) -> None: ...
+
+    def close(self) -> None: ...
+
+
+# =============================================
+# Memory and csv repositories.
+# =============================================
+
+# The records in a dictionary. IDs are handed out in ascending order and
+# never reused, so the dictionary is in ID order and the sorted ID list for
+# the pages only ever grows at the end.
+class MemoryRepository:
+
+    def __init__(self, entity: Entity):
+        self.entity = entity
+        self.records = {}  # ID -> record
+        self.ids = []  # IDs in ascending order, for the pages.
+        self.next_id = 1
+        self._lock = threading.Lock()
+
+    # Called under the lock after every change, the csv repository writes
+    # the change to its file here.
+    def _changed(self, op: str, record: dict):
+        pass
+
+    def _store(self, record: dict):
+        record_id = self.next_id
+        self.next_id += 1
+        record = self.entity.record(record_id, record)
+        self.records[record_id] = record
+        self.ids.append(record_id)
+        self._changed(UPSERT, record)
+        return dict(record)
+
+    def list(self, limit: int = None, after: int = None):
+
+        with self._lock:
+            if limit is None and after is None:
+                return [dict(record) for record in self.records.values()]
+
+            start = bisect.bisect_right(self.ids, after) if after is not None else 0
+            stop = start + limit if limit is not None else len(self.ids)
+            return [dict(self.records[record_id]) for record_id in self.ids[start:stop]]
+
+    def create(self, record: dict):
+        with self._lock:
+            return self._store(record)
+
+    def create_many(self, records: List[dict]):
+        with self._lock:
+            return [self._store(record) for record in records]
+
+    def read(self, record_id: int):
+
+        record = self.records.get(record_id)
+        if record is None:
+            raise RecordNotFound(self.entity, record_id)
+
+        return dict(record)
+
+    def update(self, record_id: int, record: dict):
+
+        with self._lock:
+            if record_id not in self.records:
+                raise RecordNotFound(self.entity, record_id)
+
+            record = self.entity.record(record_id, record)
+            self.records[record_id] = record
+            self._changed(UPSERT, record)
+
+        return dict(record)
+
+    def delete(self, record_id: int):
+
+        with self._lock:
+            record = self.records.pop(record_id, None)
+            if record is None:
+                raise RecordNotFound(self.entity, record_id)
+
+            del self.ids[bisect.bisect_left(self.ids, record_id)]
+            self._changed(TOMBSTONE, record)
+
+    def close(self):
+        pass
+
+
+# A MemoryRepository whose changes are appended to a csv file, one line per
+# create, update or delete, like the append-only mode of CSVPersistence.
+# Opening the file replays it. The cells hold the values as JSON, so a
+# number reads back as a number; an empty cell is a missing value. Made for
+# one worker process, CSVPersistence is the one that locks the file.
+class CSVRepository(MemoryRepository):
+
+    def __init__(self, entity: Entity, file_path: str):
+
+        super().__init__(entity)
+        self.file_path = file_path
+        self.columns = [entity.id_field] + entity.fields + [OP_COLUMN]
+
+        if not os.path.exists(file_path):
+            self._write_header(file_path)
+        self._replay()
+        self._file = open(file_path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+
+    def _write_header(self, path: str):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(self.columns)
+
+    # Fold the file into the records. A torn last line (a crash part way
+    # through an append) is cut off, it was never acknowledged.
+    def _replay(self):
+
+        with open(self.file_path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+
+        rows = csv.reader(data[:end].decode("utf-8").splitlines())
+        next(rows, None)  # The header.
+        for row in rows:
+            record_id = int(row[0])
+            self.next_id = max(self.next_id, record_id + 1)
+            if row[-1] == TOMBSTONE:
+                self.records.pop(record_id, None)
+            else:
+                self.records[record_id] = {column: json.loads(cell) if cell else None
+                                           for column, cell in zip(self.columns[:-1], row)}
+
+        # An update of an older record goes to the end of the dictionary, put them back in ID order.
+        self.records = dict(sorted(self.records.items()))
+        self.ids = list(self.records)
+
+    def _row(self, op: str, record: dict):
+        return [json.dumps(record[column]) if record.get(column) is not None else "" for column in self.columns[:-1]] + [op]
+
+    def _changed(self, op: str, record: dict):
+        self._writer.writerow(self._row(op, record))
+        self._file.flush()
+
+    # Rewrite the file with only the live records. The delete of the last
+    # ID is kept, or a reopen would hand that ID out again.
+    def compact(self):
+
+        with self._lock:
+            temp_path = self.file_path + ".tmp"
+            self._write_header(temp_path)
+            with open(temp_path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerows(self._row(UPSERT, record) for record in self.records.values())
+                if self.next_id - 1 not in self.records and self.next_id > 1:
+                    writer.writerow(self._row(TOMBSTONE, {self.entity.id_field: self.next_id - 1}))
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._file.close()
+            os.replace(temp_path, self.file_path)
+            self._file = open(self.file_path, "a", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+
+        return {"compact": "The {} file was compacted.".format(self.entity.name), "records": len(self.records)}
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+# =============================================
+# SQLite repository.
+# =============================================
+
+# The records in a table named after the entity (applicants, addresses,
+# contacts), through the same connection pool as SQLitePersistence. The
+# columns have no declared type, so every value keeps its own.
+class SQLiteRepository:
+
+    def __init__(self, entity: Entity, db_path: str):
+
+        # Import the ConnectionPool class here, the other storages do not need db_persistence.
+        from db_persistence import ConnectionPool
+
+        self.entity = entity
+        self.db_path = db_path
+        self.table = entity.plural
+        self.pool = ConnectionPool(db_path)
+
+        columns = ", ".join(entity.fields)
+        with self.pool.connection() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS {} ({} INTEGER PRIMARY KEY AUTOINCREMENT, {})".format(
+                self.table, entity.id_field, columns))
+            connection.commit()
+
+        self._insert_sql = "INSERT INTO {} ({}) VALUES ({})".format(self.table, columns, ", ".join("?" * len(entity.fields)))
+        self._update_sql = "UPDATE {} SET {} WHERE {} = ?".format(
+            self.table, ", ".join(field + " = ?" for field in entity.fields), entity.id_field)
+
+    def list(self, limit: int = None, after: int = None):
+
+        with self.pool.connection() as connection:
+            rows = connection.execute("SELECT * FROM {} WHERE {} > ? ORDER BY {} LIMIT ?".format(
+                self.table, self.entity.id_field, self.entity.id_field),
+                (after if after is not None else 0, limit if limit is not None else -1)).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def create(self, record: dict):
+        return self.create_many([record])[0]
+
+    # One transaction for all of them, one commit.
+    def create_many(self, records: List[dict]):
+
+        created = []
+        with self.pool.connection() as connection:
+            for record in records:
+                cursor = connection.execute(self._insert_sql, [record.get(field) for field in self.entity.fields])
+                created.append(self.entity.record(cursor.lastrowid, record))
+            connection.commit()
+
+        return created
+
+    def read(self, record_id: int):
+
+        with self.pool.connection() as connection:
+            row = connection.execute("SELECT * FROM {} WHERE {} = ?".format(self.table, self.entity.id_field),
+                                     (record_id,)).fetchone()
+
+        if row is None:
+            raise RecordNotFound(self.entity, record_id)
+
+        return dict(row)
+
+    # One UPDATE of every column.
+    def update(self, record_id: int, record: dict):
+
+        with self.pool.connection() as connection:
+            cursor = connection.execute(self._update_sql, [record.get(field) for field in self.entity.fields] + [record_id])
+            connection.commit()
+
+        if cursor.rowcount == 0:
+            raise RecordNotFound(self.entity, record_id)
+
+        return self.entity.record(record_id, record)
+
+    def delete(self, record_id: int):
+
+        with self.pool.connection() as connection:
+            cursor = connection.execute("DELETE FROM {} WHERE {} = ?".format(self.table, self.entity.id_field), (record_id,))
+            connection.commit()
+
+        if cursor.rowcount == 0:
+            raise RecordNotFound(self.entity, record_id)
+
+    def close(self):
+        self.pool.close()
+
+
+# =============================================
+# The native stores as repositories.
+# =============================================
+
+# Wraps one of the stores written for an entity (list_applicants,
+# create_address, read_contact, ...) in the Repository methods. Their 404s
+# become RecordNotFound, an empty list is []. An update is the store's own
+# update call, which replaces the record under the store's lock.
+class PersistenceRepository:
+
+    def __init__(self, store, entity: Entity):
+        self.store = store
+        self.entity = entity
+
+    def _method(self, operation: str):
+        return getattr(self.store, "{}_{}".format(operation, self.entity.plural if operation == "list" else self.entity.name))
+
+    def list(self, limit: int = None, after: int = None):
+        try:
+            return self._method("list")(limit, after)
+        except HTTPException as e:
+            if e.status_code == 404:
+                return []
+            raise
+
+    # The create methods return the record, or a message with the record
+    # under the entity name.
+    def create(self, record: dict):
+        result = self._method("create")(dict(record))
+        return result.get(self.entity.name, result)
+
+    def create_many(self, records: List[dict]):
+        return [self.create(record) for record in records]
+
+    def read(self, record_id: int):
+        try:
+            return self._method("read")(record_id)
+        except HTTPException as e:
+            if e.status_code == 404:
+                raise RecordNotFound(self.entity, record_id)
+            raise
+
+    # The update methods return the record, or a message with the record
+    # under the entity name (updated_address for the addresses), not all
+    # of them with the ID.
+    def update(self, record_id: int, record: dict):
+
+        record = dict(record)
+        record.pop(self.entity.id_field, None)
+        try:
+            result = self._method("update")(record_id, record)
+        except HTTPException as e:
+            if e.status_code == 404:
+                raise RecordNotFound(self.entity, record_id)
+            raise
+
+        for key in (self.entity.name, "updated_" + self.entity.name):
+            if key in result:
+                result = result[key]
+                break
+        return dict(result, **{self.entity.id_field: record_id})
+
+    def delete(self, record_id: int):
+        try:
+            self._method("delete")(record_id)
+        except HTTPException as e:
+            if e.status_code == 404:
+                raise RecordNotFound(self.entity, record_id)
+            raise
+
+    def close(self):
+        if hasattr(self.store, "close"):
+            self.store.close()
+
+
+# The repository of an entity on a storage. native is the entity's own store
+# for the native storage, the csv and sqlite files go to folder.
+def open_repository(entity_name: str, storage: str, native=None, folder: str = "."):
+
+    entity = ENTITIES[entity_name]
+
+    if storage == "native":
+        return PersistenceRepository(native, entity)
+    if storage == "memory":
+        return MemoryRepository(entity)
+    if storage == "csv":
+        return CSVRepository(entity, os.path.join(folder, "{}.csv".format(entity.plural)))
+    if storage == "sqlite":
+        return SQLiteRepository(entity, os.path.join(folder, "repository.db"))
+
+    raise ValueError("Unknown storage {} for the {}s, use one of: {}.".format(storage, entity_name, ", ".join(STORAGES)))
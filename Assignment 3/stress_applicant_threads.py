@@ -0,0 +1,134 @@
+"""
+Script Name: [stress_applicant_threads.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Multi-threaded stress test for InMemoryPersistence, the way the FastAPI
+    threadpool uses it. Writer threads create, update and delete applicants
+    while reader threads list, page, search and read them. At the end the
+    store is checked: no Applicant_ID handed out twice or lost, the count
+    adds up and every applicant holds what its writer last wrote. Every
+    full list a reader took must be in Applicant_ID order without repeats.
+
+    Run with:
+        python stress_applicant_threads.py
+        python stress_applicant_threads.py 8 4 5000
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import random # Import random to pick the applicants to read.
+import threading # Import threading for the writer and reader threads.
+import time # Import time for the throughput.
+
+from fastapi import HTTPException
+from in_memory_persistence import InMemoryPersistence
+
+WRITERS = 8
+READERS = 4
+OPERATIONS = 5000  # Creates per writer, a third are updated and a third deleted.
+SEEDED = 10  # Applicants InMemoryPersistence starts with.
+
+
+# One writer: returns Applicant_ID -> expected LastName, or None once deleted.
+def writer(db, writer_id, operations, expected):
+
+    for i in range(operations):
+        name = "W{}-{}".format(writer_id, i)
+        applicant = {"FirstName": "Stress", "LastName": name, "DoB": "2000-01-01", "Gender": "Female", "ResidencyState": "Idaho"}
+        applicant_id = db.create_applicant(applicant)["applicant"]["Applicant_ID"]
+        expected[applicant_id] = name
+
+        if i % 3 == 1:
+            db.update_applicant(applicant_id, dict(applicant, LastName=name + "-updated"))
+            expected[applicant_id] = name + "-updated"
+        elif i % 3 == 2:
+            db.delete_applicant(applicant_id)
+            expected[applicant_id] = None
+
+
+# One reader, until stop is set. Adds its calls and errors to result.
+def reader(db, stop, result):
+
+    rng = random.Random()
+    calls = 0
+    while not stop.is_set():
+        try:
+            applicants = db.list_applicants()
+            ids = [applicant["Applicant_ID"] for applicant in applicants]
+            if any(a >= b for a, b in zip(ids, ids[1:])):
+                result["errors"].append("A list was out of order or held an applicant twice.")
+
+            after = rng.choice(ids)
+            db.list_applicants(50, after)
+            db.search_applicants({"ResidencyState": "Idaho", "DoB_from": "1980-01-01", "DoB_to": "2000-12-31"})
+            calls += 3
+        except Exception as e:
+            result["errors"].append("{}: {}".format(type(e).__name__, e))
+
+        try:
+            db.read_applicant(after)
+        except HTTPException:
+            pass  # Deleted since the list, that is fine.
+        calls += 1
+
+    result["calls"] += calls
+
+
+def main(writers, readers, operations):
+
+    db = InMemoryPersistence()
+    expected = [{} for _ in range(writers)]
+    stop = threading.Event()
+    result = {"calls": 0, "errors": []}
+
+    reader_threads = [threading.Thread(target=reader, args=(db, stop, result)) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(db, n, operations, expected[n])) for n in range(writers)]
+
+    start = time.perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in reader_threads:
+        thread.join()
+
+    errors = result["errors"][:1]
+    claimed = {}
+    for results in expected:
+        for applicant_id, name in results.items():
+            if applicant_id in claimed:
+                errors.append("Applicant_ID {} was handed out twice.".format(applicant_id))
+            claimed[applicant_id] = name
+
+    live = {applicant_id: name for applicant_id, name in claimed.items() if name is not None}
+    found = {applicant["Applicant_ID"]: applicant["LastName"] for applicant in db.list_applicants()}
+    if len(found) != SEEDED + len(live):
+        errors.append("Expected {} applicants, found {}.".format(SEEDED + len(live), len(found)))
+    for applicant_id, name in claimed.items():
+        if found.get(applicant_id) != name:
+            errors.append("Applicant {} is {}, expected {}.".format(applicant_id, found.get(applicant_id), name))
+
+    writes = writers * operations * 5 // 3  # Creates plus the updates and deletes.
+    print("{} writers x {} creates, {} readers: {:.1f} s, {:,.0f} writes/s, {:,.0f} reads/s, {}".format(
+        writers, operations, readers, elapsed, writes / elapsed, result["calls"] / elapsed, "PASS" if not errors else "FAIL"))
+    for error in errors[:20]:
+        print("    " + error)
+
+    return not errors
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:]]
+    sys.exit(0 if main(*(arguments + [WRITERS, READERS, OPERATIONS][len(arguments):])) else 1)
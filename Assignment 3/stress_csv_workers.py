@@ -0,0 +1,147 @@
+"""
+Script Name: [stress_csv_workers.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	Stress test for several workers sharing one address file. N processes
+    run a mix of creates, reads, updates and deletes against the same csv
+    file through CSVPersistence, the way uvicorn --workers N would. At the
+    end the file is checked: no Address_ID handed out twice, the row count
+    adds up, and every address holds what its worker last wrote.
+
+    Runs in the default (rewrite) mode and in the append-only mode.
+
+    Run with:
+        python stress_csv_workers.py
+        python stress_csv_workers.py 8 200
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+import os
+import sys
+
+# Additional imports here
+import multiprocessing # Import multiprocessing to run the workers as processes.
+import shutil # Import shutil to copy the seed file.
+import tempfile # Import tempfile to keep the test files out of the project.
+import time # Import time for the throughput.
+
+from csv_persistence import CSVPersistence
+
+WORKERS = 8
+OPERATIONS = 100  # Creates per worker, a third are updated and a third deleted.
+SEED_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "address.csv")
+
+
+# One worker: create addresses, read them back, update or delete some.
+# Returns Address_ID -> expected (Street, City), or None once deleted.
+def run_worker(path, append_only, worker_id, operations):
+
+    db = CSVPersistence(path, append_only=append_only)
+    expected = {}
+
+    for i in range(operations):
+        street = "W{}-{}".format(worker_id, i)
+        address = {"Street_No": i, "Street": street, "City": "Boise", "State": "ID",
+                   "Zip": "83702", "Type": "Home", "OwnerID": worker_id, "OwnerType": "Self"}
+        address_id = db.create_address(address)["address"]["Address_ID"]
+        expected[address_id] = (street, "Boise")
+
+        if db.read_address(address_id)["Street"] != street:
+            raise AssertionError("Worker {} read back the wrong address {}.".format(worker_id, address_id))
+
+        if i % 3 == 1:
+            db.update_address(address_id, {"City": "Updated"})
+            expected[address_id] = (street, "Updated")
+        elif i % 3 == 2:
+            db.delete_address(address_id)
+            expected[address_id] = None
+
+    return expected
+
+
+# The pool runs this one. An HTTPException does not pickle and would hang the
+# pool, so any error comes back as a plain RuntimeError.
+def worker(*args):
+    try:
+        return run_worker(*args)
+    except Exception as e:
+        raise RuntimeError("{}: {}".format(type(e).__name__, e))
+
+
+# Check the final file against what the workers expect, return the errors.
+def check(path, append_only, seeded, results):
+
+    errors = []
+    expected = {}
+    for result in results:
+        for address_id, value in result.items():
+            # The rewrite mode hands out max + 1, so the ID of a deleted last
+            # address comes back. Only two live claims on one ID are a clash.
+            if address_id in expected and value is not None and expected[address_id] is not None:
+                errors.append("Address_ID {} was handed out twice.".format(address_id))
+            if value is not None or address_id not in expected:
+                expected[address_id] = value
+
+    addresses = CSVPersistence(path, append_only=append_only).list_addresses()
+    found = {address["Address_ID"]: address for address in addresses}
+
+    if len(found) != len(addresses):
+        errors.append("The file holds duplicate Address_IDs.")
+
+    live = sum(1 for value in expected.values() if value is not None)
+    if len(addresses) != seeded + live:
+        errors.append("Expected {} rows, found {}.".format(seeded + live, len(addresses)))
+
+    for address_id, value in expected.items():
+        address = found.get(address_id)
+        if value is None and address is not None:
+            errors.append("Deleted address {} is still there.".format(address_id))
+        elif value is not None and (address is None or (address["Street"], address["City"]) != value):
+            errors.append("Address {} is {}, expected {}.".format(address_id, address, value))
+
+    return errors
+
+
+def run(append_only, workers, operations):
+
+    mode = "append" if append_only else "rewrite"
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "address.csv")
+        shutil.copy(SEED_FILE, path)
+        seeded = len(CSVPersistence(path).list_addresses())
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.starmap(worker, [(path, append_only, worker_id, operations) for worker_id in range(workers)])
+        elapsed = time.perf_counter() - start
+
+        errors = check(path, append_only, seeded, results)
+
+        # The file must also hold up after the log is folded into it.
+        if append_only and not errors:
+            CSVPersistence(path, append_only=True).compact()
+            errors = check(path, append_only, seeded, results)
+
+    calls = workers * operations * 2 + workers * operations * 2 // 3  # Create and read, plus the updates and deletes.
+    print("{:<8} {} workers x {} creates: {:.1f} s, {:.0f} calls/s, {}".format(
+        mode, workers, operations, elapsed, calls / elapsed, "PASS" if not errors else "FAIL"))
+    for error in errors[:20]:
+        print("    " + error)
+
+    return not errors
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else WORKERS
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else OPERATIONS
+
+    passed = [run(append_only, workers, operations) for append_only in (False, True)]
+    sys.exit(0 if all(passed) else 1)
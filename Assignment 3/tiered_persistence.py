@@ -0,0 +1,433 @@
+"""
+Script Name: [tiered_persistence.py]
+Author: David H. Slack
+Copyright: @ 2025, David H. Slack
+Date Created: 2025.03.15
+Last Modified: 2025.03.15
+Version: 1.0.0.0000
+
+Description:
+	The tiered_persistence.py module keeps the applicants in two tiers, so
+    the population can grow past what fits in memory. It is a drop-in
+    sibling of InMemoryPersistence with the same list, create, read,
+    search, stats, update and delete methods (APPLICANT_BACKEND=tiered).
+
+        hot   the recently used applicants, ApplicantRecord objects in an
+              LRU, up to a memory budget in bytes
+        cold  everyone else, in a SQLite table
+
+    A write goes to the hot tier. When the hot tier is over its budget the
+    least recently used records are evicted in a batch, the changed ones
+    are written to the cold table in one transaction. Reading an applicant
+    that is only in the cold table faults it back into the hot tier. A
+    record in the hot tier is always the current one, the cold copy only
+    counts when there is no hot one.
+
+    Pages of list_applicants take the cold records they need without
+    faulting them in, so a scan does not push out the working set. The
+    searches and applicant_stats write the changed hot records to the
+    cold table first and run there, on its indexes.
+
+    The Applicant_IDs stay in memory (8 bytes each) outside the budget.
+    The cold table is a spill area, not a copy that survives a restart:
+    it starts empty, in a temporary file unless a path is given.
+
+    tier_stats() reports the hot and cold hit rates and the evictions.
+"""
+
+# =============================================
+# Import necessary modules
+# =============================================
+# Import the os and sys modules, even if they may not used they
+# are included as part of my normal python template.
+import os
+import sys
+
+# Additional imports here
+from fastapi import HTTPException # Import HTTPException to handle HTTP errors.
+from collections import OrderedDict # Import OrderedDict for the LRU order of the hot tier.
+from datetime import date # Import date for the search dates and the ages.
+import array # Import array to keep the IDs at 8 bytes each.
+import atexit # Import atexit to remove the temporary cold file when the process ends.
+import bisect # Import bisect to find the start of a page in the sorted IDs.
+import pickle # Import pickle to store the record tuples in the cold table.
+import sqlite3 # Import sqlite3 for the cold tier.
+import tempfile # Import tempfile for the default cold file.
+import threading # Import threading, every call changes the LRU order.
+
+from in_memory_persistence import AGE_BANDS, MEMBERS, ApplicantRecord, age_on, dob_ordinal, stats_result
+
+MEMORY_BUDGET = 64 * 1024 * 1024  # Bytes of hot records.
+EVICT_TO = 0.9  # An eviction brings the hot tier down to this fraction of the budget.
+ENTRY_OVERHEAD = 230  # Bytes per hot record next to the record itself (LRU entry, tuple, size), measured with tracemalloc.
+IN_CHUNK = 500  # IDs per SELECT ... IN (...).
+
+COLD_SCHEMA = """
+CREATE TABLE IF NOT EXISTS applicant_cold (
+    Applicant_ID INTEGER PRIMARY KEY,
+    LastName TEXT,
+    DoB INTEGER,
+    Gender TEXT,
+    ResidencyState TEXT,
+    Record BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS applicant_cold_last_name ON applicant_cold (LastName);
+CREATE INDEX IF NOT EXISTS applicant_cold_state ON applicant_cold (ResidencyState);
+CREATE INDEX IF NOT EXISTS applicant_cold_dob ON applicant_cold (DoB);
+"""
+
+
+# Bytes a hot record takes: the object, its own strings and extra fields.
+# Gender and ResidencyState are interned and shared, they are not counted.
+def record_size(record: ApplicantRecord):
+
+    size = ENTRY_OVERHEAD + sys.getsizeof(record)
+    for value in (record.FirstName, record.LastName, record.DoB):
+        if isinstance(value, (str, int)):
+            size += sys.getsizeof(value)
+    if record.extra:
+        size += sys.getsizeof(record.extra) + sum(sys.getsizeof(value) for value in record.extra.values())
+
+    return size
+
+
+# The column values of a record in the cold table, None where the record
+# has no value the searches can use.
+def cold_row(record: ApplicantRecord):
+    return (record.Applicant_ID,
+            record.LastName if isinstance(record.LastName, str) else None,
+            dob_ordinal(record),
+            record.Gender if isinstance(record.Gender, str) else None,
+            record.ResidencyState if isinstance(record.ResidencyState, str) else None,
+            pickle.dumps(record.to_tuple(), protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def from_cold(blob: bytes):
+    return ApplicantRecord.from_tuple(pickle.loads(blob))
+
+
+class TieredApplicantPersistence:
+
+    # Initializes the tiers and loads the same 10 members as
+    # InMemoryPersistence. cold_path is the SQLite file of the cold tier,
+    # by default a temporary file removed by close(), or at the exit of the
+    # process if nobody calls it (main.py does not).
+    def __init__(self, memory_budget: int = MEMORY_BUDGET, cold_path: str = None):
+
+        self.memory_budget = memory_budget
+        self.hot = OrderedDict()  # Applicant_ID -> (record, bytes), least recently used first.
+        self.hot_bytes = 0
+        self.dirty = set()  # Hot records the cold table does not have as they are.
+        self.ids = array.array("q")  # Every Applicant_ID in ascending order.
+        self.current_id = 1
+        self.lock = threading.Lock()
+
+        self.hot_hits = 0  # Reads served by the hot tier.
+        self.cold_hits = 0  # Reads faulted in from the cold tier.
+        self.evictions = 0
+        self.write_backs = 0  # Records written to the cold table.
+
+        self._temporary = cold_path is None
+        if cold_path is None:
+            handle, cold_path = tempfile.mkstemp(prefix="applicants_cold_", suffix=".db")
+            os.close(handle)
+            atexit.register(self.close)
+        self.cold_path = cold_path
+
+        # One connection, only ever used under the lock. The cold tier does
+        # not outlive the process, so it skips the fsyncs.
+        self.cold = sqlite3.connect(cold_path, check_same_thread=False)
+        self.cold.execute("PRAGMA journal_mode=WAL")
+        self.cold.execute("PRAGMA synchronous=OFF")
+        self.cold.executescript(COLD_SCHEMA)
+        self.cold.execute("DELETE FROM applicant_cold")
+        self.cold.commit()
+
+        for member in MEMBERS:
+            self._put(ApplicantRecord(self.current_id, member), dirty=True)
+            self.ids.append(self.current_id)
+            self.current_id += 1
+
+    def _exists(self, applicant_id: int):
+        position = bisect.bisect_left(self.ids, applicant_id)
+        return position < len(self.ids) and self.ids[position] == applicant_id
+
+
+# =============================================
+# The tiers. The caller holds the lock.
+# =============================================
+
+    # Put a record in the hot tier as the most recently used one.
+    def _put(self, record: ApplicantRecord, dirty: bool):
+
+        applicant_id = record.Applicant_ID
+        old = self.hot.pop(applicant_id, None)
+        if old is not None:
+            self.hot_bytes -= old[1]
+
+        size = record_size(record)
+        self.hot[applicant_id] = (record, size)
+        self.hot_bytes += size
+        if dirty:
+            self.dirty.add(applicant_id)
+
+        if self.hot_bytes > self.memory_budget:
+            self._evict()
+
+    # Evict the least recently used records down to EVICT_TO of the budget,
+    # the dirty ones go to the cold table in one transaction.
+    def _evict(self):
+
+        rows = []
+        target = self.memory_budget * EVICT_TO
+        while self.hot_bytes > target and self.hot:
+            applicant_id, (record, size) = self.hot.popitem(last=False)
+            self.hot_bytes -= size
+            self.evictions += 1
+            if applicant_id in self.dirty:
+                self.dirty.discard(applicant_id)
+                rows.append(cold_row(record))
+
+        self._write_back(rows)
+
+    def _write_back(self, rows: list):
+
+        if rows:
+            self.cold.executemany("INSERT OR REPLACE INTO applicant_cold VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.cold.commit()
+            self.write_backs += len(rows)
+
+    # Write every dirty hot record to the cold table, so a query there sees
+    # all the applicants as they are.
+    def _flush(self):
+        self._write_back([cold_row(self.hot[applicant_id][0]) for applicant_id in self.dirty])
+        self.dirty.clear()
+
+    # The record of an applicant, faulted in from the cold table when it is
+    # not hot. None if there is no such applicant.
+    def _get(self, applicant_id: int):
+
+        entry = self.hot.get(applicant_id)
+        if entry is not None:
+            self.hot.move_to_end(applicant_id)
+            self.hot_hits += 1
+            return entry[0]
+
+        if not self._exists(applicant_id):
+            return None
+
+        row = self.cold.execute("SELECT Record FROM applicant_cold WHERE Applicant_ID = ?", (applicant_id,)).fetchone()
+        record = from_cold(row[0])
+        self.cold_hits += 1
+        self._put(record, dirty=False)
+        return record
+
+    # The records of the IDs in order, without faulting the cold ones in.
+    def _peek_many(self, applicant_ids):
+
+        records = {}
+        missing = []
+        for applicant_id in applicant_ids:
+            entry = self.hot.get(applicant_id)
+            if entry is not None:
+                records[applicant_id] = entry[0]
+            else:
+                missing.append(applicant_id)
+
+        for start in range(0, len(missing), IN_CHUNK):
+            chunk = missing[start:start + IN_CHUNK]
+            sql = "SELECT Applicant_ID, Record FROM applicant_cold WHERE Applicant_ID IN ({})".format(", ".join("?" * len(chunk)))
+            for applicant_id, blob in self.cold.execute(sql, chunk):
+                records[applicant_id] = from_cold(blob)
+
+        return [records[applicant_id] for applicant_id in applicant_ids]
+
+
+# =============================================
+# Create, Read, Update, Delete (CRUD) methods as:
+# list (all), create, read, update, delete, for consistency.
+# =============================================
+
+    # Get a list of all the applicants, or one page of them: up to limit
+    # applicants with an Applicant_ID above after.
+    def list_applicants(self, limit: int = None, after: int = None):
+
+        with self.lock:
+            if limit is None and after is None:
+                # Once flushed, the cold table has every applicant as they are.
+                self._flush()
+                records = [from_cold(blob) for (blob,) in
+                           self.cold.execute("SELECT Record FROM applicant_cold ORDER BY Applicant_ID")]
+            else:
+                start = bisect.bisect_right(self.ids, after) if after is not None else 0
+                stop = start + limit if limit is not None else len(self.ids)
+                records = self._peek_many(self.ids[start:stop].tolist())
+
+        if not records and limit is None and after is None:
+            raise HTTPException(status_code = 404, detail = "No applicants found in memory!")
+
+        return [record.to_dict() for record in records]
+
+
+    # Create a new applicant.
+    def create_applicant(self, applicant: dict):
+
+        with self.lock:
+            applicant["Applicant_ID"] = self.current_id
+            self._put(ApplicantRecord(self.current_id, applicant), dirty=True)
+            self.ids.append(self.current_id)
+            self.current_id += 1
+
+        return {"create_applicant": "The applicant was created.", "applicant": applicant}
+
+
+    # Get an applicant by their ID.
+    def read_applicant(self, applicant_id: int):
+
+        with self.lock:
+            record = self._get(applicant_id)
+
+        if record is not None:
+            return record.to_dict()
+
+        raise HTTPException(status_code = 404, detail = "Applicant ID was not found.")
+
+
+    # Search the applicants, same filters and result as
+    # InMemoryPersistence.search_applicants, on the indexes of the cold table.
+    def search_applicants(self, filters: dict):
+
+        where = []
+        params = []
+        for field in ("LastName", "ResidencyState"):
+            if filters.get(field) is not None:
+                where.append("{} = ?".format(field))
+                params.append(filters[field])
+        for field, operator in (("DoB_from", ">="), ("DoB_to", "<=")):
+            if filters.get(field) is not None:
+                where.append("DoB {} ?".format(operator))
+                params.append(self._search_date(filters[field]))
+
+        sql = "SELECT Record FROM applicant_cold{} ORDER BY Applicant_ID".format(" WHERE " + " AND ".join(where) if where else "")
+        with self.lock:
+            self._flush()
+            records = [from_cold(blob) for (blob,) in self.cold.execute(sql, params)]
+
+        if not records:
+            raise HTTPException(status_code = 404, detail = "No applicants match the search.")
+
+        return [record.to_dict() for record in records]
+
+    # The ordinal of a search date, 422 if it is not an ISO date.
+    def _search_date(self, value):
+        try:
+            return date.fromisoformat(value).toordinal()
+        except ValueError:
+            raise HTTPException(status_code = 422, detail = "{} is not a date (YYYY-MM-DD).".format(value))
+
+    # Count the applicants by state, gender and age band, same filters and
+    # result as InMemoryPersistence.applicant_stats. ResidencyState and
+    # Gender are filtered by the cold table, the ages here.
+    def applicant_stats(self, filters: dict, today: date = None):
+
+        filters = {field: value for field, value in filters.items() if value is not None}
+        age_min = filters.pop("age_min", None)
+        age_max = filters.pop("age_max", None)
+        today = today or date.today()
+
+        where = ["{} = ?".format(field) for field in filters if field in ("Gender", "ResidencyState")]
+        sql = "SELECT DoB, Gender, ResidencyState FROM applicant_cold{}".format(" WHERE " + " AND ".join(where) if where else "")
+        with self.lock:
+            self._flush()
+            rows = self.cold.execute(sql, [filters[field] for field in filters if field in ("Gender", "ResidencyState")]).fetchall()
+
+        count = unknown_age = 0
+        by_state = {}
+        by_gender = {}
+        band_counts = [0] * len(AGE_BANDS)
+
+        for dob, gender, state in rows:
+            age = age_on(today, dob) if dob is not None else -1
+            if age_min is not None or age_max is not None:
+                if age < 0 or (age_min is not None and age < age_min) or (age_max is not None and age > age_max):
+                    continue
+
+            count += 1
+            if state is not None:
+                by_state[state] = by_state.get(state, 0) + 1
+            if gender is not None:
+                by_gender[gender] = by_gender.get(gender, 0) + 1
+            if age < 0:
+                unknown_age += 1
+            else:
+                band_counts[bisect.bisect_right(AGE_BANDS, age) - 1] += 1
+
+        return stats_result(count, by_state, by_gender, band_counts, unknown_age, today)
+
+
+    # Update an existing applicant details. The new record replaces the old
+    # one whole, so a cold one is not read first.
+    def update_applicant(self, applicant_id: int, updated_applicant: dict):
+
+        with self.lock:
+            updated = self._exists(applicant_id)
+            if updated:
+                updated_applicant["Applicant_ID"] = applicant_id
+                self._put(ApplicantRecord(applicant_id, updated_applicant), dirty=True)
+
+        if updated:
+            return {"update_applicant": "The applicant was updated.", "applicant": updated_applicant}
+
+        raise HTTPException(status_code = 404, detail = "Applicant ID was not found.")
+
+
+    # Delete an applicant by their ID, from both tiers.
+    def delete_applicant(self, applicant_id: int):
+
+        with self.lock:
+            deleted = self._exists(applicant_id)
+            if deleted:
+                entry = self.hot.pop(applicant_id, None)
+                if entry is not None:
+                    self.hot_bytes -= entry[1]
+                self.dirty.discard(applicant_id)
+                del self.ids[bisect.bisect_left(self.ids, applicant_id)]
+                self.cold.execute("DELETE FROM applicant_cold WHERE Applicant_ID = ?", (applicant_id,))
+                self.cold.commit()
+
+        if deleted:
+            return {"delete_applicant": "Applicant deleted."}
+
+        raise HTTPException(status_code = 404, detail = "Applicant ID was not found.")
+
+
+    # Hit rates of the tiers: of the reads by ID, how many the hot tier
+    # served and how many were faulted in from the cold one.
+    def tier_stats(self):
+
+        with self.lock:
+            reads = self.hot_hits + self.cold_hits
+            return {
+                "applicants": len(self.ids),
+                "hot": len(self.hot),
+                "hot_bytes": self.hot_bytes,
+                "memory_budget": self.memory_budget,
+                "hot_hits": self.hot_hits,
+                "cold_hits": self.cold_hits,
+                "hot_hit_rate": round(self.hot_hits / reads, 4) if reads else None,
+                "cold_hit_rate": round(self.cold_hits / reads, 4) if reads else None,
+                "evictions": self.evictions,
+                "write_backs": self.write_backs,
+            }
+
+    # Close the cold table, and remove it if it is a temporary file. Safe to
+    # call more than once.
+    def close(self):
+
+        with self.lock:
+            self.cold.close()
+            if self._temporary:
+                atexit.unregister(self.close)
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(self.cold_path + suffix):
+                        os.remove(self.cold_path + suffix)
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.8 on 2025-04-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ppm', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['OwnerType', 'OwnerID'], name='ppm_address_owner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['Zip'], name='ppm_address_zip_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['LastName', 'FirstName'], name='ppm_applicant_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['DoB'], name='ppm_applicant_dob_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['ResidencyState'], name='ppm_applicant_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['Last_Name'], name='ppm_contact_last_name_idx'),
+        ),
+    ]
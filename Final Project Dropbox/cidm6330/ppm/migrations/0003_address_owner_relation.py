@@ -0,0 +1,58 @@
+# Generated by Django 5.1.8 on 2025-04-19 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Data migration: link every existing address to its owner. OwnerType
+# 'Applicant' or 'Self' means the applicant with that OwnerID, any other
+# value ('Contact', or a relationship such as 'Parent') the contact with
+# that OwnerID. An address whose owner does not exist stays unlinked.
+APPLICANT_OWNER_TYPES = ('Applicant', 'Self')
+
+
+def link_owners(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Address = apps.get_model('ppm', 'Address')
+    Applicant = apps.get_model('ppm', 'Applicant')
+    Contact = apps.get_model('ppm', 'Contact')
+
+    # The content types are made after migrate on a new database, they may not exist yet.
+    applicant_type, _ = ContentType.objects.get_or_create(app_label='ppm', model='applicant')
+    contact_type, _ = ContentType.objects.get_or_create(app_label='ppm', model='contact')
+
+    Address.objects.filter(
+        OwnerType__in=APPLICANT_OWNER_TYPES, OwnerID__in=Applicant.objects.values('id')
+    ).update(OwnerContentType=applicant_type)
+    Address.objects.exclude(OwnerType__in=APPLICANT_OWNER_TYPES).filter(
+        OwnerID__in=Contact.objects.values('id')
+    ).update(OwnerContentType=contact_type)
+
+
+def unlink_owners(apps, schema_editor):
+    apps.get_model('ppm', 'Address').objects.update(OwnerContentType=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('ppm', '0002_model_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='address',
+            name='ppm_address_owner_idx',
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='OwnerContentType',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, to='contenttypes.contenttype'),
+        ),
+        migrations.RunPython(link_owners, unlink_owners),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['OwnerContentType', 'OwnerID'], name='ppm_address_owner_idx'),
+        ),
+    ]
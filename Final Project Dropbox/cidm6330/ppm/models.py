@@ -1,5 +1,12 @@
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 
+# OwnerType values that mean the address belongs to an applicant; any other
+# value (Contact, or the relationship of a contact such as Parent) means it
+# belongs to a contact. Used when no OwnerEntity is given.
+APPLICANT_OWNER_TYPES = ('Applicant', 'Self')
+
 # 🔹 Applicant model to represent individual applicant records
 class Applicant(models.Model):
     FirstName = models.CharField(max_length=100)
@@ -7,6 +14,16 @@ class Applicant(models.Model):
     DoB = models.DateField()
     Gender = models.CharField(max_length=20)
     ResidencyState = models.CharField(max_length=50)
+    addresses = GenericRelation('Address', content_type_field='OwnerContentType', object_id_field='OwnerID')
+
+    # Indexes for the filters of ApplicantViewSet: by name (LastName alone
+    # or with FirstName), by a DoB range and by state.
+    class Meta:
+        indexes = [
+            models.Index(fields=['LastName', 'FirstName'], name='ppm_applicant_name_idx'),
+            models.Index(fields=['DoB'], name='ppm_applicant_dob_idx'),
+            models.Index(fields=['ResidencyState'], name='ppm_applicant_state_idx'),
+        ]
 
     def __str__(self):
         return f"{self.FirstName} {self.LastName}"
@@ -20,7 +37,20 @@ class Address(models.Model):
     Zip = models.CharField(max_length=10)
     Type = models.CharField(max_length=50)  # e.g., Home, Work
     OwnerID = models.IntegerField()         # ID of the entity this address belongs to
-    OwnerType = models.CharField(max_length=50)  # e.g., 'Applicant', 'Contact'
+    OwnerType = models.CharField(max_length=50)  # e.g., 'Applicant', 'Contact', or the contact's relationship
+    # Applicant or Contact, the model OwnerID belongs to. Null only for an
+    # address from before the relation whose owner no longer exists. No
+    # index of its own, ppm_address_owner_idx starts with it.
+    OwnerContentType = models.ForeignKey(ContentType, null=True, blank=True, on_delete=models.PROTECT, db_index=False)
+    owner = GenericForeignKey('OwnerContentType', 'OwnerID')
+
+    # Indexes for the filters of AddressViewSet: the addresses of one kind of
+    # owner, or of one owner (also used by ?expand=addresses), and by zip code.
+    class Meta:
+        indexes = [
+            models.Index(fields=['OwnerContentType', 'OwnerID'], name='ppm_address_owner_idx'),
+            models.Index(fields=['Zip'], name='ppm_address_zip_idx'),
+        ]
 
     def __str__(self):
         return f"{self.Street_No} {self.Street}, {self.City}"
@@ -31,6 +61,13 @@ class Contact(models.Model):
     Last_Name = models.CharField(max_length=100)
     Phone = models.CharField(max_length=15)
     Applicant_Relationship = models.CharField(max_length=50)
+    addresses = GenericRelation('Address', content_type_field='OwnerContentType', object_id_field='OwnerID')
+
+    # Index for the Last_Name filter of ContactViewSet.
+    class Meta:
+        indexes = [
+            models.Index(fields=['Last_Name'], name='ppm_contact_last_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.First_Name} {self.Last_Name}"
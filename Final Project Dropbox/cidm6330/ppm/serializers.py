@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth.models import Group, User
-from .models import Applicant, Address, Contact
+from django.contrib.contenttypes.models import ContentType
+from .models import APPLICANT_OWNER_TYPES, Applicant, Address, Contact
+
+# The models an address can belong to, by their OwnerEntity name.
+OWNER_MODELS = {'Applicant': Applicant, 'Contact': Contact}
 
 # 🔹 Serializer for Django's built-in User model
 class UserSerializer(serializers.ModelSerializer):
@@ -14,6 +18,23 @@ class GroupSerializer(serializers.ModelSerializer):
         model = Group
         fields = ['id', 'name']
 
+# 🔹 Field for the owner model of an address, 'Applicant' or 'Contact'
+# Stored as the ContentType of the model. Read from OwnerContentType_id
+# through the ContentType cache, so a list of addresses costs no query
+# per address.
+class OwnerEntityField(serializers.ChoiceField):
+    def __init__(self, **kwargs):
+        super().__init__(choices=list(OWNER_MODELS), **kwargs)
+
+    def to_internal_value(self, data):
+        return ContentType.objects.get_for_model(OWNER_MODELS[super().to_internal_value(data)])
+
+    def get_attribute(self, instance):
+        return instance.OwnerContentType_id
+
+    def to_representation(self, value):
+        return ContentType.objects.get_for_id(value).model_class().__name__
+
 # 🔹 Serializer for Applicant model
 class ApplicantSerializer(serializers.ModelSerializer):
     class Meta:
@@ -21,13 +42,42 @@ class ApplicantSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 # 🔹 Serializer for Address model
+# The owner is OwnerEntity plus OwnerID and must exist. Without OwnerEntity
+# it follows from OwnerType: 'Applicant' or 'Self' is an applicant, anything
+# else a contact.
 class AddressSerializer(serializers.ModelSerializer):
+    OwnerEntity = OwnerEntityField(source='OwnerContentType', required=False)
+
     class Meta:
         model = Address
-        fields = '__all__'
+        exclude = ['OwnerContentType']
+
+    def validate(self, data):
+        def current(field):
+            return data.get(field, getattr(self.instance, field, None))
+
+        owner_type = current('OwnerContentType')
+        if owner_type is None or 'OwnerType' in data and 'OwnerContentType' not in data:
+            entity = 'Applicant' if current('OwnerType') in APPLICANT_OWNER_TYPES else 'Contact'
+            owner_type = ContentType.objects.get_for_model(OWNER_MODELS[entity])
+
+        owner_id = current('OwnerID')
+        if not owner_type.model_class().objects.filter(pk=owner_id).exists():
+            raise serializers.ValidationError({'OwnerID': f"No {owner_type.model} with ID {owner_id}."})
+
+        data['OwnerContentType'] = owner_type
+        return data
 
 # 🔹 Serializer for Contact model
 class ContactSerializer(serializers.ModelSerializer):
     class Meta:
         model = Contact
         fields = '__all__'
+
+# 🔹 Applicant and Contact with their addresses, for ?expand=addresses
+# The views prefetch the addresses, so these add no query per record.
+class ApplicantAddressesSerializer(ApplicantSerializer):
+    addresses = AddressSerializer(many=True, read_only=True)
+
+class ContactAddressesSerializer(ContactSerializer):
+    addresses = AddressSerializer(many=True, read_only=True)
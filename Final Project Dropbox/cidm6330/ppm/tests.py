@@ -4,9 +4,13 @@
 
 import time
 from django.contrib.auth.models import User
-from rest_framework.test import APITestCase, APIClient
+from django.db import connection
+from django.contrib.contenttypes.models import ContentType
+from rest_framework.request import Request
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
 from rest_framework import status
 from .models import Applicant, Address, Contact
+from .views import ApplicantViewSet, AddressViewSet, ContactViewSet
 
 # ----------------------------------
 # Test Initialization Class
@@ -30,7 +34,7 @@ class SlowTestBase(APITestCase):
         self.address = Address.objects.create(
             Street_No="123", Street="Main St", City="Amarillo",
             State="TX", Zip="79101", Type="Home",
-            OwnerID=self.applicant.id, OwnerType="Applicant"
+            owner=self.applicant, OwnerType="Applicant"
         )
 
         self.contact = Contact.objects.create(
@@ -216,3 +220,169 @@ class AdminAccessTests(SlowTestBase):
         }
         response = self.client.post('/api/users/', data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+# ----------------------------
+# The List Filter Test Cases
+# ----------------------------
+# No delay between these, they check queries rather than show a scenario.
+class IndexedFilterTests(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.applicant = Applicant.objects.create(
+            FirstName="John", LastName="Doe", DoB="1990-01-01",
+            Gender="Male", ResidencyState="Texas"
+        )
+        Applicant.objects.create(
+            FirstName="Jane", LastName="Doe", DoB="1975-06-30",
+            Gender="Female", ResidencyState="Oklahoma"
+        )
+        Address.objects.create(
+            Street_No="123", Street="Main St", City="Amarillo",
+            State="TX", Zip="79101", Type="Home",
+            owner=self.applicant, OwnerType="Applicant"
+        )
+        Contact.objects.create(
+            First_Name="Jane", Last_Name="Smith",
+            Phone="5551234567", Applicant_Relationship="Sister"
+        )
+
+    # The SQLite query plan of the list queryset of a viewset for the
+    # query parameters, as one string.
+    def query_plan(self, viewset, params):
+        view = viewset()
+        view.request = Request(APIRequestFactory().get('/', params))
+        sql, sql_params = view.get_queryset().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, sql_params)
+            return ' | '.join(str(row[-1]) for row in cursor.fetchall())
+
+    # Every filter is served by its index, expected result: PASS.
+    def test_filters_use_their_indexes(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("EXPLAIN QUERY PLAN is SQLite only.")
+
+        cases = [
+            (ApplicantViewSet, {'LastName': 'Doe'}, 'ppm_applicant_name_idx'),
+            (ApplicantViewSet, {'LastName': 'Doe', 'FirstName': 'John'}, 'ppm_applicant_name_idx'),
+            (ApplicantViewSet, {'DoB_from': '1980-01-01', 'DoB_to': '1999-12-31'}, 'ppm_applicant_dob_idx'),
+            (ApplicantViewSet, {'ResidencyState': 'Texas'}, 'ppm_applicant_state_idx'),
+            (AddressViewSet, {'OwnerEntity': 'Applicant'}, 'ppm_address_owner_idx'),
+            (AddressViewSet, {'OwnerEntity': 'Applicant', 'OwnerID': 1}, 'ppm_address_owner_idx'),
+            (AddressViewSet, {'Zip': '79101'}, 'ppm_address_zip_idx'),
+            (ContactViewSet, {'Last_Name': 'Smith'}, 'ppm_contact_last_name_idx'),
+        ]
+        for viewset, params, index in cases:
+            with self.subTest(params=params):
+                self.assertIn(f"USING INDEX {index} ", self.query_plan(viewset, params))
+
+    # Filtered lists return only the matches, expected result: PASS.
+    def test_filtered_lists(self):
+        response = self.client.get('/api/applicants/', {'LastName': 'Doe', 'FirstName': 'John'})
+        self.assertEqual([a['id'] for a in response.data['results']], [self.applicant.id])
+
+        response = self.client.get('/api/applicants/', {'DoB_from': '1980-01-01'})
+        self.assertEqual(response.data['count'], 1)
+
+        response = self.client.get('/api/addresses/', {'OwnerEntity': 'Applicant', 'OwnerID': self.applicant.id})
+        self.assertEqual(response.data['count'], 1)
+
+        response = self.client.get('/api/contacts/', {'Last_Name': 'Doe'})
+        self.assertEqual(response.data['count'], 0)
+
+    # Bad filter values, expected result: FAIL with 400.
+    def test_invalid_filters(self):
+        response = self.client.get('/api/applicants/', {'DoB_from': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('DoB_from', response.data)
+
+        # FirstName alone can not use the (LastName, FirstName) index.
+        response = self.client.get('/api/applicants/', {'FirstName': 'John'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get('/api/addresses/', {'OwnerEntity': 'Applicant', 'OwnerID': 'one'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get('/api/addresses/', {'OwnerEntity': 'Spouse'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# The Address Owner Test Cases
+# ----------------------------
+# No delay between these either, they count queries.
+class AddressOwnerTests(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.applicant = Applicant.objects.create(
+            FirstName="John", LastName="Doe", DoB="1990-01-01",
+            Gender="Male", ResidencyState="Texas"
+        )
+        self.contact = Contact.objects.create(
+            First_Name="Jane", Last_Name="Smith",
+            Phone="5551234567", Applicant_Relationship="Sister"
+        )
+        self.address = {
+            "Street_No": "123", "Street": "Main St", "City": "Amarillo",
+            "State": "TX", "Zip": "79101", "Type": "Home"
+        }
+        # Cache the content types, as a running server has them.
+        ContentType.objects.get_for_models(Applicant, Contact)
+
+    def add_applicants(self, count):
+        for i in range(count):
+            applicant = Applicant.objects.create(
+                FirstName=f"First{i}", LastName=f"Last{i}", DoB="1990-01-01",
+                Gender="Female", ResidencyState="Texas"
+            )
+            Address.objects.create(owner=applicant, OwnerType="Applicant", **self.address)
+            Address.objects.create(owner=applicant, OwnerType="Applicant", **dict(self.address, Type="Mailing"))
+
+    # The owner comes from OwnerType or OwnerEntity, expected result: PASS.
+    def test_create_address_links_owner(self):
+        response = self.client.post('/api/addresses/', dict(self.address, OwnerID=self.applicant.id, OwnerType="Applicant"))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['OwnerEntity'], 'Applicant')
+        self.assertEqual(Address.objects.get(id=response.data['id']).owner, self.applicant)
+
+        response = self.client.post('/api/addresses/', dict(self.address, OwnerID=self.contact.id, OwnerType="Sibling"))
+        self.assertEqual(response.data['OwnerEntity'], 'Contact')
+        self.assertEqual(list(self.contact.addresses.all()), [Address.objects.get(id=response.data['id'])])
+
+    # An owner that does not exist, expected result: FAIL with 400.
+    def test_create_address_for_missing_owner(self):
+        response = self.client.post('/api/addresses/', dict(self.address, OwnerID=9999, OwnerType="Applicant"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('OwnerID', response.data)
+
+    # Deleting the owner deletes its addresses, expected result: PASS.
+    def test_delete_owner_deletes_addresses(self):
+        Address.objects.create(owner=self.applicant, OwnerType="Applicant", **self.address)
+        self.applicant.delete()
+        self.assertFalse(Address.objects.exists())
+
+    # The addresses are nested, expected result: PASS.
+    def test_expand_addresses(self):
+        Address.objects.create(owner=self.contact, OwnerType="Sibling", **self.address)
+        response = self.client.get('/api/contacts/', {'expand': 'addresses'})
+        self.assertEqual(response.data['results'][0]['addresses'][0]['Zip'], "79101")
+
+        response = self.client.get('/api/contacts/')
+        self.assertNotIn('addresses', response.data['results'][0])
+
+        response = self.client.get('/api/contacts/', {'expand': 'applicants'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # The same queries for a page of 1 or 10 applicants, expected result: PASS.
+    def test_expand_addresses_query_count(self):
+        # count, page, addresses.
+        self.add_applicants(1)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/applicants/', {'expand': 'addresses'})
+        self.assertEqual(len(response.data['results'][-1]['addresses']), 2)
+
+        self.add_applicants(9)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/applicants/', {'expand': 'addresses'})
+        self.assertEqual(len(response.data['results']), 10)
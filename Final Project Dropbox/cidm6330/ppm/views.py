@@ -1,13 +1,14 @@
 from django.contrib.auth.models import Group, User
 from django.http import HttpResponse
-from rest_framework import permissions, viewsets
+from rest_framework import permissions, serializers, viewsets
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from .models import Applicant, Address, Contact
 from .serializers import (
     GroupSerializer, UserSerializer,
-    ApplicantSerializer, AddressSerializer, ContactSerializer
+    ApplicantSerializer, AddressSerializer, ContactSerializer,
+    ApplicantAddressesSerializer, ContactAddressesSerializer, OwnerEntityField,
 )
 
 from .tasks import simulate_long_task
@@ -45,20 +46,96 @@ class GroupViewSet(viewsets.ModelViewSet):
     serializer_class = GroupSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+# 📌 Query parameter filters for the list endpoints
+# filter_params maps a query parameter to (ORM lookup, serializer field).
+# The field checks the value, a bad one is a 400 naming the parameter. All
+# given parameters must match. Each filter has an index in models.py,
+# ppm/tests.py checks the query plans use them. filter_requires names the
+# parameter a filter needs with it, the first field of its index.
+class IndexedFilterMixin:
+    filter_params = {}
+    filter_requires = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        for param, (lookup, field) in self.filter_params.items():
+            value = params.get(param)
+            if value is None or value == '':
+                continue
+            required = self.filter_requires.get(param)
+            if required and not params.get(required):
+                raise serializers.ValidationError({param: f"Use {param} together with {required}."})
+            try:
+                value = field.run_validation(value)
+            except serializers.ValidationError as e:
+                raise serializers.ValidationError({param: e.detail})
+            queryset = queryset.filter(**{lookup: value})
+        return queryset
+
+# 📌 ?expand=addresses for the owners of addresses
+# Nests the addresses of every record with expand_serializer_class. They
+# are fetched by prefetch_related, one query for the whole page however
+# many records it has.
+class ExpandAddressesMixin:
+    expand_serializer_class = None
+
+    def expand_addresses(self):
+        expand = self.request.query_params.get('expand')
+        if not expand:
+            return False
+        if set(expand.split(',')) != {'addresses'}:
+            raise serializers.ValidationError({'expand': "Only addresses can be expanded."})
+        return True
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.expand_addresses():
+            queryset = queryset.prefetch_related('addresses')
+        return queryset
+
+    def get_serializer_class(self):
+        if self.expand_addresses():
+            return self.expand_serializer_class
+        return super().get_serializer_class()
+
 # 📌 Applicant API endpoint
-class ApplicantViewSet(viewsets.ModelViewSet):
+# /api/applicants/?LastName=Doe&FirstName=John, ?DoB_from=1990-01-01&DoB_to=1990-12-31, ?ResidencyState=Texas
+# Any of them with &expand=addresses.
+class ApplicantViewSet(ExpandAddressesMixin, IndexedFilterMixin, viewsets.ModelViewSet):
     queryset = Applicant.objects.all()
     serializer_class = ApplicantSerializer
+    expand_serializer_class = ApplicantAddressesSerializer
+    filter_params = {
+        'LastName': ('LastName', serializers.CharField()),
+        'FirstName': ('FirstName', serializers.CharField()),
+        'DoB_from': ('DoB__gte', serializers.DateField()),
+        'DoB_to': ('DoB__lte', serializers.DateField()),
+        'ResidencyState': ('ResidencyState', serializers.CharField()),
+    }
+    filter_requires = {'FirstName': 'LastName'}
 
 # 📌 Address API endpoint
-class AddressViewSet(viewsets.ModelViewSet):
+# /api/addresses/?OwnerEntity=Applicant&OwnerID=1, ?Zip=79101
+class AddressViewSet(IndexedFilterMixin, viewsets.ModelViewSet):
     queryset = Address.objects.all()
     serializer_class = AddressSerializer
+    filter_params = {
+        'OwnerEntity': ('OwnerContentType', OwnerEntityField()),
+        'OwnerID': ('OwnerID', serializers.IntegerField()),
+        'Zip': ('Zip', serializers.CharField()),
+    }
+    filter_requires = {'OwnerID': 'OwnerEntity'}
 
 # 📌 Contact API endpoint
-class ContactViewSet(viewsets.ModelViewSet):
+# /api/contacts/?Last_Name=Smith, with &expand=addresses.
+class ContactViewSet(ExpandAddressesMixin, IndexedFilterMixin, viewsets.ModelViewSet):
     queryset = Contact.objects.all()
     serializer_class = ContactSerializer
+    expand_serializer_class = ContactAddressesSerializer
+    filter_params = {
+        'Last_Name': ('Last_Name', serializers.CharField()),
+    }
 
 # 📌 Launch 10 async Celery tasks, spaced 30 seconds apart
 @api_view(['POST'])